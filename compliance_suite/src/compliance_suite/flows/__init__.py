@@ -0,0 +1,38 @@
+"""
+Async OAuth flow driver shared by the load harness and the tests.
+
+    async with new_client(200) as client:
+        flow = Flow(client, Settings.from_env("PYTHON", "http://localhost:8000"))
+        tokens = await flow.login("openid profile email")
+        claims = await flow.userinfo(tokens)
+"""
+
+from compliance_suite.flows.driver import (
+    Authorization,
+    Decision,
+    Flow,
+    Settings,
+    StepFailed,
+    Tokens,
+    basic_auth,
+    code_from_location,
+    new_client,
+    run_flows,
+)
+from compliance_suite.flows.ticket import TicketExtractor, extract_ticket, read_ticket
+
+__all__ = [
+    "Authorization",
+    "Decision",
+    "Flow",
+    "Settings",
+    "StepFailed",
+    "TicketExtractor",
+    "Tokens",
+    "basic_auth",
+    "code_from_location",
+    "extract_ticket",
+    "new_client",
+    "read_ticket",
+    "run_flows",
+]
@@ -0,0 +1,294 @@
+"""
+Flow driver
+-----------
+Async OAuth journeys against either target, shared by the load harness, the
+token factory of the tests and anything else that needs real tokens.
+
+A `Flow` is one journey. Its typed steps are
+
+    authorize -> Authorization     GET  /api/authorization (ticket streamed out)
+    decide    -> Decision          POST /api/authorization/decision
+    exchange  -> Tokens            POST /api/token (authorization_code)
+    refresh   -> Tokens            POST /api/token (refresh_token)
+    introspect, revoke, userinfo, gm_query, gm_revoke, par
+
+and `login()` chains the first three. Every request is a named step timed
+into an optional recorder, and a step that gets an unexpected status or a
+transport error raises `StepFailed`. Many flows share one pooled
+`httpx.AsyncClient` (`new_client()`): its own cookie jar is disabled and each
+flow carries its cookies itself, because the Java target ties the consent to
+the session cookie and concurrent journeys must not see each other's
+sessions. `run_flows()` runs a journey many times with bounded concurrency.
+
+Client and user credentials come from the same `.env` as the tests
+(CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, RS_CLIENT_ID, RS_CLIENT_SECRET).
+"""
+
+import asyncio
+import base64
+import os
+import re
+from dataclasses import dataclass, field
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+
+import dotenv
+import httpx
+
+from compliance_suite.flows.ticket import read_ticket
+
+BASE_DIR = Path(__file__).resolve().parents[4]
+dotenv.load_dotenv(BASE_DIR / ".env")
+
+CODE = re.compile(r'[?&#]code=([^&]+)')
+
+FORM = "application/x-www-form-urlencoded"
+
+Recorder = Callable[[str, float, int | None, str | None], None]
+
+
+class StepFailed(Exception):
+    def __init__(self, step: str, reason: str, status_code: int | None = None):
+        super().__init__(f"{step}: {reason}")
+        self.step = step
+        self.reason = reason
+        self.status_code = status_code
+
+
+def basic_auth(client_id: str, client_secret: str) -> str:
+    return "Basic " + base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
+
+
+def code_from_location(location: str) -> str | None:
+    m = CODE.search(location)
+    return m.group(1) if m else None
+
+
+@dataclass(frozen=True)
+class Settings:
+    target: str
+    base_url: str
+    client_id: str
+    client_secret: str
+    redirect_uri: str
+    rs_id: str
+    rs_secret: str
+    login_id: str = "max"
+    password: str = "max"
+
+    @classmethod
+    def from_env(cls, target: str, base_url: str) -> "Settings":
+        return cls(
+            target=target,
+            base_url=base_url.rstrip("/"),
+            client_id=os.getenv("CLIENT_ID", ""),
+            client_secret=os.getenv("CLIENT_SECRET", ""),
+            redirect_uri=os.getenv("REDIRECT_URI", ""),
+            rs_id=os.getenv("RS_CLIENT_ID", "rs0"),
+            rs_secret=os.getenv("RS_CLIENT_SECRET", "rs0-secret"),
+        )
+
+    @property
+    def client_basic(self) -> str:
+        return basic_auth(self.client_id, self.client_secret)
+
+    @property
+    def rs_basic(self) -> str:
+        return basic_auth(self.rs_id, self.rs_secret)
+
+
+@dataclass(frozen=True)
+class Authorization:
+    scope: str
+    ticket: str | None  # None against the Java target, which uses the session cookie
+
+
+@dataclass(frozen=True)
+class Decision:
+    location: str
+    code: str
+
+
+@dataclass(frozen=True)
+class Tokens:
+    access_token: str
+    refresh_token: str | None = None
+    grant_id: str | None = None
+    raw: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_response(cls, payload: dict) -> "Tokens":
+        return cls(payload["access_token"], payload.get("refresh_token"), payload.get("grant_id"), payload)
+
+    @property
+    def bearer(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+
+def new_client(max_connections: int = 100) -> httpx.AsyncClient:
+    # Cookies are carried per flow; a shared jar would mix up concurrent sessions
+    jar = CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+    limit = max(max_connections, 1)
+    return httpx.AsyncClient(
+        follow_redirects=False,
+        timeout=30.0,
+        cookies=jar,
+        limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+    )
+
+
+class Flow:
+    """One journey: the shared client, the settings, its own cookies and a step timer."""
+
+    def __init__(self, client: httpx.AsyncClient, settings: Settings, record: Recorder | None = None):
+        self.client = client
+        self.settings = settings
+        self._record = record or (lambda name, seconds, status, error: None)
+        self.cookies: dict[str, str] = {}
+
+    async def step(self, name: str, method: str, path: str, expect: tuple[int, ...] = (200,), **kwargs) -> httpx.Response:
+        response, _ = await self._send(name, method, path, expect, None, kwargs)
+        return response
+
+    async def stream_step(self, name: str, method: str, path: str, read: Callable[[httpx.Response], Awaitable[Any]],
+                          expect: tuple[int, ...] = (200,), **kwargs) -> tuple[httpx.Response, Any]:
+        """Like `step`, but the body is handed to `read` as a stream, inside the timed span."""
+        return await self._send(name, method, path, expect, read, kwargs)
+
+    async def _send(self, name, method, path, expect, read, kwargs) -> tuple[httpx.Response, Any]:
+        headers = dict(kwargs.pop("headers", ()))
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        started = perf_counter()
+        try:
+            request = self.client.build_request(method, self.settings.base_url + path, headers=headers, **kwargs)
+            response = await self.client.send(request, stream=read is not None)
+            value = await read(response) if read is not None else None
+        except httpx.HTTPError as e:
+            self._record(name, perf_counter() - started, None, type(e).__name__)
+            raise StepFailed(name, type(e).__name__) from e
+        elapsed = perf_counter() - started
+
+        self.cookies.update(response.cookies)
+        if response.status_code not in expect:
+            self._record(name, elapsed, response.status_code, f"status {response.status_code}")
+            raise StepFailed(name, f"status {response.status_code}", response.status_code)
+        self._record(name, elapsed, response.status_code, None)
+        return response, value
+
+    # ------------------------------------------------------------------
+    # Authorization code flow
+    # ------------------------------------------------------------------
+
+    async def authorize(self, scope: str = "openid", **params) -> Authorization:
+        s = self.settings
+        query = {"response_type": "code", "client_id": s.client_id, "scope": scope, "redirect_uri": s.redirect_uri, **params}
+        if s.target == "JAVA":
+            await self.step("authorization", "GET", "/api/authorization", params=query)
+            return Authorization(scope, None)
+
+        _, ticket = await self.stream_step("authorization", "GET", "/api/authorization", read_ticket, params=query)
+        if ticket is None:
+            raise StepFailed("authorization", "no ticket in the consent page", 200)
+        return Authorization(scope, ticket)
+
+    async def decide(self, authorization: Authorization, authorized: bool = True) -> Decision:
+        s = self.settings
+        if s.target == "JAVA":
+            form_data = {"loginId": s.login_id, "password": s.password}
+            if authorized:
+                form_data["authorized"] = "Authorize"
+        else:
+            form_data = {"ticket": authorization.ticket, "subject": s.login_id, "password": s.password,
+                         "authorized": "true" if authorized else "false"}
+
+        res = await self.step("decision", "POST", "/api/authorization/decision", expect=(302, 303), data=form_data)
+        location = res.headers.get("Location", "")
+        code = code_from_location(location)
+        if code is None:
+            raise StepFailed("decision", "no code in the redirect", res.status_code)
+        return Decision(location, code)
+
+    async def exchange(self, decision: Decision) -> Tokens:
+        payload = {"grant_type": "authorization_code", "code": decision.code, "redirect_uri": self.settings.redirect_uri}
+        return await self._token("token", payload)
+
+    async def login(self, scope: str = "openid", **params) -> Tokens:
+        """authorize -> decide -> exchange"""
+        return await self.exchange(await self.decide(await self.authorize(scope, **params)))
+
+    async def refresh(self, tokens: Tokens) -> Tokens:
+        if tokens.refresh_token is None:
+            raise StepFailed("refresh", "no refresh_token to use")
+        return await self._token("refresh", {"grant_type": "refresh_token", "refresh_token": tokens.refresh_token})
+
+    async def _token(self, name: str, payload: dict) -> Tokens:
+        res = await self.step(name, "POST", "/api/token", data=payload,
+                              headers={"Authorization": self.settings.client_basic, "Content-Type": FORM})
+        body = res.json()
+        if "access_token" not in body:
+            raise StepFailed(name, "no access_token", res.status_code)
+        return Tokens.from_response(body)
+
+    # ------------------------------------------------------------------
+    # Token use
+    # ------------------------------------------------------------------
+
+    async def introspect(self, token: str, step: str = "introspection") -> dict:
+        res = await self.step(step, "POST", "/api/introspection", data={"token": token},
+                              headers={"Authorization": self.settings.rs_basic, "Content-Type": FORM})
+        return res.json()
+
+    async def revoke(self, token: str):
+        await self.step("revocation", "POST", "/api/revocation", data={"token": token},
+                        headers={"Authorization": self.settings.client_basic, "Content-Type": FORM})
+
+    async def userinfo(self, tokens: Tokens) -> dict:
+        return (await self.step("userinfo", "GET", "/api/userinfo", headers=tokens.bearer)).json()
+
+    async def gm_query(self, tokens: Tokens) -> dict:
+        res = await self.step("gm.query", "GET", f"/api/gm/{self._grant_id(tokens)}", headers=tokens.bearer)
+        return res.json()
+
+    async def gm_revoke(self, tokens: Tokens):
+        await self.step("gm.revoke", "DELETE", f"/api/gm/{self._grant_id(tokens)}", expect=(204,), headers=tokens.bearer)
+
+    @staticmethod
+    def _grant_id(tokens: Tokens) -> str:
+        if tokens.grant_id is None:
+            raise StepFailed("token", "no grant_id")
+        return tokens.grant_id
+
+    async def par(self, scope: str = "openid", **params) -> dict:
+        s = self.settings
+        payload = {"response_type": "code", "client_id": s.client_id, "scope": scope, "redirect_uri": s.redirect_uri, **params}
+        res = await self.step("par", "POST", "/api/par", expect=(201,), data=payload,
+                              headers={"Authorization": s.client_basic, "Content-Type": FORM})
+        return res.json()
+
+
+async def run_flows(settings: Settings, journey: Callable[[Flow], Awaitable[Any]], count: int,
+                    concurrency: int = 100, client: httpx.AsyncClient | None = None,
+                    record: Recorder | None = None) -> list[Any]:
+    """
+    Runs `journey` `count` times, at most `concurrency` at once, on one pooled
+    client. Returns each run's result, or the `StepFailed` it raised.
+    """
+    own_client = client is None
+    client = client or new_client(concurrency)
+    gate = asyncio.Semaphore(max(concurrency, 1))
+
+    async def one() -> Any:
+        async with gate:
+            try:
+                return await journey(Flow(client, settings, record))
+            except StepFailed as e:
+                return e
+
+    try:
+        return await asyncio.gather(*(one() for _ in range(count)))
+    finally:
+        if own_client:
+            await client.aclose()
@@ -0,0 +1,47 @@
+"""
+Consent ticket extraction
+-------------------------
+The Python target renders the Authlete ticket as a hidden input of the
+authorization page. `TicketExtractor` is an incremental HTML parser, so the
+ticket can be picked out of a streamed response as soon as its tag has
+arrived; `read_ticket()` stops parsing there and only drains the rest of the
+body, so the connection goes back to the pool.
+"""
+
+from html.parser import HTMLParser
+
+import httpx
+
+
+class TicketExtractor(HTMLParser):
+    """Finds `<input name="ticket" value="...">` in HTML fed chunk by chunk."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.ticket: str | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        if self.ticket is None and tag == "input":
+            fields = dict(attrs)
+            if fields.get("name") == "ticket" and fields.get("value"):
+                self.ticket = fields["value"]
+
+
+def extract_ticket(html: str) -> str | None:
+    parser = TicketExtractor()
+    parser.feed(html)
+    return parser.ticket
+
+
+async def read_ticket(response: httpx.Response) -> str | None:
+    """Reads the ticket from a response opened with `stream=True`, then closes it."""
+    parser = TicketExtractor()
+    try:
+        # The rest of the body is still read (closing a half-read response
+        # would drop its keep-alive connection), just no longer parsed
+        async for chunk in response.aiter_text():
+            if parser.ticket is None:
+                parser.feed(chunk)
+    finally:
+        await response.aclose()
+    return parser.ticket
@@ -0,0 +1,12 @@
+"""
+Load-testing harness built on the compliance-suite flows.
+
+    python -m compliance_suite.load run --target PYTHON --model open --rate 100 --output after.json
+    python -m compliance_suite.load compare before.json after.json
+"""
+
+from compliance_suite.load.runner import LoadConfig, LoadRunner, percentile
+from compliance_suite.flows import Settings
+from compliance_suite.load.scenarios import DEFAULT_MIX, SCENARIOS
+
+__all__ = ["DEFAULT_MIX", "SCENARIOS", "LoadConfig", "LoadRunner", "Settings", "percentile"]
@@ -0,0 +1,154 @@
+"""
+Command line for the load harness.
+
+    python -m compliance_suite.load run [--target PYTHON] [--url URL]
+        [--model closed|open] [--concurrency N] [--rate R] [--arrivals poisson|constant]
+        [--duration S] [--warmup S] [--think-time S] [--mix "userinfo=3,metadata=1"]
+        [--seed N] [--output results.json]
+
+    python -m compliance_suite.load compare before.json after.json
+
+`run` prints a per-step table and, with --output, writes the full results
+(including the git commit of the working tree) as JSON. `compare` prints the
+per-step percentile changes between two such files.
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from compliance_suite.load.runner import PERCENTILES, LoadConfig, LoadRunner
+from compliance_suite.flows import Settings
+from compliance_suite.load.scenarios import DEFAULT_MIX, SCENARIOS
+from compliance_suite.targets import TARGETS, resolve_target
+
+COLUMNS = ("count", "rps", "mean_ms", *(f"{name}_ms" for name, _ in PERCENTILES), "errors")
+
+
+def parse_mix(spec: str | None) -> dict[str, float]:
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight) if weight else 1.0
+    return mix
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def print_table(title: str, section: dict):
+    print(f"\n{title}")
+    print(f"{'name':<18}" + "".join(f"{c:>11}" for c in COLUMNS))
+    for name, stats in section.items():
+        print(f"{name:<18}" + "".join(f"{stats[c]:>11}" for c in COLUMNS))
+
+
+def run(args) -> int:
+    target, url = resolve_target(args.target)
+    config = LoadConfig(
+        model=args.model,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        arrivals=args.arrivals,
+        duration=args.duration,
+        warmup=args.warmup,
+        think_time=args.think_time,
+        mix=parse_mix(args.mix),
+        seed=args.seed,
+    )
+    settings = Settings.from_env(target, args.url or url)
+    results = asyncio.run(LoadRunner(settings, config).run())
+    results = {
+        "meta": {
+            "target": target,
+            "url": settings.base_url,
+            "model": config.model,
+            "concurrency": config.concurrency,
+            "rate": config.rate if config.model == "open" else None,
+            "arrivals": config.arrivals if config.model == "open" else None,
+            "duration_s": config.duration,
+            "warmup_s": config.warmup,
+            "mix": config.mix,
+            "git_commit": git_commit(),
+        },
+        **results,
+    }
+
+    summary = results["summary"]
+    print(f"{target} {settings.base_url} {config.model}: "
+          f"{summary['scenarios_completed']} scenarios in {summary['duration_s']}s "
+          f"({summary['throughput_per_s']}/s), {summary['scenarios_failed']} failed, "
+          f"{summary['dropped_arrivals']} dropped")
+    print_table("scenarios", results["scenarios"])
+    print_table("steps", results["steps"])
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nwrote {args.output}")
+    return 1 if summary["scenarios_completed"] == 0 else 0
+
+
+def compare(args) -> int:
+    before = json.loads(Path(args.before).read_text())
+    after = json.loads(Path(args.after).read_text())
+    print(f"before {before['meta'].get('git_commit')}  after {after['meta'].get('git_commit')}")
+    keys = ("rps", *(f"{name}_ms" for name, _ in PERCENTILES), "errors")
+    for section in ("scenarios", "steps"):
+        print(f"\n{section}")
+        print(f"{'name':<18}" + "".join(f"{k:>26}" for k in keys))
+        for name in sorted(set(before[section]) | set(after[section])):
+            a, b = before[section].get(name), after[section].get(name)
+            if a is None or b is None:
+                print(f"{name:<18}  only in {'after' if a is None else 'before'}")
+                continue
+            cells = []
+            for k in keys:
+                change = f"{(b[k] - a[k]) / a[k] * 100:+.1f}%" if a[k] else "n/a"
+                cells.append(f"{a[k]}->{b[k]} ({change})")
+            print(f"{name:<18}" + "".join(f"{c:>26}" for c in cells))
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m compliance_suite.load")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run a load test")
+    run_parser.add_argument("--target", choices=sorted(TARGETS), help="Defaults to the TARGET env var, then JAVA")
+    run_parser.add_argument("--url", help="Base URL overriding the target's default")
+    run_parser.add_argument("--model", choices=("closed", "open"), default="closed")
+    run_parser.add_argument("--concurrency", type=int, default=16,
+                            help="Virtual users (closed) or maximum runs in flight (open)")
+    run_parser.add_argument("--rate", type=float, default=50.0, help="Scenario arrivals per second (open)")
+    run_parser.add_argument("--arrivals", choices=("poisson", "constant"), default="poisson")
+    run_parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    run_parser.add_argument("--warmup", type=float, default=5.0, help="Seconds run before measuring")
+    run_parser.add_argument("--think-time", type=float, default=0.0, help="Pause between runs (closed)")
+    run_parser.add_argument("--mix", help=f"Weights, e.g. \"userinfo=3,metadata=1\"; scenarios: {', '.join(SCENARIOS)}")
+    run_parser.add_argument("--seed", type=int)
+    run_parser.add_argument("--output", help="Write the results as JSON")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
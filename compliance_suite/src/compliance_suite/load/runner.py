@@ -0,0 +1,205 @@
+"""
+Load runner
+-----------
+Drives the scenarios in `scenarios.py` on one shared `httpx.AsyncClient`:
+
+closed model
+    `concurrency` virtual users, each running scenarios back to back (with an
+    optional think time). Throughput is whatever the server sustains.
+
+open model
+    New scenario runs arrive at `rate` per second (Poisson arrivals by
+    default, or evenly spaced) whether or not earlier ones have finished, so
+    queueing in the server shows up as latency instead of being hidden by
+    the client slowing down. At most `concurrency` runs are in flight; an
+    arrival beyond that is counted as dropped.
+
+Scenarios are picked at random with the weights of the mix. Samples taken
+during the warm-up are discarded. The result is a plain dict (see
+`Results.to_dict`) that `__main__` writes as JSON.
+"""
+
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+from compliance_suite.flows import Flow, Settings, StepFailed, new_client
+from compliance_suite.load.scenarios import SCENARIOS
+
+PERCENTILES = (("p50", 50.0), ("p95", 95.0), ("p99", 99.0), ("p999", 99.9))
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(samples: list[float], duration: float) -> dict:
+    ordered = sorted(samples)
+    summary = {
+        "count": len(ordered),
+        "rps": round(len(ordered) / duration, 2) if duration > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+    }
+    for name, pct in PERCENTILES:
+        summary[f"{name}_ms"] = round(percentile(ordered, pct) * 1000, 3)
+    summary["max_ms"] = round(ordered[-1] * 1000, 3) if ordered else 0.0
+    return summary
+
+
+@dataclass
+class StepStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class Results:
+    steps: dict[str, StepStats] = field(default_factory=dict)
+    scenarios: dict[str, StepStats] = field(default_factory=dict)
+    dropped: int = 0
+    recording: bool = False
+    started: float = 0.0
+    finished: float = 0.0
+
+    def record_step(self, name: str, seconds: float, status: int | None, error: str | None):
+        if not self.recording:
+            return
+        stats = self.steps.setdefault(name, StepStats())
+        if error is None:
+            stats.latencies.append(seconds)
+        else:
+            stats.errors[error] = stats.errors.get(error, 0) + 1
+
+    def record_scenario(self, name: str, seconds: float, error: str | None):
+        if not self.recording:
+            return
+        stats = self.scenarios.setdefault(name, StepStats())
+        if error is None:
+            stats.latencies.append(seconds)
+        else:
+            stats.errors[error] = stats.errors.get(error, 0) + 1
+
+    def to_dict(self) -> dict:
+        duration = self.finished - self.started
+
+        def section(entries: dict[str, StepStats]) -> dict:
+            return {
+                name: {**latency_summary(stats.latencies, duration),
+                       "errors": sum(stats.errors.values()),
+                       "error_kinds": dict(sorted(stats.errors.items()))}
+                for name, stats in sorted(entries.items())
+            }
+
+        completed = sum(len(s.latencies) for s in self.scenarios.values())
+        failed = sum(sum(s.errors.values()) for s in self.scenarios.values())
+        return {
+            "summary": {
+                "duration_s": round(duration, 3),
+                "scenarios_completed": completed,
+                "scenarios_failed": failed,
+                "throughput_per_s": round(completed / duration, 2) if duration > 0 else 0.0,
+                "dropped_arrivals": self.dropped,
+            },
+            "scenarios": section(self.scenarios),
+            "steps": section(self.steps),
+        }
+
+
+@dataclass(frozen=True)
+class LoadConfig:
+    model: str = "closed"             # "closed" or "open"
+    concurrency: int = 16
+    rate: float = 50.0                # open model: scenario arrivals per second
+    arrivals: str = "poisson"         # open model: "poisson" or "constant"
+    duration: float = 30.0
+    warmup: float = 5.0
+    think_time: float = 0.0           # closed model: pause between runs
+    mix: dict[str, float] = field(default_factory=dict)
+    seed: int | None = None
+
+
+class LoadRunner:
+    def __init__(self, settings: Settings, config: LoadConfig):
+        unknown = set(config.mix) - set(SCENARIOS)
+        if unknown:
+            raise ValueError(f"Unknown scenarios {sorted(unknown)}; expected some of {sorted(SCENARIOS)}")
+        self.settings = settings
+        self.config = config
+        self.results = Results()
+        self._random = random.Random(config.seed)
+        self._names = [name for name, weight in config.mix.items() if weight > 0]
+        self._weights = [config.mix[name] for name in self._names]
+
+    def _pick(self) -> str:
+        return self._random.choices(self._names, self._weights)[0]
+
+    async def _run_one(self, client: httpx.AsyncClient):
+        name = self._pick()
+        flow = Flow(client, self.settings, self.results.record_step)
+        started = time.perf_counter()
+        error = None
+        try:
+            await SCENARIOS[name](flow)
+        except StepFailed as e:
+            error = f"{e.step}: {e.reason}"
+        except Exception as e:  # a broken response body must not stop the run
+            error = type(e).__name__
+        self.results.record_scenario(name, time.perf_counter() - started, error)
+
+    async def _closed(self, client: httpx.AsyncClient, stop_at: float):
+        async def user():
+            while time.monotonic() < stop_at:
+                await self._run_one(client)
+                if self.config.think_time > 0:
+                    await asyncio.sleep(self.config.think_time)
+
+        await asyncio.gather(*(user() for _ in range(self.config.concurrency)))
+
+    async def _open(self, client: httpx.AsyncClient, stop_at: float):
+        in_flight: set[asyncio.Task] = set()
+        next_arrival = time.monotonic()
+        while next_arrival < stop_at:
+            delay = next_arrival - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= self.config.concurrency:
+                if self.results.recording:
+                    self.results.dropped += 1
+            else:
+                task = asyncio.create_task(self._run_one(client))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if self.config.arrivals == "constant":
+                next_arrival += 1.0 / self.config.rate
+            else:
+                next_arrival += self._random.expovariate(self.config.rate)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    async def run(self) -> dict:
+        config = self.config
+        async with new_client(config.concurrency) as client:
+            loop_started = time.monotonic()
+            stop_at = loop_started + config.warmup + config.duration
+
+            async def start_recording():
+                await asyncio.sleep(config.warmup)
+                self.results.recording = True
+                self.results.started = time.monotonic()
+
+            recorder = asyncio.create_task(start_recording())
+            if config.model == "open":
+                await self._open(client, stop_at)
+            else:
+                await self._closed(client, stop_at)
+            await recorder
+            self.results.finished = time.monotonic()
+        return self.results.to_dict()
@@ -0,0 +1,79 @@
+"""
+Load scenarios
+--------------
+The compliance-test flows, rewritten as async workloads for the load harness.
+Each scenario is one user journey; every HTTP request in it is a named step
+whose latency is recorded separately:
+
+    metadata        discovery, jwks
+    userinfo        authorization, decision, token, userinfo
+    introspection   authorization, decision, token, introspection
+    revocation      authorization, decision, token, revocation, introspection
+    refresh         authorization, decision, token, refresh, introspection
+    grant_mgmt      authorization, decision, token, gm.query, gm.revoke
+    par             par
+
+The steps are those of `compliance_suite.flows.Flow`. `refresh` is not in the
+default mix, so earlier result files stay comparable; pick it with --mix.
+"""
+
+from typing import Awaitable, Callable
+
+from compliance_suite.flows import Flow, StepFailed
+
+CODE_CHALLENGE = "E9Melhoa2OwvFrEMTJguCHaoeK1t8URWbuGJSstw-cM"
+
+
+# ----------------------------------------------------------------------
+# Scenarios
+# ----------------------------------------------------------------------
+
+async def metadata(flow: Flow):
+    await flow.step("discovery", "GET", "/.well-known/openid-configuration")
+    await flow.step("jwks", "GET", "/api/jwks")
+
+
+async def userinfo(flow: Flow):
+    await flow.userinfo(await flow.login("openid profile email"))
+
+
+async def introspection(flow: Flow):
+    tokens = await flow.login()
+    if (await flow.introspect(tokens.access_token)).get("active") is not True:
+        raise StepFailed("introspection", "token not active")
+
+
+async def revocation(flow: Flow):
+    tokens = await flow.login()
+    await flow.revoke(tokens.access_token)
+    if (await flow.introspect(tokens.access_token)).get("active") is not False:
+        raise StepFailed("introspection", "revoked token still active")
+
+
+async def refresh(flow: Flow):
+    tokens = await flow.refresh(await flow.login())
+    if (await flow.introspect(tokens.access_token)).get("active") is not True:
+        raise StepFailed("introspection", "refreshed token not active")
+
+
+async def grant_mgmt(flow: Flow):
+    tokens = await flow.login("openid grant_management_query grant_management_revoke", grant_management_action="create")
+    await flow.gm_query(tokens)
+    await flow.gm_revoke(tokens)
+
+
+async def par(flow: Flow):
+    await flow.par(code_challenge_method="S256", code_challenge=CODE_CHALLENGE)
+
+
+SCENARIOS: dict[str, Callable[[Flow], Awaitable[None]]] = {
+    "metadata": metadata,
+    "userinfo": userinfo,
+    "introspection": introspection,
+    "revocation": revocation,
+    "refresh": refresh,
+    "grant_mgmt": grant_mgmt,
+    "par": par,
+}
+
+DEFAULT_MIX = {"metadata": 4, "userinfo": 3, "introspection": 3, "revocation": 1, "grant_mgmt": 1, "par": 1}
@@ -0,0 +1,16 @@
+"""Servers the suite and the load harness can run against (selected with TARGET)."""
+
+import os
+
+TARGETS = {
+    "JAVA" : "http://localhost:8080",
+    "PYTHON" : "http://localhost:8000"
+}
+
+
+def resolve_target(name: str | None = None) -> tuple[str, str]:
+    """Returns (target name, base URL); defaults to the TARGET env var, then JAVA."""
+    target = (name or os.getenv("TARGET", "JAVA")).upper()
+    if target not in TARGETS:
+        raise ValueError(f"Invalid target environment: {target}. Must be one of {list(TARGETS.keys())}")
+    return target, TARGETS[target]
@@ -0,0 +1,44 @@
+"""
+Token factory
+-------------
+Gets access tokens for the (synchronous) tests whose subject is not the
+authorization flow itself, by running `compliance_suite.flows.Flow.login()`
+on a private event loop.
+
+`access_token()` / `token_response()` return a token shared by every test in
+the session that asks for the same scope and user, so the flow runs once per
+worker instead of once per test. Tests that revoke or otherwise consume their
+token must call `issue()`, which always runs a fresh flow. A failing flow
+raises `compliance_suite.flows.StepFailed`.
+"""
+
+import asyncio
+from dataclasses import replace
+
+from compliance_suite.flows import Flow, Settings, new_client
+
+
+class TokenFactory:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._shared: dict[tuple, dict] = {}
+
+    def issue(self, scope: str = "openid", login: str = "max", password: str = "max", **params) -> dict:
+        """Runs a fresh flow and returns the token endpoint's JSON response."""
+        settings = replace(self.settings, login_id=login, password=password)
+        return asyncio.run(self._login(settings, scope, params))
+
+    @staticmethod
+    async def _login(settings: Settings, scope: str, params: dict) -> dict:
+        async with new_client(1) as client:
+            return (await Flow(client, settings).login(scope, **params)).raw
+
+    def token_response(self, scope: str = "openid", login: str = "max", password: str = "max") -> dict:
+        """Token response shared across the session; do not revoke it."""
+        key = (scope, login)
+        if key not in self._shared:
+            self._shared[key] = self.issue(scope, login, password)
+        return dict(self._shared[key])
+
+    def access_token(self, scope: str = "openid", login: str = "max", password: str = "max") -> str:
+        return self.token_response(scope, login, password)["access_token"]
@@ -1,12 +1,27 @@
-import os 
+import json
+from collections import defaultdict
+from pathlib import Path
+
+import dotenv
 import pytest
 import httpx
 from typing import Generator
 
-TARGETS = {
-    "JAVA" : "http://localhost:8080",
-    "PYTHON" : "http://localhost:8000"
-}
+from compliance_suite.targets import resolve_target
+from compliance_suite.flows import Settings
+from compliance_suite.tokens import TokenFactory
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+dotenv.load_dotenv(BASE_DIR / ".env")
+
+# nodeid -> {"worker": ..., "outcome": ..., "seconds": setup + call + teardown}
+TIMINGS: dict[str, dict] = defaultdict(lambda: {"worker": "main", "outcome": "passed", "seconds": 0.0})
+
+
+def pytest_addoption(parser):
+    parser.addoption("--timings-json", metavar="PATH", help="Write the per-test timings as JSON")
+    parser.addoption("--timings-top", type=int, default=15, help="Slowest tests listed in the summary (0: all)")
+
 
 @pytest.fixture(scope="session")
 def target_url() -> str:
@@ -15,11 +30,7 @@ def target_url() -> str:
     Defaults to JAVA for establishing the baseline.
     """
 
-    target_env = os.getenv("TARGET", "JAVA").upper()
-    if target_env not in TARGETS:
-        raise ValueError(f"Invalid target environment: {target_env}. Must be one of {list(TARGETS.keys())}")
-
-    url = TARGETS[target_env]
+    target_env, url = resolve_target()
     print(f"\nTesting target: {target_env} at {url}")
     return url
 
@@ -27,10 +38,53 @@ def target_url() -> str:
 def client() -> Generator[httpx.Client, None, None]:
     """
     Yields a synchronous HTTP client.
-    follow_redirects=False is CRITICAL for OAuth testing because 
-    we need to inspect the 'Location' header of 302 responses 
+    follow_redirects=False is CRITICAL for OAuth testing because
+    we need to inspect the 'Location' header of 302 responses
     instead of following them automatically.
     """
     with httpx.Client(follow_redirects=False, timeout=10.0) as client:
         yield client
-    
\ No newline at end of file
+
+@pytest.fixture(scope="session")
+def tokens(target_url: str) -> TokenFactory:
+    """
+    Issues access tokens for tests whose subject is not the authorization
+    flow itself. Session scope under xdist means one factory per worker, so
+    workers never share a ticket, code or session cookie.
+    """
+    target_env, _ = resolve_target()
+    return TokenFactory(Settings.from_env(target_env, target_url))
+
+
+def pytest_runtest_logreport(report):
+    timing = TIMINGS[report.nodeid]
+    node = getattr(report, "node", None)  # set on the xdist controller
+    if node is not None:
+        timing["worker"] = node.gateway.id
+    timing["seconds"] += report.duration
+    if report.failed:
+        timing["outcome"] = "failed"
+    elif report.skipped and timing["outcome"] == "passed":
+        timing["outcome"] = "skipped"
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    # Worker reports are forwarded to the controller, which prints the table
+    if hasattr(config, "workerinput") or not TIMINGS:
+        return
+    ranked = sorted(TIMINGS.items(), key=lambda item: item[1]["seconds"], reverse=True)
+    top = config.getoption("timings_top")
+    terminalreporter.section("test timings")
+    for nodeid, timing in ranked[:top or None]:
+        terminalreporter.write_line(f"{timing['seconds']:8.3f}s  {timing['worker']:<6} {timing['outcome']:<8} {nodeid}")
+    per_worker: dict[str, float] = defaultdict(float)
+    for timing in TIMINGS.values():
+        per_worker[timing["worker"]] += timing["seconds"]
+    terminalreporter.write_line(
+        "busy time per worker: " + ", ".join(f"{w} {s:.2f}s" for w, s in sorted(per_worker.items()))
+    )
+
+    path = config.getoption("timings_json")
+    if path:
+        Path(path).write_text(json.dumps(dict(ranked), indent=2) + "\n")
+        terminalreporter.write_line(f"wrote {path}")
@@ -1,6 +1,6 @@
 import pytest
 from httpx import Client
-import re
+from compliance_suite.flows import extract_ticket
 import os
 
 def test_authorization_decision_invalid_credentials_protocol_failure(client: Client, target_url: str):
@@ -20,10 +20,7 @@ def test_authorization_decision_invalid_credentials_protocol_failure(client: Cli
     assert init_res.status_code == 200
     
     # 2. Extract Ticket
-    ticket = None
-    m = re.search(r'name="ticket"\s+value="([^"]+)"', init_res.text)
-    if m:
-        ticket = m.group(1)
+    ticket = extract_ticket(init_res.text)
 
     # 3. Build Payload
     if "8080" in target_url:
@@ -63,9 +60,7 @@ def test_authorization_decision_form_post_mode(client: Client, target_url: str):
     
     init_res = client.get(f"{target_url}/api/authorization", params=params)
     
-    ticket = None
-    m = re.search(r'name="ticket"\s+value="([^"]+)"', init_res.text)
-    if m: ticket = m.group(1)
+    ticket = extract_ticket(init_res.text)
 
     if "8080" in target_url:
         form_data = {"loginId": "max", "password": "max", "authorized": "Authorize"}
@@ -1,75 +1,38 @@
 import pytest
 from httpx import Client
-import base64
-import os
-import re
+from compliance_suite.flows import StepFailed
+from compliance_suite.tokens import TokenFactory
 import dotenv
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 dotenv.load_dotenv(BASE_DIR / ".env")
 
-def test_grant_management_endpoint(client: Client, target_url: str):
+def test_grant_management_endpoint(client: Client, target_url: str, tokens: TokenFactory):
     """
     Scenario: A client creates a grant, queries it, explicitly revokes it, 
     and verifies it has been destroyed.
     """
-    CLIENT_ID = os.getenv("CLIENT_ID") 
-    CLIENT_SECRET = os.getenv("CLIENT_SECRET") 
-    REDIRECT_URI = os.getenv("REDIRECT_URI")
-    
     # -------------------------------------------------------------------------
     # 1. SETUP: Request a Grant ID and the Query Scope
     # -------------------------------------------------------------------------
-    params = {
-        "response_type": "code", 
-        "client_id": CLIENT_ID, 
-        "scope": "openid grant_management_query grant_management_revoke",
-        "redirect_uri": REDIRECT_URI,
-        "grant_management_action": "create"
-    }
-    
     # The unpatched Authlete SDK inside Docker will likely fail here
-    init_res = client.get(f"{target_url}/api/authorization", params=params)
-    
-    # --- BYPASS INJECTION ---
-    # Catch the server-side crash caused by the missing enum value
-    if init_res.status_code == 500:
-        pytest.skip(
-            "Bypassed: Known library mismatch detected. The containerized "
-            "Authlete SDK is missing the 'create' enum for GrantManagementAction. "
-            f"Server returned 500. Details: {init_res.text[:200]}"
+    try:
+        token_data = tokens.issue(
+            "openid grant_management_query grant_management_revoke",
+            login="max", password="max", grant_management_action="create",
         )
-    # ------------------------
-    
-    # Ensure we actually succeeded if we didn't hit the bypass
-    assert init_res.status_code in [200, 302], f"Unexpected status during auth: {init_res.status_code}"
-    
-    ticket = None
-    m = re.search(r'name="ticket"\s+value="([^"]+)"', init_res.text)
-    if m: ticket = m.group(1)
-
-    if "8080" in target_url:
-        form_data = {"loginId": "max", "password": "max", "authorized": "Authorize"}
-    else:
-        assert ticket is not None, "Failed to extract ticket from authorization response"
-        form_data = {"ticket": ticket, "subject": "max", "password": "max", "authorized": "true"}
-    
-    decision_res = client.post(f"{target_url}/api/authorization/decision", data=form_data, follow_redirects=False)
-    
-    assert decision_res.status_code in [302, 303], f"Expected redirect, got {decision_res.status_code}"
-    location = decision_res.headers.get("Location", "")
-    
-    code_match = re.search(r'code=([^&]+)', location)
-    assert code_match is not None, "Authorization code not found in redirect URL"
-    auth_code = code_match.group(1)
-
-    encoded_creds = base64.b64encode(f"{CLIENT_ID}:{CLIENT_SECRET}".encode()).decode()
-    token_payload = {"grant_type": "authorization_code", "code": auth_code, "redirect_uri": REDIRECT_URI}
-    token_headers = {"Authorization": f"Basic {encoded_creds}", "Content-Type": "application/x-www-form-urlencoded"}
-    
-    token_res = client.post(f"{target_url}/api/token", data=token_payload, headers=token_headers)
-    token_data = token_res.json()
+    except StepFailed as e:
+        # --- BYPASS INJECTION ---
+        # Catch the server-side crash caused by the missing enum value
+        if e.step == "authorization" and e.status_code == 500:
+            pytest.skip(
+                "Bypassed: Known library mismatch detected. The containerized "
+                "Authlete SDK is missing the 'create' enum for GrantManagementAction. "
+                f"Server returned 500. Details: {e}"
+            )
+        # ------------------------
+        raise
     
     access_token = token_data.get("access_token")
     grant_id = token_data.get("grant_id")
@@ -0,0 +1,114 @@
+import pytest
+from httpx import Client
+from compliance_suite.tokens import TokenFactory
+import base64
+import os
+import secrets
+import dotenv
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+dotenv.load_dotenv(BASE_DIR / ".env")
+
+# INTROSPECTION_BATCH_MAX_TOKENS on the server (its default)
+MAX_TOKENS = 100
+
+
+def _basic(client_id: str, secret: str) -> dict:
+    credentials = base64.b64encode(f"{client_id}:{secret}".encode()).decode()
+    return {"Authorization": f"Basic {credentials}"}
+
+
+def _rs_headers() -> dict:
+    return _basic(os.getenv("RS_CLIENT_ID"), os.getenv("RS_CLIENT_SECRET"))
+
+
+def _batch(client: Client, target_url: str, tokens: list[str], headers: dict):
+    res = client.post(f"{target_url}/api/introspection/batch", json={"tokens": tokens}, headers=headers)
+    print(f"\n[Batch Introspection Status] {res.status_code}")
+    if res.status_code == 404:
+        pytest.skip("Target has no batch introspection endpoint")
+    return res
+
+
+def test_batch_introspection_mixed_tokens(client: Client, target_url: str, tokens: TokenFactory):
+    """
+    Scenario: A Resource Server introspects an active token, a revoked one,
+    an unknown one and the active one again in a single batch.
+    Expected: 200 with one result per submitted token, in order, each what
+    /api/introspection would have answered for it.
+    """
+    CLIENT_ID = os.getenv("CLIENT_ID")
+    CLIENT_SECRET = os.getenv("CLIENT_SECRET")
+
+    # -------------------------------------------------------------------------
+    # 1. SETUP: One active token, one revoked token (fresh, never shared)
+    # -------------------------------------------------------------------------
+    active_token = tokens.access_token("openid profile email", login="max", password="max")
+    revoked_token = tokens.issue("openid", login="max", password="max")["access_token"]
+
+    rev_res = client.post(f"{target_url}/api/revocation", data={"token": revoked_token},
+                          headers=_basic(CLIENT_ID, CLIENT_SECRET))
+    assert rev_res.status_code == 200, "Revocation MUST return 200 OK"
+
+    # -------------------------------------------------------------------------
+    # 2. TEST: Introspect them together
+    # -------------------------------------------------------------------------
+    unknown_token = secrets.token_urlsafe(32)
+    batch = [active_token, revoked_token, unknown_token, active_token]
+    res = _batch(client, target_url, batch, _rs_headers())
+    print(res.text)
+
+    # -------------------------------------------------------------------------
+    # 3. INVARIANTS
+    # -------------------------------------------------------------------------
+    assert res.status_code == 200, "Batch introspection request failed"
+    results = res.json()["results"]
+    assert len(results) == len(batch), "There MUST be one result per submitted token"
+    assert all(result["status"] == 200 for result in results)
+
+    active, revoked, unknown, repeated = (result["body"] for result in results)
+    assert active["active"] is True, "Token should be reported as active"
+    assert str(active["client_id"]) == CLIENT_ID
+    assert revoked == {"active": False}, "A revoked token MUST be reported as inactive, and nothing else"
+    assert unknown == {"active": False}, "An unknown token MUST be reported as inactive, and nothing else"
+    assert repeated == active, "A token listed twice gets the same answer twice"
+
+
+def test_batch_introspection_token_limit(client: Client, target_url: str):
+    """
+    Scenario: A Resource Server sends a batch of exactly the maximum size,
+    then one token more.
+    Expected: The first batch is answered in full, the second is refused
+    with 413 before any token is introspected.
+    """
+    token = secrets.token_urlsafe(32)
+
+    res = _batch(client, target_url, [token] * MAX_TOKENS, _rs_headers())
+    assert res.status_code == 200, f"A batch of {MAX_TOKENS} tokens MUST be accepted"
+    assert len(res.json()["results"]) == MAX_TOKENS
+
+    res = _batch(client, target_url, [token] * (MAX_TOKENS + 1), _rs_headers())
+    assert res.status_code == 413, f"A batch of more than {MAX_TOKENS} tokens MUST be refused"
+    assert res.json()["error"] == "invalid_request"
+
+
+@pytest.mark.parametrize("headers", [
+    {},
+    _basic("rs0", "not-the-secret"),
+    _basic("no-such-resource-server", "secret"),
+], ids=["no credentials", "wrong secret", "unknown resource server"])
+def test_batch_introspection_requires_resource_server(client: Client, target_url: str, tokens: TokenFactory,
+                                                      headers: dict):
+    """
+    Scenario: A caller without valid Resource Server credentials submits
+    an active token.
+    Expected: 401, and nothing about the token in the response.
+    """
+    active_token = tokens.access_token("openid profile email", login="max", password="max")
+
+    res = _batch(client, target_url, [active_token], headers)
+
+    assert res.status_code == 401, "Batch introspection MUST authenticate the Resource Server"
+    assert "results" not in res.text
+    assert "client_id" not in res.text
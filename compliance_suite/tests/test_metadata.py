@@ -45,4 +45,24 @@ def test_jwks_endpoint(client: Client, target_url: str):
     first_key = data["keys"][0]
     assert "kty" in first_key, "Key must have a key type (kty), usually 'RSA' or 'EC'"
     assert "use" in first_key, "Key should define its use (e.g., 'sig' for signature)"
-    assert "kid" in first_key, "Key should have a Key ID (kid) for cache rotation"
\ No newline at end of file
+    assert "kid" in first_key, "Key should have a Key ID (kid) for cache rotation"
+
+
+def test_discovery_conditional_get(client: Client, target_url: str):
+    """
+    Scenario: Client re-fetches the discovery document with If-None-Match.
+    Expected: A 304 Not Modified with an empty body when the ETag still matches.
+    """
+    res = client.get(f"{target_url}/.well-known/openid-configuration")
+    assert res.status_code == 200
+
+    etag = res.headers.get("ETag")
+    if etag is None:
+        pytest.skip("Target does not emit an ETag for the discovery document")
+
+    revalidate_res = client.get(f"{target_url}/.well-known/openid-configuration", headers={"If-None-Match": etag})
+
+    print(f"\n[Discovery Revalidation Status] {revalidate_res.status_code}")
+    assert revalidate_res.status_code == 304, "Matching If-None-Match should yield 304 Not Modified"
+    assert revalidate_res.content == b"", "304 responses must not carry a body"
+    assert revalidate_res.headers.get("ETag") == etag
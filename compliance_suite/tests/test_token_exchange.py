@@ -1,5 +1,6 @@
 import pytest
 from httpx import Client
+from compliance_suite.flows import extract_ticket
 import re
 import base64
 import os
@@ -31,9 +32,7 @@ def test_successful_token_exchange(client: Client, target_url: str):
     init_res = client.get(f"{target_url}/api/authorization", params=params)
     assert init_res.status_code == 200
     
-    ticket = None
-    m = re.search(r'name="ticket"\s+value="([^"]+)"', init_res.text)
-    if m: ticket = m.group(1)
+    ticket = extract_ticket(init_res.text)
 
     # Use the 'john' credentials you just standardized
     if "8080" in target_url:
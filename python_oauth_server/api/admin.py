@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends
+from authlete_client import AuthleteClientRegistry, get_registry
+from cache import IntrospectionCache, MetadataCache, NegativeTokenCache, SharedCacheClient, get_introspection_cache, get_metadata_cache, get_negative_token_cache, get_shared_cache
+from observability import LoggingSetup, Tracer, get_logging_setup, get_tracer
+from security import AccessTokenValidator, PasswordVerifier, ResourceServerAuthenticator, get_access_token_validator, get_password_verifier, get_resource_server_authenticator, require_admin
+
+# Only with ADMIN_TOKEN set, and only for requests that send it (security/admin_token.py)
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/admin/authlete/pool")
+async def authlete_pool_endpoint(registry: AuthleteClientRegistry = Depends(get_registry)):
+    """
+    Connection pool statistics for the shared Authlete client
+    (open, idle and in-use connections, and requests that waited for one).
+    """
+    return registry.pool_stats()
+
+@router.get("/admin/authlete/single_flight")
+async def authlete_single_flight_endpoint(registry: AuthleteClientRegistry = Depends(get_registry)):
+    """
+    Upstream calls made for coalescable operations, and identical calls
+    that shared one of them instead of making their own.
+    """
+    return registry.single_flight_stats()
+
+@router.get("/admin/authlete/breakers")
+async def authlete_breakers_endpoint(registry: AuthleteClientRegistry = Depends(get_registry)):
+    """
+    Circuit breaker state per Authlete operation and bulkhead occupancy per
+    operation group.
+    """
+    return registry.resilience_stats()
+
+@router.get("/admin/cache/metadata")
+async def metadata_cache_endpoint(metadata_cache: MetadataCache = Depends(get_metadata_cache)):
+    """
+    Hit/miss/refresh counters of the well-known metadata cache.
+    """
+    return metadata_cache.stats()
+
+@router.get("/admin/cache/introspection")
+async def introspection_cache_endpoint(introspection_cache: IntrospectionCache | None = Depends(get_introspection_cache)):
+    """
+    Hit/miss/eviction counters of the introspection cache.
+    """
+    if introspection_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **introspection_cache.stats()}
+
+@router.get("/admin/cache/negative")
+async def negative_token_cache_endpoint(negative_cache: NegativeTokenCache | None = Depends(get_negative_token_cache)):
+    """
+    Per-endpoint hit/miss/store counters of the negative token cache.
+    """
+    if negative_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **negative_cache.stats()}
+
+@router.get("/admin/cache/shared")
+async def shared_cache_endpoint(shared_cache: SharedCacheClient | None = Depends(get_shared_cache)):
+    """
+    This worker's calls to the shared cache server, and the server's own
+    entry and hit counters.
+    """
+    if shared_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "client": shared_cache.stats(), "server": await shared_cache.server_stats()}
+
+@router.get("/admin/passwords")
+async def password_verifier_endpoint(password_verifier: PasswordVerifier = Depends(get_password_verifier)):
+    """
+    Password hashing pool settings and verification / rehash counters.
+    """
+    return password_verifier.stats()
+
+@router.get("/admin/cache/resource_servers")
+async def resource_server_auth_cache_endpoint(rs_authenticator: ResourceServerAuthenticator = Depends(get_resource_server_authenticator)):
+    """
+    Hit/miss counters of the verified resource server credential cache.
+    """
+    return rs_authenticator.stats()
+
+@router.get("/admin/access_tokens")
+async def access_token_validator_endpoint(validator: AccessTokenValidator | None = Depends(get_access_token_validator)):
+    """
+    Local JWT access token checks: verified, cached and rejected tokens (by
+    reason), and JWKS refetches for unknown key IDs.
+    """
+    if validator is None:
+        return {"enabled": False}
+    return {"enabled": True, **validator.stats()}
+
+@router.get("/admin/logging")
+async def logging_endpoint(logging_setup: LoggingSetup = Depends(get_logging_setup)):
+    """
+    Log records waiting to be written, and records dropped because the queue was full.
+    """
+    return logging_setup.stats()
+
+@router.get("/admin/tracing")
+async def tracing_endpoint(tracer: Tracer | None = Depends(get_tracer)):
+    """
+    Exported, queued and dropped span counters of the trace exporter.
+    """
+    if tracer is None:
+        return {"enabled": False}
+    return tracer.stats()
@@ -1,20 +1,21 @@
-from fastapi import APIRouter, Request, Response
-from urllib.parse import urlencode
-from authlete.api.authlete_api_impl import AuthleteApiImpl
-from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
+from fastapi import APIRouter, Request, Depends
+from authlete_client import AsyncAuthleteApi, get_authlete_api
+from authlete.dto import AuthorizationAction
 from authlete.dto.authorization_request import AuthorizationRequest
-from fastapi.templating import Jinja2Templates
-import json
+from api.consent_page import ConsentPage, ConsentScope, get_consent_page
+from api.form_body import read_form_body
+from api.responses import AUTHORIZATION_RESPONSES
+from observability import get_logger
+from observability.tracing import start_span
 
 router = APIRouter()
-conf = AuthleteIniConfiguration("authlete.properties")
-authlete_api = AuthleteApiImpl(conf)
 
-templates = Jinja2Templates(directory="templates")
+log = get_logger(__name__)
 
 # RFC 6749: MUST support GET and POST
 @router.api_route("/api/authorization", methods=["GET", "POST"])
-async def authorization_endpoint(request: Request):
+async def authorization_endpoint(request: Request, authlete_api: AsyncAuthleteApi = Depends(get_authlete_api),
+                                 consent_page: ConsentPage = Depends(get_consent_page)):
     """
     Complete Action Dispatcher for the Authorization Endpoint.
     """
@@ -22,53 +23,25 @@ async def authorization_endpoint(request: Request):
     if request.method == "GET":
         parameters = request.url.query
     else:
-        form_data = await request.form()
-        parameters = urlencode(form_data) # Convert form to URL-encoded string
+        parameters = (await read_form_body(request)).parameters # Raw urlencoded body, forwarded as-is
 
     # 2. Call Authlete
     authlete_req = AuthorizationRequest()
     authlete_req.parameters = parameters
-    authlete_res = authlete_api.authorization(authlete_req)
+    authlete_res = await authlete_api.authorization(authlete_req)
 
-    print("ticket before authorization: ", json.dumps(authlete_res.ticket, indent=4))    
-    
-    # In authlete-python, the action is an Enum. We get its name.
-    action = authlete_res.action.name if hasattr(authlete_res.action, 'name') else str(authlete_res.action)
+    # Only built when DEBUG is enabled for this endpoint; the ticket is redacted
+    log.debug("authorization.response", action=authlete_res.action, ticket=authlete_res.ticket,
+              client_id=lambda: authlete_res.client.clientId if authlete_res.client else None)
 
     # 3. The Complete Action Switch (Mirroring Java Reference)
-    if action == "BAD_REQUEST":
-        return Response(
-            content=authlete_res.responseContent,
-            status_code=400,
-            media_type="application/json",
-            headers={"Cache-Control": "no-store", "Pragma": "no-cache"}
-        )
-        
-    elif action == "INTERACTION":
-        # TODO: Phase 2 - Render Jinja2 Login Form, save ticket to session
-        return templates.TemplateResponse(
-            "authorization.html",
-            {"request": request, "ticket": authlete_res.ticket}
-        )
-        
-    elif action == "LOCATION":
-        # 302 Redirect back to the client application
-        return Response(
-            status_code=302,
-            headers={"Location": authlete_res.responseContent, "Cache-Control": "no-store"}
-        )
-        
-    elif action == "NO_INTERACTION":
-        # Client requested prompt=none, but user is not logged in.
-        # Authlete generates the redirect back to the client with an error.
-        return Response(
-            status_code=302,
-            headers={"Location": authlete_res.responseContent, "Cache-Control": "no-store"}
-        )
-        
-    else: # INTERNAL_SERVER_ERROR
-        return Response(
-            content=authlete_res.responseContent,
-            status_code=500,
-            media_type="application/json"
-        )
\ No newline at end of file
+    if authlete_res.action is AuthorizationAction.INTERACTION:
+        # Login / consent form, from the template compiled at startup (api/consent_page.py)
+        client = authlete_res.client
+        client_name = (client.clientName or str(client.clientId)) if client else ""
+        scopes = [ConsentScope(scope.name, scope.description or "") for scope in authlete_res.scopes or () if scope.name]
+        with start_span("template.render", attributes={"template": "authorization.html"}):
+            return consent_page.response(authlete_res.ticket, client_name, scopes)
+
+    # BAD_REQUEST, LOCATION, NO_INTERACTION, FORM, INTERNAL_SERVER_ERROR
+    return AUTHORIZATION_RESPONSES.respond(authlete_res)
@@ -1,83 +1,80 @@
 import json
 import time
-from fastapi import APIRouter, Request, Response, Form
-from authlete.api.authlete_api_impl import AuthleteApiImpl
-from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, BackgroundTasks, Request, Form, Depends
+from authlete_client import AsyncAuthleteApi, get_authlete_api
 from authlete.dto.authorization_issue_request import AuthorizationIssueRequest
 from authlete.dto.authorization_fail_request import AuthorizationFailRequest
+from api.responses import AUTHORIZATION_FAIL_RESPONSES, AUTHORIZATION_ISSUE_RESPONSES
 from db.user_dao import UserDao
+from security import PasswordVerifier, get_password_verifier
 try:
     from authlete.types.authorization_fail_reason import AuthorizationFailReason
 except ModuleNotFoundError:
     from authlete.dto.authorization_fail_reason import AuthorizationFailReason
+from observability import get_logger
 
 router = APIRouter()
-conf = AuthleteIniConfiguration("authlete.properties")
-authlete_api = AuthleteApiImpl(conf)
-templates = Jinja2Templates(directory="templates")
+log = get_logger(__name__)
+
+
+async def upgrade_password(password_verifier: PasswordVerifier, login_id: str, password: str):
+    # Runs after the redirect has been sent; a failed upgrade only means the
+    # old hash stays until the next successful login.
+    try:
+        await UserDao.update_password(login_id, await password_verifier.hash(password))
+    except Exception:
+        log.warning("authorization_decision.password_upgrade_failed", login_id=login_id, exc_info=True)
+
 
 @router.post("/api/authorization/decision")
 async def authorization_decision_endpoint(
     request: Request,
+    background_tasks: BackgroundTasks,
     ticket: str = Form(...),
     subject: str = Form(None),
     password: str = Form(None),
-    authorized: str = Form(...)
+    authorized: str = Form(...),
+    authlete_api: AsyncAuthleteApi = Depends(get_authlete_api),
+    password_verifier: PasswordVerifier = Depends(get_password_verifier)
 ):
     if authorized == "true":
         
         # Look up user record
-        user_record = UserDao.get_by_login_id(subject)
+        user_record = await UserDao.get_by_login_id(subject)
 
         # 1. AUTHENTICATION CHECK
-        if not user_record or user_record['password'] != password:
+        # The KDF runs on the password pool, and an unknown user costs the
+        # same as a wrong password.
+        stored_password = user_record.password if user_record else None
+        if not await password_verifier.verify(stored_password, password):
             # Match Java Behavior: Abort the flow immediately.
             fail_request = AuthorizationFailRequest()
             fail_request.ticket = ticket
             fail_request.reason = AuthorizationFailReason.NOT_AUTHENTICATED
             
-            authlete_res = authlete_api.authorizationFail(fail_request)
-            return Response(
-                status_code=302, 
-                headers={"Location": authlete_res.responseContent, "Cache-Control": "no-store"}
-            )
+            authlete_res = await authlete_api.authorizationFail(fail_request)
+            log.debug("authorization_decision.fail_response", action=authlete_res.action)
+            return AUTHORIZATION_FAIL_RESPONSES.respond(authlete_res)
+
+        # Plaintext or outdated hash: re-hash with the current parameters
+        if password_verifier.needs_rehash(stored_password):
+            background_tasks.add_task(upgrade_password, password_verifier, user_record.login_id, password)
 
         # 2. AUTHORIZATION (The Happy Path)
         issue_request = AuthorizationIssueRequest()
         issue_request.ticket = ticket
-        issue_request.subject = user_record['subject']
+        issue_request.subject = user_record.subject
 
         # 4. FIX: ADD AUTH_TIME (Current time in seconds since epoch)
         issue_request.authTime = int(time.time())
 
         # Ask authlete to issue the code
-        authlete_res = authlete_api.authorizationIssue(issue_request)
-        action = authlete_res.action.name if hasattr(authlete_res.action, 'name') else str(authlete_res.action)
+        authlete_res = await authlete_api.authorizationIssue(issue_request)
+        log.debug("authorization_decision.issue_response", action=authlete_res.action)
 
-        # Handle the OIDC state machine
-        if action == "LOCATION":
-            # Standard Authorization Code flow
-            return Response(
-                status_code=302, 
-                headers={"Location": authlete_res.responseContent, "Cache-Control": "no-store"}
-            )
-        elif action == "FORM":
-            # Hybrid Flow or form_post response mode
-            return Response(
-                content=authlete_res.responseContent,
-                status_code=200,
-                media_type="text/html;charset=UTF-8",
-                headers={"Cache-Control": "no-store"}
-            )
-        else:
-            # Fallback for INTERNAL_SERVER_ERROR or unexpected actions
-            # FIX: Ensure we return the string content, not the Python object
-            return Response(
-                content=authlete_res.responseContent, 
-                status_code=500,
-                media_type="application/json"
-            )
+        # Handle the OIDC state machine: LOCATION for the standard code flow,
+        # FORM for form_post / hybrid, otherwise an error
+        return AUTHORIZATION_ISSUE_RESPONSES.respond(authlete_res)
 
     else:
         # 3. USER DENIED CONSENT
@@ -85,5 +82,6 @@ async def authorization_decision_endpoint(
         fail_request.ticket = ticket
         fail_request.reason = AuthorizationFailReason.DENIED
 
-        authlete_res = authlete_api.authorizationFail(fail_request)
-        return Response(status_code=302, headers={"Location": authlete_res.responseContent, "Cache-Control": "no-store"})
\ No newline at end of file
+        authlete_res = await authlete_api.authorizationFail(fail_request)
+        log.debug("authorization_decision.fail_response", action=authlete_res.action)
+        return AUTHORIZATION_FAIL_RESPONSES.respond(authlete_res)
\ No newline at end of file
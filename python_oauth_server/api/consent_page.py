@@ -0,0 +1,62 @@
+"""
+Consent page rendering
+----------------------
+The INTERACTION answer of `/api/authorization` is the login / consent form
+in templates/authorization.html. It used to go through
+`Jinja2Templates.TemplateResponse` on every request: a template lookup with
+an up-to-date check of the file, a full render and a context dict per page.
+
+`ConsentPage.from_env()` runs once, in the lifespan. It builds one Jinja
+`Environment` (autoescape on, no reload checks) and compiles the template
+through a `FileSystemBytecodeCache`, so later starts skip the compile. A
+request is then a plain `render()` of the compiled template into an
+HTMLResponse; the ticket, client name and scopes are escaped by Jinja.
+
+    TEMPLATE_CACHE_DIR   bytecode cache directory (default: the system temp dir)
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+from api.responses import NO_STORE
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+TEMPLATE_NAME = "authorization.html"
+
+
+@dataclass(frozen=True, slots=True)
+class ConsentScope:
+    name: str
+    description: str = ""
+
+
+class ConsentPage:
+    def __init__(self, template: Template):
+        self.template = template
+
+    @classmethod
+    def from_env(cls) -> "ConsentPage":
+        environment = Environment(
+            loader=FileSystemLoader(TEMPLATES_DIR),
+            autoescape=True,
+            # Compiled once; editing the template needs a restart
+            auto_reload=False,
+            bytecode_cache=FileSystemBytecodeCache(os.getenv("TEMPLATE_CACHE_DIR") or None),
+        )
+        return cls(environment.get_template(TEMPLATE_NAME))
+
+    def render(self, ticket: str, client_name: str, scopes: list[ConsentScope]) -> str:
+        return self.template.render(ticket=ticket, client_name=client_name, scopes=scopes)
+
+    def response(self, ticket: str, client_name: str, scopes: list[ConsentScope]) -> HTMLResponse:
+        return HTMLResponse(self.render(ticket, client_name, scopes), headers=dict(NO_STORE))
+
+
+def get_consent_page(request: Request) -> ConsentPage:
+    """FastAPI dependency returning the consent page compiled at startup."""
+    return request.app.state.consent_page
@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Request, Response
-from authlete.api.authlete_api_impl import AuthleteApiImpl
-from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
+from fastapi import APIRouter, Request, Depends
+from authlete_client import AsyncAuthleteApi, get_authlete_api
 from authlete.dto.credential_single_issue_request import CredentialSingleIssueRequest
+from authlete.dto import CredentialSingleIssueAction
 from authlete.dto.credential_issuance_order import CredentialIssuanceOrder
+from api.responses import CREDENTIAL_SINGLE_ISSUE_RESPONSES
+from security import AccessTokenValidator, get_access_token_validator
+from observability import get_logger
 
 router = APIRouter()
-conf = AuthleteIniConfiguration("authlete.properties")
-authlete_api = AuthleteApiImpl(conf)
+log = get_logger(__name__)
 
 @router.post("/api/credential")
-async def credential_endpoint(request: Request):
+async def credential_endpoint(
+    request: Request,
+    authlete_api: AsyncAuthleteApi = Depends(get_authlete_api),
+    token_validator: AccessTokenValidator | None = Depends(get_access_token_validator)
+):
     """
     OID4VCI Credential Endpoint.
     Validates the Access Token and issues a Verifiable Credential.
@@ -18,6 +24,13 @@ async def credential_endpoint(request: Request):
     auth_header = request.headers.get("Authorization", "")
     access_token = auth_header.replace("Bearer ", "").strip() if auth_header.startswith("Bearer ") else None
 
+    # Malformed, expired or forged JWT access tokens never reach Authlete
+    if token_validator is not None and access_token:
+        rejection = await token_validator.check(access_token)
+        if rejection is not None:
+            spec = CREDENTIAL_SINGLE_ISSUE_RESPONSES.spec(CredentialSingleIssueAction.UNAUTHORIZED)
+            return spec.respond(rejection.www_authenticate)
+
     # 2. Extract the JSON payload
     try:
         request_body = await request.json()
@@ -34,31 +47,8 @@ async def credential_endpoint(request: Request):
     req.accessToken = access_token
     req.order = order
     
-    res = authlete_api.credentialSingleIssue(req)
-    action = res.action.name if hasattr(res.action, 'name') else str(res.action)
-
-    # 4. Handle the Protocol Response
-    status_code = 400
-    headers = {}
-    
-    if action == "OK":
-        status_code = 200
-    elif action == "BAD_REQUEST":
-        status_code = 400
-    elif action == "UNAUTHORIZED":
-        status_code = 401
-        # Authlete provides the exact WWW-Authenticate header string we need
-        if res.responseContent:
-            headers["WWW-Authenticate"] = res.responseContent
-            return Response(status_code=status_code, headers=headers)
-    elif action == "FORBIDDEN":
-        status_code = 403
-    elif action == "INTERNAL_SERVER_ERROR":
-        status_code = 500
+    res = await authlete_api.credentialSingleIssue(req)
+    log.debug("credential.response", action=res.action)
 
-    return Response(
-        content=res.responseContent,
-        status_code=status_code,
-        media_type="application/json",
-        headers=headers
-    )
\ No newline at end of file
+    # 4. Handle the Protocol Response (UNAUTHORIZED goes out as WWW-Authenticate)
+    return CREDENTIAL_SINGLE_ISSUE_RESPONSES.respond(res)
\ No newline at end of file
@@ -1,37 +1,35 @@
-from fastapi import APIRouter, Response
-from authlete.api.authlete_api_impl import AuthleteApiImpl
-from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
+from fastapi import APIRouter, Request, Depends
+from authlete_client import AsyncAuthleteApi, get_authlete_api
 from authlete.dto.credential_issuer_metadata_request import CredentialIssuerMetadataRequest
+from api.responses import CREDENTIAL_ISSUER_METADATA_RESPONSES
+from cache import CachedDocument, MetadataCache, get_metadata_cache
+from observability import get_logger
 
 router = APIRouter()
-conf = AuthleteIniConfiguration("authlete.properties")
-authlete_api = AuthleteApiImpl(conf)
+log = get_logger(__name__)
 
 @router.get("/.well-known/openid-credential-issuer")
-async def credential_issuer_metadata_endpoint():
+async def credential_issuer_metadata_endpoint(
+    request: Request,
+    authlete_api: AsyncAuthleteApi = Depends(get_authlete_api),
+    metadata_cache: MetadataCache = Depends(get_metadata_cache)
+):
     """
     OID4VCI Credential Issuer Metadata Endpoint.
     Returns the configurations of Verifiable Credentials this IdP can issue.
     """
-    # 1. Instantiate the empty request DTO
-    req = CredentialIssuerMetadataRequest()
-    
-    # 2. Pass the request object to the SDK
-    res = authlete_api.credentialIssuerMetadata(req)
-    
-    # 3. Process the response
-    action = res.action.name if hasattr(res.action, 'name') else str(res.action)
+    async def load():
+        # 1. Instantiate the empty request DTO
+        req = CredentialIssuerMetadataRequest()
 
-    status_code = 400
-    if action == "OK":
-        status_code = 200
-    elif action == "NOT_FOUND":
-        status_code = 404
-    elif action == "INTERNAL_SERVER_ERROR":
-        status_code = 500
-        
-    return Response(
-        content=res.responseContent,
-        status_code=status_code,
-        media_type="application/json"
-    )
\ No newline at end of file
+        # 2. Pass the request object to the SDK
+        res = await authlete_api.credentialIssuerMetadata(req)
+        log.debug("credential_issuer_metadata.response", action=res.action)
+
+        # 3. Process the response
+        spec = CREDENTIAL_ISSUER_METADATA_RESPONSES.spec(res.action)
+        return CachedDocument.build((res.responseContent or "").encode(), spec.media_type, spec.status_code)
+
+    # Only the OK document is cached; errors are passed through and retried next time
+    document = await metadata_cache.get("openid-credential-issuer", load)
+    return metadata_cache.respond(request, document)
@@ -1,40 +1,35 @@
-from fastapi import APIRouter, Response
-from authlete.api.authlete_api_impl import AuthleteApiImpl
-from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
+from fastapi import APIRouter, Request, Depends
+from authlete_client import AsyncAuthleteApi, get_authlete_api
 from authlete.dto.federation_configuration_request import FederationConfigurationRequest
+from api.responses import FEDERATION_CONFIGURATION_RESPONSES
+from cache import CachedDocument, MetadataCache, get_metadata_cache
+from observability import get_logger
 
 router = APIRouter()
-conf = AuthleteIniConfiguration("authlete.properties")
-authlete_api = AuthleteApiImpl(conf)
+log = get_logger(__name__)
 
 @router.get("/.well-known/openid-federation")
-async def federation_configuration_endpoint():
+async def federation_configuration_endpoint(
+    request: Request,
+    authlete_api: AsyncAuthleteApi = Depends(get_authlete_api),
+    metadata_cache: MetadataCache = Depends(get_metadata_cache)
+):
     """
     OpenID Federation 1.0 Entity Configuration Endpoint.
     Returns a signed JWT representing this Identity Provider's trust metadata.
     """
-    # 1. Prepare the request (No parameters required for the default IdP configuration)
-    req = FederationConfigurationRequest()
-    
-    # 2. Call Authlete's Federation Configuration API
-    res = authlete_api.federationConfiguration(req)
-    action = res.action.name if hasattr(res.action, 'name') else str(res.action)
+    async def load():
+        # 1. Prepare the request (No parameters required for the default IdP configuration)
+        req = FederationConfigurationRequest()
 
-    # 3. Handle the Protocol Response
-    status_code = 400
-    media_type = "application/json"
-    
-    if action == "OK":
-        status_code = 200
-        # The specification STRICTLY requires this content type
-        media_type = "application/entity-statement+jwt"
-    elif action == "NOT_FOUND":
-        status_code = 404
-    elif action == "INTERNAL_SERVER_ERROR":
-        status_code = 500
+        # 2. Call Authlete's Federation Configuration API
+        res = await authlete_api.federationConfiguration(req)
+        log.debug("federation_configuration.response", action=res.action)
 
-    return Response(
-        content=res.responseContent,
-        status_code=status_code,
-        media_type=media_type
-    )
\ No newline at end of file
+        # 3. Handle the Protocol Response (OK is application/entity-statement+jwt, as the spec requires)
+        spec = FEDERATION_CONFIGURATION_RESPONSES.spec(res.action)
+        return CachedDocument.build((res.responseContent or "").encode(), spec.media_type, spec.status_code)
+
+    # The signed entity configuration carries its own exp, which is well beyond the cache TTL
+    document = await metadata_cache.get("openid-federation", load)
+    return metadata_cache.respond(request, document)
@@ -1,14 +1,14 @@
-from fastapi import APIRouter, Request, Response
-from authlete.api.authlete_api_impl import AuthleteApiImpl
-from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
+from fastapi import APIRouter, Request, Depends
+from authlete_client import AsyncAuthleteApi, get_authlete_api
 from authlete.dto.federation_registration_request import FederationRegistrationRequest
+from api.responses import FEDERATION_REGISTRATION_RESPONSES
+from observability import get_logger
 
 router = APIRouter()
-conf = AuthleteIniConfiguration("authlete.properties")
-authlete_api = AuthleteApiImpl(conf)
+log = get_logger(__name__)
 
 @router.post("/api/federation/register")
-async def federation_registration_endpoint(request: Request):
+async def federation_registration_endpoint(request: Request, authlete_api: AsyncAuthleteApi = Depends(get_authlete_api)):
     """
     OpenID Federation Explicit Registration Endpoint.
     Accepts an Entity Statement (JWT) and registers the client if the Trust Chain is valid.
@@ -21,22 +21,8 @@ async def federation_registration_endpoint(request: Request):
     req = FederationRegistrationRequest()
     req.entityConfiguration = entity_statement
     
-    res = authlete_api.federationRegistration(req)
-    action = res.action.name if hasattr(res.action, 'name') else str(res.action)
+    res = await authlete_api.federationRegistration(req)
+    log.debug("federation_registration.response", action=res.action)
 
-    # 3. Handle the Protocol Response
-    status_code = 400
-    media_type = "application/json"
-    
-    if action == "CREATED":
-        status_code = 201
-    elif action == "BAD_REQUEST":
-        status_code = 400
-    elif action == "INTERNAL_SERVER_ERROR":
-        status_code = 500
-
-    return Response(
-        content=res.responseContent,
-        status_code=status_code,
-        media_type=media_type
-    )
\ No newline at end of file
+    # 3. Handle the Protocol Response (OK carries the signed entity statement)
+    return FEDERATION_REGISTRATION_RESPONSES.respond(res)
\ No newline at end of file
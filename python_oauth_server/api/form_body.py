@@ -0,0 +1,98 @@
+"""
+Raw form pass-through
+---------------------
+Authlete takes the client's request parameters as one urlencoded string, so
+parsing the body into a multidict with `request.form()` only to `urlencode()`
+it again is wasted work (and not even byte-for-byte: re-encoding normalizes
+escapes). `read_form_body` reads an `application/x-www-form-urlencoded` body
+once, forwards it unchanged as `parameters`, and scans it for just the few
+fields the router needs, decoding only those values.
+
+Bodies larger than `FORM_MAX_BYTES` (default 1 MiB) are rejected with 413
+before they are buffered. The limit is read once, in the lifespan, into
+`FormSettings` on `app.state.form_settings`. Other content types fall back
+to `request.form()` so behavior for them is unchanged.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import NamedTuple
+from urllib.parse import unquote_plus, urlencode
+
+from fastapi import HTTPException, Request
+
+from observability.tracing import start_span
+
+FORM_CONTENT_TYPE = "application/x-www-form-urlencoded"
+
+
+@dataclass(frozen=True)
+class FormSettings:
+    max_bytes: int = 1024 * 1024
+
+    @classmethod
+    def from_env(cls) -> "FormSettings":
+        return cls(max_bytes=int(os.getenv("FORM_MAX_BYTES", cls.max_bytes)))
+
+
+class FormBody(NamedTuple):
+    parameters: str
+    fields: dict[str, str]
+
+
+def scan_form_fields(body: str, names) -> dict[str, str]:
+    """
+    Returns the decoded values of `names` found in an urlencoded body.
+    Walks the pairs in place (no split into a list); keys are only decoded when
+    they contain an escape, values only when the key is wanted. Like
+    `request.form()`, the last occurrence of a repeated field wins.
+    """
+    fields = {}
+    length = len(body)
+    start = 0
+    while start < length:
+        end = body.find("&", start)
+        if end < 0:
+            end = length
+        equals = body.find("=", start, end)
+        key_end = end if equals < 0 else equals
+        key = body[start:key_end]
+        if "%" in key or "+" in key:
+            key = unquote_plus(key)
+        if key in names:
+            fields[key] = unquote_plus(body[key_end + 1:end]) if equals >= 0 else ""
+        start = end + 1
+    return fields
+
+
+async def read_body(request: Request, max_bytes: int | None = None) -> bytes:
+    """The raw body, or 413 once it exceeds `max_bytes` (default: the app's FormSettings)."""
+    if max_bytes is None:
+        max_bytes = request.app.state.form_settings.max_bytes
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=413, detail="Request body too large")
+
+    chunks = []
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise HTTPException(status_code=413, detail="Request body too large")
+        chunks.append(chunk)
+    return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+
+async def read_form_body(request: Request, names=(), max_bytes: int | None = None) -> FormBody:
+    with start_span("form.parse"):
+        return await _read_form_body(request, names, max_bytes)
+
+
+async def _read_form_body(request: Request, names, max_bytes: int | None) -> FormBody:
+    content_type = request.headers.get("content-type", "")
+    if content_type.split(";", 1)[0].strip().lower() != FORM_CONTENT_TYPE:
+        form_data = await request.form()
+        return FormBody(urlencode(form_data), {name: form_data[name] for name in names if name in form_data})
+
+    body = (await read_body(request, max_bytes)).decode("utf-8", errors="replace")
+    return FormBody(body, scan_form_fields(body, names) if names else {})
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Request, Response, Header
-from authlete.api.authlete_api_impl import AuthleteApiImpl
-from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
+from fastapi import APIRouter, Request, Response, Header, Depends
+from authlete_client import AsyncAuthleteApi, get_authlete_api
+from authlete.dto import GrantManagementAction
 from authlete.dto.grant_management_request import GrantManagementRequest
 from authlete.types.gm_action import GMAction
+from api.responses import GRANT_MANAGEMENT_RESPONSES
+from cache import IntrospectionCache, get_introspection_cache
+from security import AccessTokenValidator, get_access_token_validator
+from observability import get_logger
 
 router = APIRouter()
-conf = AuthleteIniConfiguration("authlete.properties")
-authlete_api = AuthleteApiImpl(conf)
+log = get_logger(__name__)
 
 @router.api_route("/api/gm/{grant_id}", methods=["GET", "DELETE"])
 async def grant_management_endpoint(
     request: Request,
     grant_id: str,
-    authorization: str = Header(None)
+    authorization: str = Header(None),
+    authlete_api: AsyncAuthleteApi = Depends(get_authlete_api),
+    introspection_cache: IntrospectionCache | None = Depends(get_introspection_cache),
+    token_validator: AccessTokenValidator | None = Depends(get_access_token_validator)
 ):
     """
     RFC 9356 Grant Management Endpoint.
@@ -30,6 +36,13 @@ async def grant_management_endpoint(
             media_type="application/json"
         )
 
+    # Malformed, expired or forged JWT access tokens never reach Authlete;
+    # answered like Authlete's UNAUTHORIZED (JSON body, WWW-Authenticate)
+    if token_validator is not None:
+        rejection = await token_validator.check(access_token)
+        if rejection is not None:
+            return GRANT_MANAGEMENT_RESPONSES.spec(GrantManagementAction.UNAUTHORIZED).respond(rejection.json)
+
     # 2. Determine the RFC 9356 Action
     action = GMAction.QUERY if request.method == "GET" else GMAction.REVOKE
 
@@ -39,26 +52,14 @@ async def grant_management_endpoint(
     req.gmAction = action
     req.accessToken = access_token
     
-    res = authlete_api.gm(req)
-    res_action = res.action.name if hasattr(res.action, 'name') else str(res.action)
+    res = await authlete_api.gm(req)
+    log.debug("gm.response", action=res.action)
+
+    # Revoking a grant kills every token issued under it; we cannot tell
+    # which cached introspection results those are, so drop them all.
+    spec = GRANT_MANAGEMENT_RESPONSES.spec(res.action)
+    if action == GMAction.REVOKE and spec.status_code == 204 and introspection_cache is not None:
+        await introspection_cache.clear()
 
     # 4. Handle the Protocol Response
-    status_code = 400
-    if res_action == "OK":
-        status_code = 200
-    elif res_action == "NO_CONTENT":
-        status_code = 204  # Standard response for a successful DELETE
-    elif res_action == "UNAUTHORIZED":
-        status_code = 401
-    elif res_action == "FORBIDDEN":
-        status_code = 403
-    elif res_action == "NOT_FOUND":
-        status_code = 404
-    elif res_action == "INTERNAL_SERVER_ERROR":
-        status_code = 500
-        
-    return Response(
-        content=res.responseContent,
-        status_code=status_code,
-        media_type="application/json"
-    )
\ No newline at end of file
+    return spec.respond(res.responseContent)
\ No newline at end of file
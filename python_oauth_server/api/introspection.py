@@ -1,57 +1,83 @@
-import base64
-from fastapi import APIRouter, Request, Response, Header
-from urllib.parse import urlencode
-from authlete.api.authlete_api_impl import AuthleteApiImpl
-from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
+from fastapi import APIRouter, Request, Response, Header, Depends
+from authlete_client import AsyncAuthleteApi, get_authlete_api
+from authlete.dto import StandardIntrospectionAction
 from authlete.dto.standard_introspection_request import StandardIntrospectionRequest
-from db.resource_server_dao import ResourceServerDao
+from api.form_body import read_form_body
+from api.responses import STANDARD_INTROSPECTION_RESPONSES
+from cache import IntrospectionCache, NegativeTokenCache, get_introspection_cache, get_negative_token_cache, token_hash
+from cache.negative_cache import INTROSPECTION
+from security import ResourceServerAuthenticator, get_resource_server_authenticator, parse_basic_authorization
+from observability import get_logger
 
 router = APIRouter()
-conf = AuthleteIniConfiguration("authlete.properties")
-authlete_api = AuthleteApiImpl(conf)
+log = get_logger(__name__)
+
+
+async def authenticate_resource_server(authorization: str | None, rs_authenticator: ResourceServerAuthenticator) -> Response | None:
+    """None for an authenticated resource server; otherwise the 401 to send."""
+    if not authorization or not authorization.lower().startswith("basic "):
+        return Response(status_code=401, content="Missing or invalid Basic Auth")
+
+    # Hashed secret check against the DAO (cached per header once verified)
+    rs_id = await rs_authenticator.authenticate(authorization)
+    if rs_id is None:
+        if parse_basic_authorization(authorization) is None:
+            return Response(status_code=401, content="Invalid Basic Auth format")
+        return Response(status_code=401, content="Invalid Resource Server credentials")
+    return None
+
 
 @router.post("/api/introspection")
 async def introspection_endpoint(
     request: Request,
-    authorization: str = Header(None)
+    authorization: str = Header(None),
+    authlete_api: AsyncAuthleteApi = Depends(get_authlete_api),
+    introspection_cache: IntrospectionCache | None = Depends(get_introspection_cache),
+    rs_authenticator: ResourceServerAuthenticator = Depends(get_resource_server_authenticator),
+    negative_cache: NegativeTokenCache | None = Depends(get_negative_token_cache)
 ):
     """
     RFC 7662 Introspection Endpoint for Resource Servers.
     """
     # 1. Resource Server Authentication
-    if not authorization or not authorization.startswith("Basic "):
-        return Response(status_code=401, content="Missing or invalid Basic Auth")
-        
-    try:
-        b64_creds = authorization.split(" ")[1]
-        decoded_creds = base64.b64decode(b64_creds).decode()
-        rs_id, rs_secret = decoded_creds.split(":", 1)
-    except Exception:
-        return Response(status_code=401, content="Invalid Basic Auth format")
-
-    # 2. Use the DAO for strict architectural separation
-    rs_record = ResourceServerDao.get(rs_id)
-    if not rs_record or rs_record.get("secret") != rs_secret:
-        return Response(status_code=401, content="Invalid Resource Server credentials")
+    rejection = await authenticate_resource_server(authorization, rs_authenticator)
+    if rejection is not None:
+        return rejection
 
-    # 3. Parse the token payload
-    form_data = await request.form()
-    parameters = urlencode(form_data)
-    
-    # 4. Call Authlete
+    # 2. Parse the token payload
+    form = await read_form_body(request, ("token",))
+    parameters = form.parameters
+
+    # Answer repeat lookups of a hot, still-active token (or of one Authlete
+    # just reported inactive) locally
+    cache_key = None
+    token = form.fields.get("token")
+    if token and (introspection_cache is not None or negative_cache is not None):
+        cache_key = token_hash(token)
+    if cache_key is not None and introspection_cache is not None:
+        cached = await introspection_cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached.body, status_code=200, media_type="application/json")
+    if cache_key is not None and negative_cache is not None:
+        refusal = negative_cache.get(INTROSPECTION, cache_key)
+        if refusal is not None:
+            return Response(content=refusal, status_code=200, media_type="application/json")
+
+    # 3. Call Authlete (a revocation from here on keeps the answer out of the cache)
+    generation = None
+    if cache_key is not None and introspection_cache is not None:
+        generation = await introspection_cache.generation()
     req = StandardIntrospectionRequest()
     req.parameters = parameters
     
-    res = authlete_api.standardIntrospection(req)
-    action = res.action.name if hasattr(res.action, 'name') else str(res.action)
-    
-    # 5. Handle the Protocol Response
-    status_code = 200
-    if action == "INTERNAL_SERVER_ERROR": status_code = 500
-    elif action == "BAD_REQUEST": status_code = 400
-        
-    return Response(
-        content=res.responseContent, 
-        status_code=status_code, 
-        media_type="application/json"
-    )
\ No newline at end of file
+    res = await authlete_api.standardIntrospection(req)
+    log.debug("introspection.response", action=res.action)
+
+    if cache_key is not None and res.action is StandardIntrospectionAction.OK:
+        if introspection_cache is not None:
+            await introspection_cache.put(cache_key, res.responseContent, generation)
+        if negative_cache is not None:
+            negative_cache.put_introspection(cache_key, res.responseContent)
+
+    # 4. Handle the Protocol Response
+    return STANDARD_INTROSPECTION_RESPONSES.respond(res)
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Batch introspection
+-------------------
+`POST /api/introspection/batch` checks many tokens for one resource server
+in a single request: one Basic authentication, one body read, and the
+`standardIntrospection` calls made concurrently instead of one HTTP request
+per token.
+
+    {"tokens": ["...", "..."], "token_type_hint": "access_token"}
+
+A token listed twice is introspected once. Each distinct token is answered
+from the introspection cache or the negative token cache when possible,
+otherwise by Authlete, with at most `INTROSPECTION_BATCH_CONCURRENCY` calls
+in flight per batch (8). The answer has one result per submitted token, in
+order, with the status and JSON body `/api/introspection` would have
+returned for it:
+
+    {"results": [{"status": 200, "body": {"active": true, ...}}, ...]}
+
+When Authlete answers with a JWT introspection response (RFC 9701,
+`application/token-introspection+jwt`), that slot's body is the JWT as a
+JSON string.
+
+A call that is failed fast (breaker, bulkhead, deadline) gets 503
+`temporarily_unavailable` in its slot, an upstream error gets 500; the
+rest of the batch is still answered. Batches over
+`INTROSPECTION_BATCH_MAX_TOKENS` (100) are refused with 413.
+
+Both limits are read once, in the lifespan, into `IntrospectionBatchSettings`
+on `app.state.introspection_batch`.
+
+    INTROSPECTION_BATCH_MAX_TOKENS    tokens per batch (100)
+    INTROSPECTION_BATCH_CONCURRENCY   Authlete calls in flight per batch (8)
+"""
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from urllib.parse import urlencode
+
+from authlete.api.authlete_api_exception import AuthleteApiException
+from authlete.dto import StandardIntrospectionAction
+from authlete.dto.standard_introspection_request import StandardIntrospectionRequest
+from fastapi import APIRouter, Depends, Header, Request, Response
+
+from api.form_body import read_body
+from api.introspection import authenticate_resource_server
+from api.responses import JSON, STANDARD_INTROSPECTION_RESPONSES, TEMPORARILY_UNAVAILABLE_CONTENT
+from authlete_client import AsyncAuthleteApi, AuthleteUnavailable, get_authlete_api
+from cache import IntrospectionCache, NegativeTokenCache, get_introspection_cache, get_negative_token_cache, token_hash
+from cache.negative_cache import INTROSPECTION
+from observability import get_logger
+from observability.metrics import REGISTRY
+from security import ResourceServerAuthenticator, get_resource_server_authenticator
+
+BATCH_TOKENS = REGISTRY.counter(
+    "oauth_introspection_batch_tokens", "Tokens submitted to batch introspection, by where the answer came from.",
+    ("source",))
+_FROM_CACHE = BATCH_TOKENS.labels("cache")
+_FROM_NEGATIVE_CACHE = BATCH_TOKENS.labels("negative_cache")
+_FROM_AUTHLETE = BATCH_TOKENS.labels("authlete")
+_DUPLICATE = BATCH_TOKENS.labels("duplicate")
+_FAILED = BATCH_TOKENS.labels("failed")
+
+router = APIRouter()
+log = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class IntrospectionBatchSettings:
+    max_tokens: int = 100
+    concurrency: int = 8
+
+    @classmethod
+    def from_env(cls) -> "IntrospectionBatchSettings":
+        return cls(
+            max_tokens=int(os.getenv("INTROSPECTION_BATCH_MAX_TOKENS", cls.max_tokens)),
+            concurrency=int(os.getenv("INTROSPECTION_BATCH_CONCURRENCY", cls.concurrency)),
+        )
+
+
+def get_introspection_batch_settings(request: Request) -> IntrospectionBatchSettings:
+    """FastAPI dependency returning the batch limits loaded at startup."""
+    return request.app.state.introspection_batch
+
+
+def _result(status_code: int, body: bytes | str | None) -> bytes:
+    # Authlete's responseContent is already JSON; it is spliced in, not re-encoded
+    if body is None:
+        body = b"null"
+    elif isinstance(body, str):
+        body = body.encode("utf-8")
+    return b'{"status":%d,"body":%s}' % (status_code, body)
+
+
+def _error(status_code: int, description: str) -> Response:
+    return Response(content=json.dumps({"error": "invalid_request", "error_description": description}),
+                    status_code=status_code, media_type=JSON)
+
+
+UNAVAILABLE = _result(503, TEMPORARILY_UNAVAILABLE_CONTENT)
+SERVER_ERROR = _result(500, '{"error":"server_error"}')
+
+
+async def _introspect(token: str, hint: str | None, authlete_api: AsyncAuthleteApi,
+                      introspection_cache: IntrospectionCache | None, negative_cache: NegativeTokenCache | None,
+                      generation: int | None, slots: asyncio.Semaphore) -> bytes:
+    cache_key = None
+    if introspection_cache is not None or negative_cache is not None:
+        cache_key = token_hash(token)
+    if cache_key is not None and introspection_cache is not None:
+        cached = await introspection_cache.get(cache_key)
+        if cached is not None:
+            _FROM_CACHE.inc()
+            return _result(200, cached.body)
+    if cache_key is not None and negative_cache is not None:
+        refusal = negative_cache.get(INTROSPECTION, cache_key)
+        if refusal is not None:
+            _FROM_NEGATIVE_CACHE.inc()
+            return _result(200, refusal)
+
+    req = StandardIntrospectionRequest()
+    req.parameters = urlencode({"token": token, "token_type_hint": hint} if hint else {"token": token})
+    async with slots:
+        try:
+            res = await authlete_api.standardIntrospection(req)
+        except AuthleteUnavailable:
+            _FAILED.inc()
+            return UNAVAILABLE
+        except AuthleteApiException:
+            _FAILED.inc()
+            return SERVER_ERROR
+    _FROM_AUTHLETE.inc()
+    log.debug("introspection_batch.response", action=res.action)
+
+    if cache_key is not None and res.action is StandardIntrospectionAction.OK:
+        if introspection_cache is not None:
+            await introspection_cache.put(cache_key, res.responseContent, generation)
+        if negative_cache is not None:
+            negative_cache.put_introspection(cache_key, res.responseContent)
+    spec = STANDARD_INTROSPECTION_RESPONSES.spec(res.action)
+    # A JWT response (RFC 9701) is not JSON; it goes in as a JSON string
+    content = res.responseContent if spec.media_type == JSON else json.dumps(res.responseContent)
+    return _result(spec.status_code, content)
+
+
+@router.post("/api/introspection/batch")
+async def introspection_batch_endpoint(
+    request: Request,
+    authorization: str = Header(None),
+    authlete_api: AsyncAuthleteApi = Depends(get_authlete_api),
+    introspection_cache: IntrospectionCache | None = Depends(get_introspection_cache),
+    rs_authenticator: ResourceServerAuthenticator = Depends(get_resource_server_authenticator),
+    negative_cache: NegativeTokenCache | None = Depends(get_negative_token_cache),
+    settings: IntrospectionBatchSettings = Depends(get_introspection_batch_settings)
+):
+    """
+    Introspects a list of tokens for one Resource Server (see module docstring).
+    """
+    rejection = await authenticate_resource_server(authorization, rs_authenticator)
+    if rejection is not None:
+        return rejection
+
+    try:
+        payload = json.loads(await read_body(request))
+    except ValueError:
+        payload = None
+    tokens = payload.get("tokens") if isinstance(payload, dict) else None
+    hint = payload.get("token_type_hint") if isinstance(payload, dict) else None
+    if not isinstance(tokens, list) or not all(isinstance(token, str) and token for token in tokens):
+        return _error(400, "The body must be a JSON object with a 'tokens' array of strings.")
+    if hint is not None and not isinstance(hint, str):
+        return _error(400, "'token_type_hint' must be a string.")
+    if len(tokens) > settings.max_tokens:
+        return _error(413, f"At most {settings.max_tokens} tokens per batch.")
+
+    unique = list(dict.fromkeys(tokens))
+    if len(unique) < len(tokens):
+        _DUPLICATE.inc(len(tokens) - len(unique))
+    # Taken once, before any of the batch's Authlete calls (see IntrospectionCache.put)
+    generation = await introspection_cache.generation() if introspection_cache is not None else None
+    slots = asyncio.Semaphore(settings.concurrency)
+    results = await asyncio.gather(*(
+        _introspect(token, hint, authlete_api, introspection_cache, negative_cache, generation, slots)
+        for token in unique))
+
+    by_token = dict(zip(unique, results))
+    body = b'{"results":[' + b",".join(by_token[token] for token in tokens) + b"]}"
+    return Response(content=body, status_code=200, media_type=JSON)
@@ -1,33 +1,31 @@
-from fastapi import APIRouter, Response
-from authlete.api.authlete_api_impl import AuthleteApiImpl
-from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
+from fastapi import APIRouter, Request, Depends
+from authlete_client import AsyncAuthleteApi, get_authlete_api
 from authlete.dto.credential_jwt_issuer_metadata_request import CredentialJwtIssuerMetadataRequest
+from api.responses import CREDENTIAL_JWT_ISSUER_METADATA_RESPONSES
+from cache import CachedDocument, MetadataCache, get_metadata_cache
+from observability import get_logger
 
 router = APIRouter()
-conf = AuthleteIniConfiguration("authlete.properties")
-authlete_api = AuthleteApiImpl(conf)
+log = get_logger(__name__)
 
 @router.get("/.well-known/jwt-issuer")
-async def jwt_issuer_metadata_endpoint():
+async def jwt_issuer_metadata_endpoint(
+    request: Request,
+    authlete_api: AsyncAuthleteApi = Depends(get_authlete_api),
+    metadata_cache: MetadataCache = Depends(get_metadata_cache)
+):
     """
     SD-JWT Issuer Metadata Endpoint (RFC 9499 / OID4VCI).
     Returns the JWT issuer configuration including signing keys.
     """
-    req = CredentialJwtIssuerMetadataRequest()
+    async def load():
+        req = CredentialJwtIssuerMetadataRequest()
 
-    res = authlete_api.credentialJwtIssuerMetadata(req)
-    action = res.action.name if hasattr(res.action, 'name') else str(res.action)
+        res = await authlete_api.credentialJwtIssuerMetadata(req)
+        log.debug("jwt_issuer_metadata.response", action=res.action)
 
-    status_code = 400
-    if action == "OK":
-        status_code = 200
-    elif action == "NOT_FOUND":
-        status_code = 404
-    elif action == "INTERNAL_SERVER_ERROR":
-        status_code = 500
+        spec = CREDENTIAL_JWT_ISSUER_METADATA_RESPONSES.spec(res.action)
+        return CachedDocument.build((res.responseContent or "").encode(), spec.media_type, spec.status_code)
 
-    return Response(
-        content=res.responseContent,
-        status_code=status_code,
-        media_type="application/json"
-    )
\ No newline at end of file
+    document = await metadata_cache.get("jwt-issuer", load)
+    return metadata_cache.respond(request, document)
@@ -1,32 +1,60 @@
-import json
-from fastapi import APIRouter, Response
-from authlete.api.authlete_api_impl import AuthleteApiImpl
-from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
+from fastapi import APIRouter, Request, Depends
+from authlete.dto.service_configuration_request import ServiceConfigurationRequest
+from authlete_client import AsyncAuthleteApi, get_authlete_api
+from cache import CachedDocument, MetadataCache, get_metadata_cache
+from observability import get_logger
 
 router = APIRouter()
-conf = AuthleteIniConfiguration("authlete.properties")
-authlete_api = AuthleteApiImpl(conf)
+log = get_logger(__name__)
+
+
+async def service_configuration(authlete_api: AsyncAuthleteApi, metadata_cache: MetadataCache) -> CachedDocument:
+    """The discovery document, from the metadata cache (also read by the access token validator)."""
+    async def load():
+        # Compact JSON straight from Authlete; the bytes are served as is
+        config_request = ServiceConfigurationRequest()
+        config_request.pretty = False
+        res = await authlete_api.getServiceConfiguration(config_request)
+        log.debug("metadata.configuration_loaded", size=len(res) if res else 0)
+        return CachedDocument.build(res.encode(), "application/json")
+
+    return await metadata_cache.get("openid-configuration", load)
+
+
+async def service_jwks(authlete_api: AsyncAuthleteApi, metadata_cache: MetadataCache, refresh: bool = False) -> CachedDocument:
+    """The service JWK Set, from the metadata cache; `refresh` refetches it from Authlete."""
+    async def load():
+        res = await authlete_api.getServiceJwks(pretty=False)
+        log.debug("metadata.jwks_loaded", size=len(res) if res else 0)
+        if not res:
+            return CachedDocument.build(b"", None, status_code=204)
+        return CachedDocument.build(res.encode(), "application/json")
+
+    if refresh:
+        return await metadata_cache.reload("jwks", load)
+    return await metadata_cache.get("jwks", load)
+
 
 @router.get("/.well-known/openid-configuration")
-async def discovery_endpoint():
+async def discovery_endpoint(
+    request: Request,
+    authlete_api: AsyncAuthleteApi = Depends(get_authlete_api),
+    metadata_cache: MetadataCache = Depends(get_metadata_cache)
+):
     """
     Serves the OpenID Provider Configuration Document.
     """
-    res = authlete_api.getServiceConfiguration()
-    
-    # Parse the raw string into a Python dictionary
-    # FastAPI will automatically serialize this back to application/json
-    return json.loads(res)
+    document = await service_configuration(authlete_api, metadata_cache)
+    return metadata_cache.respond(request, document)
 
 @router.get("/api/jwks")
-async def jwks_endpoint():
+async def jwks_endpoint(
+    request: Request,
+    authlete_api: AsyncAuthleteApi = Depends(get_authlete_api),
+    metadata_cache: MetadataCache = Depends(get_metadata_cache)
+):
     """
     Serves the JSON Web Key Set (public keys).
     """
-    res = authlete_api.getServiceJwks()
-    
-    if not res:
-        return Response(status_code=204)
-        
-    # Parse the raw string into a Python dictionary
-    return json.loads(res)
\ No newline at end of file
+    document = await service_jwks(authlete_api, metadata_cache)
+    return metadata_cache.respond(request, document)
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+from observability.metrics import REGISTRY
+
+router = APIRouter()
+
+PROMETHEUS_TEXT = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("/metrics")
+async def metrics_endpoint():
+    """
+    Request / Authlete call latency histograms and in-flight gauges,
+    in the Prometheus text exposition format.
+    """
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_TEXT)
@@ -1,14 +1,14 @@
-from fastapi import APIRouter, Request, Response
-from authlete.api.authlete_api_impl import AuthleteApiImpl
-from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
+from fastapi import APIRouter, Request, Depends
+from authlete_client import AsyncAuthleteApi, get_authlete_api
 from authlete.dto.client_registration_request import ClientRegistrationRequest
+from api.responses import CLIENT_REGISTRATION_RESPONSES
+from observability import get_logger
 
 router = APIRouter()
-conf = AuthleteIniConfiguration("authlete.properties")
-authlete_api = AuthleteApiImpl(conf)
+log = get_logger(__name__)
 
 @router.post("/api/register")
-async def dynamic_client_registration_endpoint(request: Request):
+async def dynamic_client_registration_endpoint(request: Request, authlete_api: AsyncAuthleteApi = Depends(get_authlete_api)):
     """
     RFC 7591 Dynamic Client Registration Endpoint.
     """
@@ -23,22 +23,8 @@ async def dynamic_client_registration_endpoint(request: Request):
     # Optional: If you restricted registration using an Initial Access Token, 
     # you would extract the Bearer token from the Authorization header and set req.token here. Since java server was accepting without initial Access Token, we are not adding it here.
 
-    res = authlete_api.dynamicClientRegister(req)
-    action = res.action.name if hasattr(res.action, 'name') else str(res.action)
+    res = await authlete_api.dynamicClientRegister(req)
+    log.debug("register.response", action=res.action)
 
     # 3. Handle the Protocol Response
-    status_code = 400
-    if action == "CREATED":
-        status_code = 201
-    elif action == "UNAUTHORIZED":
-        status_code = 401
-    elif action == "FORBIDDEN":
-        status_code = 403
-    elif action == "INTERNAL_SERVER_ERROR":
-        status_code = 500
-        
-    return Response(
-        content=res.responseContent,
-        status_code=status_code,
-        media_type="application/json"
-    )
\ No newline at end of file
+    return CLIENT_REGISTRATION_RESPONSES.respond(res)
\ No newline at end of file
@@ -0,0 +1,295 @@
+"""
+Action -> HTTP response tables
+------------------------------
+Every Authlete API response carries an `action` telling the server what to
+send back to the client. Instead of an if/elif ladder over `action.name`
+strings in every router, each Authlete response type has one table, built at
+import time, that maps each action enum member to a `ResponseSpec`: status
+code, media type and a pre-encoded, immutable header list. A router then does
+a single dict lookup:
+
+    return TOKEN_RESPONSES.respond(res)
+
+Routers that need extra logic for some action (the authorization INTERACTION
+page, caching introspection results) compare
+`res.action` against the enum member and fall back to the table otherwise.
+"""
+
+import math
+from dataclasses import dataclass, field
+from enum import Enum
+
+from authlete.dto import (
+    AuthorizationAction,
+    AuthorizationFailAction,
+    AuthorizationIssueAction,
+    ClientRegistrationAction,
+    CredentialIssuerMetadataAction,
+    CredentialJwtIssuerMetadataAction,
+    CredentialSingleIssueAction,
+    FederationConfigurationAction,
+    FederationRegistrationAction,
+    GrantManagementAction,
+    PushedAuthReqAction,
+    RevocationAction,
+    StandardIntrospectionAction,
+    TokenAction,
+    UserInfoAction,
+    UserInfoIssueAction,
+)
+from fastapi import Request, Response
+
+from authlete_client.decoder import action_member
+
+JSON = "application/json"
+JWT = "application/jwt"
+HTML = "text/html;charset=UTF-8"
+ENTITY_STATEMENT = "application/entity-statement+jwt"
+
+NO_STORE = (("Cache-Control", "no-store"), ("Pragma", "no-cache"))
+
+
+@dataclass(frozen=True, slots=True)
+class ResponseSpec:
+    status_code: int
+    media_type: str | None = JSON
+    headers: tuple[tuple[str, str], ...] = ()
+    # When set, responseContent is sent in this header (Location,
+    # WWW-Authenticate) instead of the body.
+    content_header: str | None = None
+    # When set, sent as the body instead of responseContent.
+    content: str | None = None
+    raw_headers: tuple[tuple[bytes, bytes], ...] = field(init=False, repr=False)
+    raw_content_header: bytes | None = field(init=False, repr=False)
+
+    def __post_init__(self):
+        raw = tuple((name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in self.headers)
+        object.__setattr__(self, "raw_headers", raw)
+        header = self.content_header.lower().encode("latin-1") if self.content_header else None
+        object.__setattr__(self, "raw_content_header", header)
+
+    def respond(self, content: str | None) -> Response:
+        if self.raw_content_header is not None:
+            response = Response(status_code=self.status_code)
+            if content:
+                response.raw_headers.append((self.raw_content_header, content.encode("latin-1")))
+        else:
+            body = self.content if self.content is not None else content
+            response = Response(content=body, status_code=self.status_code, media_type=self.media_type)
+        response.raw_headers.extend(self.raw_headers)
+        return response
+
+
+INTERNAL_SERVER_ERROR = ResponseSpec(500)
+
+
+class ResponseTable:
+    # `default` answers actions missing from `specs` (including ones newer
+    # than the SDK); each table keeps the status its router used to fall back to
+    def __init__(self, action_type: type[Enum], specs: dict[str, ResponseSpec], default: ResponseSpec = INTERNAL_SERVER_ERROR):
+        # Keyed by member so a lookup is one hash of the enum; building from
+        # names makes a typo fail at import. Actions newer than the SDK are
+        # the decoder's UnknownAction objects (see NEWER_ACTIONS).
+        self.action_type = action_type
+        self.default = default
+        self._specs = {action_member(action_type, name): spec for name, spec in specs.items()}
+
+    def spec(self, action) -> ResponseSpec:
+        return self._specs.get(action, self.default)
+
+    def respond(self, res) -> Response:
+        return self.spec(res.action).respond(res.responseContent)
+
+
+def _redirect():
+    return ResponseSpec(302, None, (("Cache-Control", "no-store"),), content_header="Location")
+
+
+def _form():
+    return ResponseSpec(200, HTML, (("Cache-Control", "no-store"),))
+
+
+# RFC 6750 §3: errors from a protected resource go in WWW-Authenticate
+def _bearer_error(status_code: int):
+    return ResponseSpec(status_code, None, NO_STORE, content_header="WWW-Authenticate")
+
+
+# RFC 6749 §4.1.2.1 temporarily_unavailable, sent when an Authlete call is
+# failed fast (circuit open, bulkhead full, deadline or timeout exceeded)
+TEMPORARILY_UNAVAILABLE = ResponseSpec(503, JSON, NO_STORE)
+TEMPORARILY_UNAVAILABLE_CONTENT = \
+    '{"error":"temporarily_unavailable","error_description":"The authorization server is temporarily unable to handle the request."}'
+
+
+def temporarily_unavailable(request: Request, exc) -> Response:
+    response = TEMPORARILY_UNAVAILABLE.respond(TEMPORARILY_UNAVAILABLE_CONTENT)
+    response.headers["Retry-After"] = str(max(1, math.ceil(exc.retry_after)))
+    return response
+
+
+# ----------------------------------------------------------------------
+# Authorization endpoint
+# ----------------------------------------------------------------------
+
+AUTHORIZATION_RESPONSES = ResponseTable(AuthorizationAction, {
+    "BAD_REQUEST": ResponseSpec(400, JSON, NO_STORE),
+    "LOCATION": _redirect(),
+    # prompt=none without a session: Authlete builds the error redirect
+    "NO_INTERACTION": _redirect(),
+    "FORM": _form(),
+    "INTERNAL_SERVER_ERROR": INTERNAL_SERVER_ERROR,
+})
+
+AUTHORIZATION_ISSUE_RESPONSES = ResponseTable(AuthorizationIssueAction, {
+    "LOCATION": _redirect(),
+    "FORM": _form(),
+    "BAD_REQUEST": ResponseSpec(400, JSON, NO_STORE),
+    "INTERNAL_SERVER_ERROR": INTERNAL_SERVER_ERROR,
+})
+
+AUTHORIZATION_FAIL_RESPONSES = ResponseTable(AuthorizationFailAction, {
+    "LOCATION": _redirect(),
+    "FORM": _form(),
+    "BAD_REQUEST": ResponseSpec(400, JSON, NO_STORE),
+    "INTERNAL_SERVER_ERROR": INTERNAL_SERVER_ERROR,
+})
+
+PUSHED_AUTH_REQ_RESPONSES = ResponseTable(PushedAuthReqAction, {
+    "CREATED": ResponseSpec(201),
+    "BAD_REQUEST": ResponseSpec(400),
+    "UNAUTHORIZED": ResponseSpec(401),
+    "FORBIDDEN": ResponseSpec(403),
+    "PAYLOAD_TOO_LARGE": ResponseSpec(413),
+    "INTERNAL_SERVER_ERROR": INTERNAL_SERVER_ERROR,
+}, default=ResponseSpec(400))
+
+# ----------------------------------------------------------------------
+# Token endpoint (RFC 6749 §5: no-store on every token response)
+# ----------------------------------------------------------------------
+
+_UNSUPPORTED_GRANT_TYPE = ResponseSpec(
+    400, JSON, NO_STORE,
+    content='{"error":"unsupported_grant_type","error_description":"This grant type is not supported by this server."}',
+)
+
+TOKEN_RESPONSES = ResponseTable(TokenAction, {
+    "OK": ResponseSpec(200, JSON, NO_STORE),
+    # Refresh token grant where a new ID token could be issued; we do not
+    # re-issue, so it is answered like OK.
+    "ID_TOKEN_REISSUABLE": ResponseSpec(200, JSON, NO_STORE),
+    "INVALID_CLIENT": ResponseSpec(401, JSON, NO_STORE + (("WWW-Authenticate", 'Basic realm="Authlete"'),)),
+    "BAD_REQUEST": ResponseSpec(400, JSON, NO_STORE),
+    # Resource Owner Password Credentials is deprecated and deliberately not
+    # supported; token exchange and JWT bearer grants are not implemented.
+    "PASSWORD": _UNSUPPORTED_GRANT_TYPE,
+    "TOKEN_EXCHANGE": _UNSUPPORTED_GRANT_TYPE,
+    "JWT_BEARER": _UNSUPPORTED_GRANT_TYPE,
+    "INTERNAL_SERVER_ERROR": ResponseSpec(500, JSON, NO_STORE),
+}, default=ResponseSpec(500, JSON, NO_STORE))
+
+# ----------------------------------------------------------------------
+# Introspection and revocation
+# ----------------------------------------------------------------------
+
+STANDARD_INTROSPECTION_RESPONSES = ResponseTable(StandardIntrospectionAction, {
+    "OK": ResponseSpec(200),
+    # RFC 9701 JWT response, when the resource server asked for one
+    "JWT": ResponseSpec(200, "application/token-introspection+jwt"),
+    "BAD_REQUEST": ResponseSpec(400),
+    "INTERNAL_SERVER_ERROR": INTERNAL_SERVER_ERROR,
+}, default=ResponseSpec(200))
+
+REVOCATION_RESPONSES = ResponseTable(RevocationAction, {
+    "OK": ResponseSpec(200),
+    "INVALID_CLIENT": ResponseSpec(401),
+    "BAD_REQUEST": ResponseSpec(400),
+    "INTERNAL_SERVER_ERROR": INTERNAL_SERVER_ERROR,
+}, default=ResponseSpec(200))
+
+# ----------------------------------------------------------------------
+# UserInfo
+# ----------------------------------------------------------------------
+
+USERINFO_RESPONSES = ResponseTable(UserInfoAction, {
+    "BAD_REQUEST": _bearer_error(400),
+    "UNAUTHORIZED": _bearer_error(401),
+    "FORBIDDEN": _bearer_error(403),
+    "INTERNAL_SERVER_ERROR": _bearer_error(500),
+}, default=_bearer_error(400))
+
+USERINFO_ISSUE_RESPONSES = ResponseTable(UserInfoIssueAction, {
+    "JSON": ResponseSpec(200, JSON, NO_STORE),
+    "JWT": ResponseSpec(200, JWT, NO_STORE),
+    "BAD_REQUEST": _bearer_error(400),
+    "UNAUTHORIZED": _bearer_error(401),
+    "FORBIDDEN": _bearer_error(403),
+    "INTERNAL_SERVER_ERROR": _bearer_error(500),
+})
+
+# ----------------------------------------------------------------------
+# Client registration and grant management
+# ----------------------------------------------------------------------
+
+CLIENT_REGISTRATION_RESPONSES = ResponseTable(ClientRegistrationAction, {
+    "CREATED": ResponseSpec(201),
+    "OK": ResponseSpec(200),
+    "UPDATED": ResponseSpec(200),
+    "DELETED": ResponseSpec(204, None, content=""),
+    "BAD_REQUEST": ResponseSpec(400),
+    "INTERNAL_SERVER_ERROR": INTERNAL_SERVER_ERROR,
+}, default=ResponseSpec(400))
+
+GRANT_MANAGEMENT_RESPONSES = ResponseTable(GrantManagementAction, {
+    "OK": ResponseSpec(200),
+    # Successful DELETE (NO_CONTENT and NOT_FOUND are not in the SDK's enum)
+    "NO_CONTENT": ResponseSpec(204, None, content=""),
+    # Authlete's responseContent is a JSON body here; RFC 6750 §3 still wants the header
+    "UNAUTHORIZED": ResponseSpec(401, JSON, (("WWW-Authenticate", 'Bearer error="invalid_token"'),)),
+    "FORBIDDEN": ResponseSpec(403),
+    "NOT_FOUND": ResponseSpec(404),
+    "CALLER_ERROR": INTERNAL_SERVER_ERROR,
+    "AUTHLETE_ERROR": INTERNAL_SERVER_ERROR,
+}, default=ResponseSpec(400))
+
+# ----------------------------------------------------------------------
+# Federation and verifiable credentials
+# ----------------------------------------------------------------------
+
+FEDERATION_CONFIGURATION_RESPONSES = ResponseTable(FederationConfigurationAction, {
+    "OK": ResponseSpec(200, ENTITY_STATEMENT),
+    "NOT_FOUND": ResponseSpec(404),
+    "INTERNAL_SERVER_ERROR": INTERNAL_SERVER_ERROR,
+}, default=ResponseSpec(400))
+
+FEDERATION_REGISTRATION_RESPONSES = ResponseTable(FederationRegistrationAction, {
+    "OK": ResponseSpec(200, ENTITY_STATEMENT),
+    "BAD_REQUEST": ResponseSpec(400),
+    "NOT_FOUND": ResponseSpec(404),
+    "INTERNAL_SERVER_ERROR": INTERNAL_SERVER_ERROR,
+}, default=ResponseSpec(400))
+
+CREDENTIAL_ISSUER_METADATA_RESPONSES = ResponseTable(CredentialIssuerMetadataAction, {
+    "OK": ResponseSpec(200),
+    "NOT_FOUND": ResponseSpec(404),
+    "INTERNAL_SERVER_ERROR": INTERNAL_SERVER_ERROR,
+}, default=ResponseSpec(400))
+
+CREDENTIAL_JWT_ISSUER_METADATA_RESPONSES = ResponseTable(CredentialJwtIssuerMetadataAction, {
+    "OK": ResponseSpec(200),
+    "NOT_FOUND": ResponseSpec(404),
+    "INTERNAL_SERVER_ERROR": INTERNAL_SERVER_ERROR,
+}, default=ResponseSpec(400))
+
+CREDENTIAL_SINGLE_ISSUE_RESPONSES = ResponseTable(CredentialSingleIssueAction, {
+    "OK": ResponseSpec(200, JSON, NO_STORE),
+    "OK_JWT": ResponseSpec(200, JWT, NO_STORE),
+    # Deferred issuance
+    "ACCEPTED": ResponseSpec(202, JSON, NO_STORE),
+    "ACCEPTED_JWT": ResponseSpec(202, JWT, NO_STORE),
+    "BAD_REQUEST": ResponseSpec(400),
+    # Authlete puts the WWW-Authenticate value in responseContent
+    "UNAUTHORIZED": _bearer_error(401),
+    "FORBIDDEN": ResponseSpec(403),
+    "INTERNAL_SERVER_ERROR": INTERNAL_SERVER_ERROR,
+    "CALLER_ERROR": INTERNAL_SERVER_ERROR,
+}, default=ResponseSpec(400))
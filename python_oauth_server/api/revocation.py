@@ -1,40 +1,39 @@
-import base64
-from fastapi import APIRouter, Request, Response, Header
-from urllib.parse import urlencode
-from authlete.api.authlete_api_impl import AuthleteApiImpl
-from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
+from fastapi import APIRouter, Request, Header, Depends
+from authlete_client import AsyncAuthleteApi, get_authlete_api
+from authlete.dto import RevocationAction
 from authlete.dto.revocation_request import RevocationRequest
+from api.form_body import read_form_body
+from api.responses import REVOCATION_RESPONSES
+from security import parse_basic_authorization
+from cache import IntrospectionCache, get_introspection_cache
+from observability import get_logger
 
 router = APIRouter()
-conf = AuthleteIniConfiguration("authlete.properties")
-authlete_api = AuthleteApiImpl(conf)
+log = get_logger(__name__)
+
+FORM_FIELDS = ("client_id", "client_secret", "token")
 
 @router.post("/api/revocation")
 async def revocation_endpoint(
     request: Request,
-    authorization: str = Header(None)
+    authorization: str = Header(None),
+    authlete_api: AsyncAuthleteApi = Depends(get_authlete_api),
+    introspection_cache: IntrospectionCache | None = Depends(get_introspection_cache)
 ):
     """
     RFC 7009 Token Revocation Endpoint.
     """
     # 1. Extract Client Credentials (RFC 6749 / 7009)
-    client_id, client_secret = None, None
-    if authorization and authorization.startswith("Basic "):
-        try:
-            b64_creds = authorization.split(" ")[1]
-            decoded_creds = base64.b64decode(b64_creds).decode()
-            client_id, client_secret = decoded_creds.split(":", 1)
-        except Exception:
-            pass # Malformed auth header
+    client_id, client_secret = parse_basic_authorization(authorization) or (None, None)
 
     # 2. Parse the application/x-www-form-urlencoded body
-    form_data = await request.form()
-    parameters = urlencode(form_data)
+    form = await read_form_body(request, FORM_FIELDS)
+    parameters = form.parameters
 
     # Fallback: OAuth 2.0 allows credentials in the body if Basic Auth isn't used
     if not client_id:
-        client_id = form_data.get("client_id")
-        client_secret = form_data.get("client_secret")
+        client_id = form.fields.get("client_id")
+        client_secret = form.fields.get("client_secret")
 
     # 3. Call Authlete's Revocation API
     req = RevocationRequest()
@@ -42,22 +41,12 @@ async def revocation_endpoint(
     req.clientId = client_id
     req.clientSecret = client_secret
     
-    res = authlete_api.revocation(req)
-    action = res.action.name if hasattr(res.action, 'name') else str(res.action)
+    res = await authlete_api.revocation(req)
+    log.debug("revocation.response", action=res.action)
+
+    # A revoked token must not keep introspecting as active from our cache
+    if res.action is RevocationAction.OK and introspection_cache is not None:
+        await introspection_cache.invalidate_token(form.fields.get("token"))
 
     # 4. Handle the Protocol State Machine
-    status_code = 200
-    if action == "INVALID_CLIENT":
-        # Client failed authentication
-        status_code = 401
-    elif action == "BAD_REQUEST":
-        # Missing parameters
-        status_code = 400
-    elif action == "INTERNAL_SERVER_ERROR":
-        status_code = 500
-        
-    return Response(
-        content=res.responseContent,
-        status_code=status_code,
-        media_type="application/json"
-    )
\ No newline at end of file
+    return REVOCATION_RESPONSES.respond(res)
\ No newline at end of file
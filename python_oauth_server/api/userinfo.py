@@ -1,17 +1,27 @@
 import json
-from fastapi import APIRouter, Request, Response, Header
-from authlete.api.authlete_api_impl import AuthleteApiImpl
-from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
+from fastapi import APIRouter, Request, Response, Header, Depends
+from authlete_client import AsyncAuthleteApi, get_authlete_api
+from authlete.dto import UserInfoAction
 from authlete.dto.userinfo_request import UserInfoRequest
 from authlete.dto.userinfo_issue_request import UserInfoIssueRequest
+from api.responses import USERINFO_ISSUE_RESPONSES, USERINFO_RESPONSES
+from cache import NegativeTokenCache, get_negative_token_cache, token_hash
+from cache.negative_cache import USERINFO
 from db.user_dao import UserDao
+from security import AccessTokenValidator, get_access_token_validator
+from observability import get_logger
 
 router = APIRouter()
-conf = AuthleteIniConfiguration("authlete.properties")
-authlete_api = AuthleteApiImpl(conf)
+log = get_logger(__name__)
 
 @router.api_route("/api/userinfo", methods=["GET", "POST"])
-async def userinfo_endpoint(request: Request, authorization: str = Header(None)):
+async def userinfo_endpoint(
+    request: Request,
+    authorization: str = Header(None),
+    authlete_api: AsyncAuthleteApi = Depends(get_authlete_api),
+    token_validator: AccessTokenValidator | None = Depends(get_access_token_validator),
+    negative_cache: NegativeTokenCache | None = Depends(get_negative_token_cache)
+):
     """
     Serves the user's profile claims based on their access token.
     """
@@ -21,18 +31,34 @@ async def userinfo_endpoint(request: Request, authorization: str = Header(None))
     
     token = authorization.split(" ")[1]
 
+    # Malformed, expired or forged JWT access tokens never reach Authlete
+    if token_validator is not None:
+        rejection = await token_validator.check(token)
+        if rejection is not None:
+            return USERINFO_RESPONSES.spec(UserInfoAction.UNAUTHORIZED).respond(rejection.www_authenticate)
+
+    # Tokens Authlete refused a moment ago get the same refusal locally
+    cache_key = None
+    if negative_cache is not None:
+        cache_key = token_hash(token)
+        refusal = negative_cache.get(USERINFO, cache_key)
+        if refusal is not None:
+            return USERINFO_RESPONSES.spec(UserInfoAction.UNAUTHORIZED).respond(refusal)
+
     # 2. Ask Authlete to validate the token
     req = UserInfoRequest()
     req.token = token
-    res = authlete_api.userinfo(req)
+    res = await authlete_api.userinfo(req)
+    log.debug("userinfo.response", action=res.action)
 
-    action = res.action.name if hasattr(res.action, 'name') else str(res.action)
+    if cache_key is not None and res.action is UserInfoAction.UNAUTHORIZED:
+        negative_cache.put(USERINFO, cache_key, res.responseContent)
 
-    if action == "OK":
+    if res.action is UserInfoAction.OK:
         subject = res.subject
 
         # 3. Fetch the real user record from db
-        user_record = UserDao.get_by_subject(subject)
+        user_record = await UserDao.get_by_subject(subject)
         # 4. Populate the standard OIDC claims
         claims = {"sub": subject}
 
@@ -42,32 +68,21 @@ async def userinfo_endpoint(request: Request, authorization: str = Header(None))
             allowed_claims = res.claims
             
             if "name" in allowed_claims:
-                claims["name"] = user_record.get("name")
+                claims["name"] = user_record.name
             if "email" in allowed_claims:
-                claims["email"] = user_record.get("email")
+                claims["email"] = user_record.email
 
         # 5. Issue the Final Response
         issue_req = UserInfoIssueRequest()
         issue_req.token = token
         issue_req.claims = json.dumps(claims)
 
-        issue_res = authlete_api.userinfoIssue(issue_req)
+        issue_res = await authlete_api.userinfoIssue(issue_req)
+        log.debug("userinfo.issue_response", action=issue_res.action)
         
-        # We must include the headers Authlete provides (like Content-Type)
-        return Response(
-            content=issue_res.responseContent,
-            status_code=200,
-            media_type="application/json"
-        )
+        # JSON or signed JWT, depending on the client's registration
+        return USERINFO_ISSUE_RESPONSES.respond(issue_res)
     else:
-        # Token is invalid, expired, or missing permissions
-        status_code = 400
-        if action == "UNAUTHORIZED": status_code = 401
-        elif action == "FORBIDDEN": status_code = 403
-        elif action == "INTERNAL_SERVER_ERROR": status_code = 500
-        
-        return Response(
-            content=res.responseContent,
-            status_code=status_code,
-            media_type="application/json"
-        )
\ No newline at end of file
+        # Token is invalid, expired, or missing permissions; Authlete's
+        # responseContent is the WWW-Authenticate value (RFC 6750)
+        return USERINFO_RESPONSES.respond(res)
\ No newline at end of file
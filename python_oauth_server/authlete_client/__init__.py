@@ -0,0 +1,19 @@
+from authlete_client.async_api import AsyncAuthleteApi
+from authlete_client.decoder import ResponseDecoder, UnknownAction
+from authlete_client.registry import AuthleteClientRegistry, PoolSettings, get_authlete_api, get_registry
+from authlete_client.resilience import AuthleteUnavailable, CallGuard, DeadlineMiddleware
+from authlete_client.single_flight import SingleFlight
+
+__all__ = [
+    "AsyncAuthleteApi",
+    "AuthleteClientRegistry",
+    "AuthleteUnavailable",
+    "CallGuard",
+    "DeadlineMiddleware",
+    "PoolSettings",
+    "ResponseDecoder",
+    "SingleFlight",
+    "UnknownAction",
+    "get_authlete_api",
+    "get_registry",
+]
@@ -0,0 +1,256 @@
+"""
+Async Authlete API Client
+-------------------------
+The upstream `AuthleteApiImpl` is built on the blocking `requests` library and
+opens a fresh connection for every call. Calling it from an `async def`
+FastAPI handler blocks the whole event loop for the duration of the Authlete
+round-trip, so a single slow upstream call stalls every other in-flight request
+on the uvicorn worker.
+
+`AsyncAuthleteApi` is the asyncio counterpart for the operations this server
+uses. It speaks the exact same wire protocol as the SDK (same paths, same
+credentials, same request DTOs from `authlete.dto`), so routers can switch from
+`authlete_api.token(req)` to `await authlete_api.token(req)` without any other
+change. Requests go through a pooled `httpx.AsyncClient`, so keep-alive
+connections to Authlete are reused across calls, and identical concurrent
+read-only calls share one upstream request (see single_flight.py). Responses
+are decoded by the compiled schemas in decoder.py instead of the SDK's
+reflection-based `from_json`.
+"""
+
+import json
+import time
+
+import httpx
+from authlete.api.authlete_api_exception import AuthleteApiException
+from authlete.conf.authlete_configuration import AuthleteConfiguration
+from authlete.dto import ServiceConfigurationRequest
+from authlete.types.jsonable import Jsonable
+
+from authlete_client import decoder
+from authlete_client.resilience import CallGuard
+from authlete_client.single_flight import COALESCED_OPERATIONS, SingleFlight, canonical_key
+from observability.metrics import authlete_operation
+from observability.tracing import CLIENT, start_span
+
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+
+class AsyncAuthleteApi:
+    def __init__(self, cnf: AuthleteConfiguration, client: httpx.AsyncClient | None = None,
+                 single_flight: SingleFlight | None = None, guard: CallGuard | None = None):
+        # Same validation rules as AuthleteApiImpl so a bad authlete.properties
+        # fails at startup exactly like it used to.
+        if not isinstance(cnf, AuthleteConfiguration):
+            raise RuntimeError("'cnf' must be an instance of AuthleteConfiguration.")
+
+        if cnf.baseUrl is None:
+            raise RuntimeError("'baseUrl' of the configuration is None.")
+
+        self._baseUrl = cnf.baseUrl.rstrip('/')
+        self._serviceCredentials = (cnf.serviceApiKey, cnf.serviceApiSecret)
+
+        # V3 uses a Bearer access token and a '/api/{serviceId}' path prefix.
+        # V2 uses Basic auth with the service API key/secret and '/api'.
+        if cnf.apiVersion == "V3":
+            if cnf.serviceAccessToken is None:
+                raise RuntimeError("'serviceAccessToken' of the configuration is None.")
+            self._accessToken = cnf.serviceAccessToken
+            self._apiPrefix = "/api/{}".format(cnf.serviceApiKey)
+        else:
+            self._accessToken = None
+            self._apiPrefix = "/api"
+
+        self._headers = {
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+        }
+        if self._accessToken is not None:
+            self._headers["Authorization"] = "Bearer {}".format(self._accessToken)
+
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(timeout=DEFAULT_TIMEOUT, limits=DEFAULT_LIMITS)
+        self.single_flight = single_flight
+        self.guard = guard
+
+    async def aclose(self):
+        """Closes the underlying HTTP client if this instance created it."""
+        if self._owns_client:
+            await self._client.aclose()
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+
+    async def _call_api(self, method, path, query_params, request_body, response_decoder):
+        if request_body is None:
+            data = None
+        elif isinstance(request_body, Jsonable):
+            data = request_body.to_json()
+        else:
+            data = json.dumps(request_body)
+
+        # The path without the (service-specific) API prefix
+        operation = path[len(self._apiPrefix):]
+        if self.single_flight is not None and operation in COALESCED_OPERATIONS:
+            key = canonical_key(method, operation, query_params, data)
+            return await self.single_flight.do(
+                key, operation, lambda: self._guarded_call(method, path, operation, query_params, data, response_decoder))
+        return await self._guarded_call(method, path, operation, query_params, data, response_decoder)
+
+    async def _guarded_call(self, method, path, operation, query_params, data, response_decoder):
+        # Deadline, circuit breaker and bulkhead (see resilience.py); a
+        # coalesced call passes through them once, for its leader.
+        if self.guard is None:
+            return await self._instrumented_call(method, path, operation, query_params, data, response_decoder)
+        return await self.guard.call(
+            operation, lambda: self._instrumented_call(method, path, operation, query_params, data, response_decoder))
+
+    async def _instrumented_call(self, method, path, operation, query_params, data, response_decoder):
+        metrics = authlete_operation(operation)
+        metrics.in_flight.value += 1
+        started = time.perf_counter()
+        action = "ERROR"
+        with start_span("authlete " + operation, CLIENT) as span:
+            try:
+                result = await self._send(method, path, query_params, data, response_decoder, span.traceparent)
+                action = getattr(getattr(result, "action", None), "name", "OK")
+                return result
+            except AuthleteApiException as e:
+                if e.response is not None:
+                    action = "HTTP_{}".format(e.response.status_code)
+                raise
+            finally:
+                metrics.in_flight.value -= 1
+                metrics.observe(action, time.perf_counter() - started)
+                span.set_attribute("authlete.action", action)
+
+    async def _send(self, method, path, query_params, data, response_decoder, traceparent=None):
+        url = self._baseUrl + path
+
+        # With an access token (V3) the Basic credentials are not sent.
+        auth = None if self._accessToken is not None else self._serviceCredentials
+
+        headers = self._headers
+        if traceparent is not None:
+            headers = {**headers, "traceparent": traceparent}
+
+        try:
+            response = await self._client.request(
+                method, url, params=query_params, content=data, headers=headers, auth=auth
+            )
+        except Exception as cause:
+            raise AuthleteApiException(
+                url, query_params, data, "API call to " + path + " failed.", cause)
+
+        if response.status_code < 200 or 300 <= response.status_code:
+            message = self._extract_result_message(response.text)
+            if message is None:
+                message = "{} API returned {}".format(path, response.status_code)
+            raise AuthleteApiException(url, query_params, data, message, None, response)
+
+        if response_decoder is None:
+            return response.text
+
+        try:
+            return response_decoder.decode(response.content)
+        except ValueError as cause:
+            raise AuthleteApiException(
+                url, query_params, data, "Undecodable response from " + path + ".", cause, response)
+
+    @staticmethod
+    def _extract_result_message(body):
+        try:
+            return json.loads(body)['resultMessage']
+        except Exception:
+            return None
+
+    async def _post(self, path, request_body, response_decoder=None):
+        return await self._call_api('POST', self._apiPrefix + path, None, request_body, response_decoder)
+
+    async def _get(self, path, response_decoder=None, query_params=None):
+        return await self._call_api('GET', self._apiPrefix + path, query_params, None, response_decoder)
+
+    # ------------------------------------------------------------------
+    # Authorization endpoint
+    # ------------------------------------------------------------------
+
+    async def authorization(self, request):
+        return await self._post('/auth/authorization', request, decoder.AUTHORIZATION)
+
+    async def authorizationIssue(self, request):
+        return await self._post('/auth/authorization/issue', request, decoder.AUTHORIZATION_ISSUE)
+
+    async def authorizationFail(self, request):
+        return await self._post('/auth/authorization/fail', request, decoder.AUTHORIZATION_FAIL)
+
+    async def pushAuthorizationRequest(self, request):
+        return await self._post('/pushed_auth_req', request, decoder.PUSHED_AUTH_REQ)
+
+    # ------------------------------------------------------------------
+    # Token, introspection, revocation, userinfo
+    # ------------------------------------------------------------------
+
+    async def token(self, request):
+        return await self._post('/auth/token', request, decoder.TOKEN)
+
+    async def introspection(self, request):
+        return await self._post('/auth/introspection', request, decoder.INTROSPECTION)
+
+    async def standardIntrospection(self, request):
+        return await self._post('/auth/introspection/standard', request, decoder.STANDARD_INTROSPECTION)
+
+    async def revocation(self, request):
+        return await self._post('/auth/revocation', request, decoder.REVOCATION)
+
+    async def userinfo(self, request):
+        return await self._post('/auth/userinfo', request, decoder.USERINFO)
+
+    async def userinfoIssue(self, request):
+        return await self._post('/auth/userinfo/issue', request, decoder.USERINFO_ISSUE)
+
+    async def gm(self, request):
+        return await self._post('/gm', request, decoder.GRANT_MANAGEMENT)
+
+    # ------------------------------------------------------------------
+    # Service metadata
+    # ------------------------------------------------------------------
+
+    async def getServiceConfiguration(self, request=None):
+        if request is None:
+            request = ServiceConfigurationRequest()
+            request.pretty = True
+
+        return await self._post('/service/configuration', request)
+
+    async def getServiceJwks(self, pretty=True, includePrivateKeys=False):
+        # requests serialises booleans as 'True'/'False'; keep the same query.
+        params = {"pretty": str(pretty), "includePrivateKeys": str(includePrivateKeys)}
+        return await self._get('/service/jwks/get', None, params)
+
+    # ------------------------------------------------------------------
+    # Client registration and federation
+    # ------------------------------------------------------------------
+
+    async def dynamicClientRegister(self, request):
+        return await self._post('/client/registration', request, decoder.CLIENT_REGISTRATION)
+
+    async def federationConfiguration(self, request):
+        return await self._post('/federation/configuration', request, decoder.FEDERATION_CONFIGURATION)
+
+    async def federationRegistration(self, request):
+        return await self._post('/federation/registration', request, decoder.FEDERATION_REGISTRATION)
+
+    # ------------------------------------------------------------------
+    # Verifiable credentials (OID4VCI)
+    # ------------------------------------------------------------------
+
+    async def credentialIssuerMetadata(self, request):
+        return await self._post('/vci/metadata', request, decoder.CREDENTIAL_ISSUER_METADATA)
+
+    async def credentialJwtIssuerMetadata(self, request):
+        return await self._post('/vci/jwtissuer', request, decoder.CREDENTIAL_JWT_ISSUER_METADATA)
+
+    async def credentialSingleIssue(self, request):
+        return await self._post('/vci/single/issue', request, decoder.CREDENTIAL_SINGLE_ISSUE)
@@ -0,0 +1,205 @@
+"""
+Authlete response decoder
+-------------------------
+The SDK builds every response DTO by reflection: `Jsonable.__init__` walks
+the type's full `nameAndTypes` table (47 attributes for `TokenResponse`),
+checks each value's type and converts enums with `attrType[value]`. That
+runs on every Authlete call, for fields no router reads, and an action the
+installed SDK does not know (e.g. `GrantManagementAction.NO_CONTENT`, which
+authlete-python 1.3.0 lacks) raises `KeyError` and turns the request into a
+500.
+
+A `ResponseDecoder` is compiled once per response type from the fields the
+routers read. Its `decode()` parses the body straight from bytes and runs a
+generated function that assigns each field through its converter into a
+slotted object; everything else in the payload is ignored. To read another
+field in a router, add it to the schema below.
+
+Enum converters are plain dict lookups. A name the enum does not have
+becomes an `UnknownAction` instead of an error: one interned object per
+(enum, name), with a `name` like a member, so it can be compared with `is`,
+keyed in a `ResponseTable`, logged and counted. Names Authlete is known to
+send that are missing from the SDK are declared in `NEWER_ACTIONS`, so the
+tables in api/responses.py can map them like any other member.
+"""
+
+import json
+import logging
+from enum import Enum
+from typing import Any, Callable
+
+from authlete.dto import (
+    AuthorizationAction,
+    AuthorizationFailAction,
+    AuthorizationIssueAction,
+    ClientRegistrationAction,
+    CredentialIssuerMetadataAction,
+    CredentialJwtIssuerMetadataAction,
+    CredentialSingleIssueAction,
+    FederationConfigurationAction,
+    FederationRegistrationAction,
+    GrantManagementAction,
+    IntrospectionAction,
+    PushedAuthReqAction,
+    RevocationAction,
+    StandardIntrospectionAction,
+    TokenAction,
+    UserInfoAction,
+    UserInfoIssueAction,
+)
+
+logger = logging.getLogger(__name__)
+
+# Action names the Authlete API sends that authlete-python 1.3.0 lacks
+NEWER_ACTIONS: dict[type[Enum], tuple[str, ...]] = {
+    GrantManagementAction: ("NO_CONTENT", "NOT_FOUND"),
+}
+
+# Names seen at runtime that nothing declared; interned up to this many per enum
+MAX_UNKNOWN_PER_ENUM = 32
+
+Converter = Callable[[Any], Any]
+
+
+class UnknownAction:
+    """An action name that is not a member of the SDK's enum."""
+
+    __slots__ = ("enum_type", "name")
+
+    def __init__(self, enum_type: type[Enum], name: str):
+        self.enum_type = enum_type
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"<{self.enum_type.__name__}.{self.name} (not in the SDK)>"
+
+
+_members: dict[type[Enum], dict[str, Enum | UnknownAction]] = {}
+_declared: dict[type[Enum], int] = {}
+
+
+def _member_map(enum_type: type[Enum]) -> dict[str, Enum | UnknownAction]:
+    members = _members.get(enum_type)
+    if members is None:
+        members = dict(enum_type.__members__)
+        for name in NEWER_ACTIONS.get(enum_type, ()):
+            members.setdefault(name, UnknownAction(enum_type, name))
+        _members[enum_type] = members
+        _declared[enum_type] = len(members)
+    return members
+
+
+def action_member(enum_type: type[Enum], name: str) -> Enum | UnknownAction:
+    """
+    The member (or declared newer action) called `name`, as `decode()`
+    returns it. Raises KeyError for anything else, so a typo in a response
+    table still fails at import.
+    """
+    return _member_map(enum_type)[name]
+
+
+def enum_converter(enum_type: type[Enum]) -> Converter:
+    members = _member_map(enum_type)
+
+    def unknown(name: str) -> UnknownAction:
+        logger.warning("Authlete sent %s.%s, which the installed SDK does not define.", enum_type.__name__, name)
+        member = UnknownAction(enum_type, name)
+        if len(members) - _declared[enum_type] < MAX_UNKNOWN_PER_ENUM:
+            members[name] = member
+        return member
+
+    def convert(value):
+        member = members.get(value)
+        return member if member is not None else unknown(str(value))
+
+    return convert
+
+
+class DecodedResponse:
+    """Base of the compiled response types; slots only, no per-instance dict."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class ResponseDecoder:
+    """Decodes one Authlete response type into a slotted object with `fields`."""
+
+    def __init__(self, name: str, fields: dict[str, Converter | None]):
+        for field_name in fields:
+            if not field_name.isidentifier():
+                raise ValueError(f"Invalid field name {field_name!r}")
+        self.name = name
+        self.type = type(name, (DecodedResponse,), {"__slots__": tuple(fields), "__module__": __name__})
+        self.from_payload = self._compile(fields)
+
+    def _compile(self, fields: dict[str, Converter | None]) -> Callable[[dict], DecodedResponse]:
+        # One straight-line function per type, like dataclasses generates __init__
+        namespace: dict[str, Any] = {"new": object.__new__, "cls": self.type}
+        lines = ["def from_payload(payload):", "    get = payload.get", "    obj = new(cls)"]
+        for i, (field_name, convert) in enumerate(fields.items()):
+            if convert is None:
+                lines.append(f"    obj.{field_name} = get({field_name!r})")
+            else:
+                namespace[f"convert{i}"] = convert
+                lines.append(f"    value = get({field_name!r})")
+                lines.append(f"    obj.{field_name} = None if value is None else convert{i}(value)")
+        lines.append("    return obj")
+        exec("\n".join(lines), namespace)
+        return namespace["from_payload"]
+
+    def decode(self, body: bytes | str) -> DecodedResponse:
+        payload = json.loads(body)
+        if not isinstance(payload, dict):
+            raise ValueError(f"{self.name}: expected a JSON object, got {type(payload).__name__}")
+        return self.from_payload(payload)
+
+    def nested(self) -> Converter:
+        """Converter for an object-valued field of another type."""
+        from_payload = self.from_payload
+        return lambda value: from_payload(value) if isinstance(value, dict) else None
+
+    def nested_list(self) -> Converter:
+        """Converter for a field holding an array of objects of this type."""
+        from_payload = self.from_payload
+        return lambda value: [from_payload(item) for item in value if isinstance(item, dict)] \
+            if isinstance(value, list) else None
+
+    def __repr__(self) -> str:
+        return f"ResponseDecoder({self.name}, {self.type.__slots__})"
+
+
+def _action_response(name: str, action_type: type[Enum], **fields: Converter | None) -> ResponseDecoder:
+    return ResponseDecoder(name, {"action": enum_converter(action_type), "responseContent": None, **fields})
+
+
+# ----------------------------------------------------------------------
+# Schemas: the fields the routers (and their log lines) read
+# ----------------------------------------------------------------------
+
+CLIENT = ResponseDecoder("Client", {"clientId": None, "clientName": None})
+SCOPE = ResponseDecoder("Scope", {"name": None, "description": None})
+
+AUTHORIZATION = _action_response("AuthorizationResponse", AuthorizationAction, ticket=None, client=CLIENT.nested(),
+                                 scopes=SCOPE.nested_list())
+AUTHORIZATION_ISSUE = _action_response("AuthorizationIssueResponse", AuthorizationIssueAction)
+AUTHORIZATION_FAIL = _action_response("AuthorizationFailResponse", AuthorizationFailAction)
+PUSHED_AUTH_REQ = _action_response("PushedAuthReqResponse", PushedAuthReqAction)
+
+TOKEN = _action_response("TokenResponse", TokenAction)
+INTROSPECTION = _action_response("IntrospectionResponse", IntrospectionAction)
+STANDARD_INTROSPECTION = _action_response("StandardIntrospectionResponse", StandardIntrospectionAction)
+REVOCATION = _action_response("RevocationResponse", RevocationAction)
+USERINFO = _action_response("UserInfoResponse", UserInfoAction, subject=None, claims=None)
+USERINFO_ISSUE = _action_response("UserInfoIssueResponse", UserInfoIssueAction)
+GRANT_MANAGEMENT = _action_response("GrantManagementResponse", GrantManagementAction)
+
+CLIENT_REGISTRATION = _action_response("ClientRegistrationResponse", ClientRegistrationAction)
+FEDERATION_CONFIGURATION = _action_response("FederationConfigurationResponse", FederationConfigurationAction)
+FEDERATION_REGISTRATION = _action_response("FederationRegistrationResponse", FederationRegistrationAction)
+CREDENTIAL_ISSUER_METADATA = _action_response("CredentialIssuerMetadataResponse", CredentialIssuerMetadataAction)
+CREDENTIAL_JWT_ISSUER_METADATA = _action_response("CredentialJwtIssuerMetadataResponse", CredentialJwtIssuerMetadataAction)
+CREDENTIAL_SINGLE_ISSUE = _action_response("CredentialSingleIssueResponse", CredentialSingleIssueAction)
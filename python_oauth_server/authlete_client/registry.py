@@ -0,0 +1,224 @@
+"""
+Application-scoped Authlete client registry.
+
+One `AuthleteClientRegistry` is created by the FastAPI lifespan hook in
+`main.py`. It parses `authlete.properties` once, owns the single bounded
+keep-alive connection pool used for every Authlete call, and hands the shared
+`AsyncAuthleteApi` to the routers through the `get_authlete_api` dependency.
+
+Pool sizing is configured through environment variables:
+
+    AUTHLETE_PROPERTIES                 path to the properties file
+    AUTHLETE_POOL_MAX_CONNECTIONS       hard cap on open connections (100)
+    AUTHLETE_POOL_MAX_KEEPALIVE         idle connections kept warm (20)
+    AUTHLETE_POOL_KEEPALIVE_EXPIRY      seconds an idle connection is kept (30)
+    AUTHLETE_CONNECT_TIMEOUT            seconds (5)
+    AUTHLETE_READ_TIMEOUT               seconds (10)
+    AUTHLETE_POOL_TIMEOUT               seconds to wait for a free connection (5)
+    AUTHLETE_HTTP2                      "true" to negotiate HTTP/2 (needs `h2`)
+    AUTHLETE_SINGLE_FLIGHT              "false" to stop coalescing identical
+                                        read-only calls (see single_flight.py)
+    AUTHLETE_MOCK                       "true" to run offline against a local
+                                        mock Authlete (see mock_authlete/)
+
+Per-operation timeouts, circuit breakers and bulkheads are configured in
+resilience.py.
+"""
+
+import logging
+import os
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING
+
+import httpx
+from authlete.conf.authlete_ini_configuration import AuthleteIniConfiguration
+from fastapi import Request
+
+from authlete_client.async_api import AsyncAuthleteApi
+from authlete_client.resilience import CallGuard
+from authlete_client.single_flight import SingleFlight
+
+if TYPE_CHECKING:
+    from mock_authlete import MockAuthleteServer
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 10.0
+    pool_timeout: float = 5.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        return cls(
+            max_connections=int(os.getenv("AUTHLETE_POOL_MAX_CONNECTIONS", cls.max_connections)),
+            max_keepalive_connections=int(os.getenv("AUTHLETE_POOL_MAX_KEEPALIVE", cls.max_keepalive_connections)),
+            keepalive_expiry=float(os.getenv("AUTHLETE_POOL_KEEPALIVE_EXPIRY", cls.keepalive_expiry)),
+            connect_timeout=float(os.getenv("AUTHLETE_CONNECT_TIMEOUT", cls.connect_timeout)),
+            read_timeout=float(os.getenv("AUTHLETE_READ_TIMEOUT", cls.read_timeout)),
+            pool_timeout=float(os.getenv("AUTHLETE_POOL_TIMEOUT", cls.pool_timeout)),
+            http2=_env_bool("AUTHLETE_HTTP2", cls.http2),
+        )
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response body wrapper that ends the in-flight request once the body is closed."""
+
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            on_close, self._on_close = self._on_close, None
+            if on_close is not None:
+                on_close()
+
+
+class _PooledTransport(httpx.AsyncBaseTransport):
+    """
+    AsyncHTTPTransport wrapper that counts requests, requests currently in
+    flight (holding or queued for a connection), and requests that had to
+    wait for a free connection.
+    """
+
+    def __init__(self, settings: PoolSettings):
+        self._transport = httpx.AsyncHTTPTransport(
+            http2=settings.http2,
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive_connections,
+                keepalive_expiry=settings.keepalive_expiry,
+            ),
+        )
+        self._max_connections = settings.max_connections
+        self.requests = 0
+        self.in_flight = 0
+        self.waits = 0
+
+    def _release(self):
+        self.in_flight -= 1
+
+    async def handle_async_request(self, request):
+        self.requests += 1
+        # HTTP/1.1 carries one request per connection, so once every
+        # connection is busy the next request queues inside the pool.
+        if self.in_flight >= self._max_connections:
+            self.waits += 1
+        self.in_flight += 1
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self._release()
+            raise
+
+        response.stream = _TrackedStream(response.stream, self._release)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+    def connections(self) -> list | None:
+        # httpcore's pool is not public API; without it the stats leave out connection counts
+        pool = getattr(self._transport, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        return list(connections) if connections is not None else None
+
+
+class AuthleteClientRegistry:
+    def __init__(self, conf, settings: PoolSettings | None = None, single_flight: SingleFlight | None = None,
+                 guard: CallGuard | None = None, mock: "MockAuthleteServer | None" = None):
+        settings = settings or PoolSettings()
+        # Set when the registry started its own mock Authlete (AUTHLETE_MOCK)
+        self.mock = mock
+
+        if settings.http2:
+            try:
+                import h2  # noqa: F401
+            except ModuleNotFoundError:
+                logger.warning("AUTHLETE_HTTP2 requested but the 'h2' package is not installed; using HTTP/1.1.")
+                settings = replace(settings, http2=False)
+
+        self.settings = settings
+        self._transport = _PooledTransport(settings)
+        self._client = httpx.AsyncClient(
+            transport=self._transport,
+            timeout=httpx.Timeout(
+                settings.read_timeout,
+                connect=settings.connect_timeout,
+                pool=settings.pool_timeout,
+            ),
+        )
+        self.api = AsyncAuthleteApi(conf, client=self._client, single_flight=single_flight, guard=guard)
+
+    @classmethod
+    def from_env(cls) -> "AuthleteClientRegistry":
+        mock = None
+        if _env_bool("AUTHLETE_MOCK", False):
+            # Imported here so that production runs do not load the mock
+            from mock_authlete import MockSettings, mock_configuration, start_mock_authlete
+
+            mock = start_mock_authlete(MockSettings.from_env(), port=int(os.getenv("AUTHLETE_MOCK_PORT", 0)))
+            logger.warning("AUTHLETE_MOCK is set: Authlete calls go to the local mock at %s", mock.base_url)
+            conf = mock_configuration(mock.base_url)
+        else:
+            conf = AuthleteIniConfiguration(os.getenv("AUTHLETE_PROPERTIES", "authlete.properties"))
+        return cls(conf, PoolSettings.from_env(), SingleFlight.from_env(), CallGuard.from_env(), mock)
+
+    def pool_stats(self) -> dict:
+        stats = {
+            "max_connections": self.settings.max_connections,
+            "max_keepalive_connections": self.settings.max_keepalive_connections,
+            "http2": self.settings.http2,
+            "in_flight": self._transport.in_flight,
+            "requests": self._transport.requests,
+            "waits": self._transport.waits,
+        }
+        connections = self._transport.connections()
+        if connections is not None:
+            idle = sum(1 for connection in connections if getattr(connection, "is_idle", lambda: False)())
+            stats.update(connections=len(connections), idle=idle, in_use=len(connections) - idle)
+        return stats
+
+    def single_flight_stats(self) -> dict:
+        if self.api.single_flight is None:
+            return {"enabled": False}
+        return self.api.single_flight.stats()
+
+    def resilience_stats(self) -> dict:
+        if self.api.guard is None:
+            return {"enabled": False}
+        return self.api.guard.stats()
+
+    async def aclose(self):
+        await self._client.aclose()
+        if self.mock is not None:
+            self.mock.stop()
+
+
+def get_registry(request: Request) -> AuthleteClientRegistry:
+    return request.app.state.authlete
+
+
+def get_authlete_api(request: Request) -> AsyncAuthleteApi:
+    """FastAPI dependency returning the application-wide Authlete client."""
+    return request.app.state.authlete.api
@@ -0,0 +1,318 @@
+"""
+Deadlines, circuit breakers and bulkheads for Authlete calls
+------------------------------------------------------------
+Without these, a slow Authlete operation ties up every request that needs it
+until the read timeout, and because all operations share one connection pool
+and one event loop, a slow `credentialSingleIssue` or `federationRegistration`
+drags `token` and `standardIntrospection` down with it. `CallGuard` wraps each
+upstream call with three independent protections:
+
+Deadline
+    `DeadlineMiddleware` gives every request a deadline (`REQUEST_DEADLINE`
+    seconds after it arrives). Each Authlete call is bounded by the smaller of
+    its operation group's timeout (`AUTHLETE_TIMEOUTS`) and the time left
+    until that deadline, so a request that already spent most of its budget
+    does not start a long upstream call it cannot finish.
+
+Circuit breaker (per operation)
+    After `AUTHLETE_BREAKER_FAILURES` consecutive failures (timeouts,
+    connection errors, 5xx from Authlete) the operation's breaker opens and
+    calls fail immediately for `AUTHLETE_BREAKER_RESET` seconds. Then a single
+    probe call is let through (half-open); its outcome closes or re-opens the
+    breaker. A 4xx from Authlete is an answer, not a failure.
+
+Bulkhead (per operation group)
+    A semaphore caps how many calls of each group can be in flight
+    (`AUTHLETE_BULKHEADS`), so one group cannot take every pooled connection.
+    A call waits at most `AUTHLETE_BULKHEAD_WAIT` seconds for a slot.
+
+Every rejection raises `AuthleteUnavailable`, which the application turns into
+`503 {"error": "temporarily_unavailable"}` with a `Retry-After` header.
+
+    AUTHLETE_TIMEOUTS     e.g. "token=5,introspection=3" (others: AUTHLETE_TIMEOUT_DEFAULT, 10)
+    AUTHLETE_BULKHEADS    e.g. "credential=5,federation=2" (overrides DEFAULT_BULKHEADS)
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+from typing import Awaitable, Callable
+
+from authlete.api.authlete_api_exception import AuthleteApiException
+
+from observability.metrics import REGISTRY
+
+OPERATION_GROUPS = {
+    "/auth/token": "token",
+    "/auth/revocation": "token",
+    "/auth/introspection": "introspection",
+    "/auth/introspection/standard": "introspection",
+    "/auth/authorization": "authorization",
+    "/auth/authorization/issue": "authorization",
+    "/auth/authorization/fail": "authorization",
+    "/pushed_auth_req": "authorization",
+    "/auth/userinfo": "userinfo",
+    "/auth/userinfo/issue": "userinfo",
+    "/vci/single/issue": "credential",
+    "/federation/configuration": "federation",
+    "/federation/registration": "federation",
+    "/service/configuration": "metadata",
+    "/service/jwks/get": "metadata",
+    "/vci/metadata": "metadata",
+    "/vci/jwtissuer": "metadata",
+}
+DEFAULT_GROUP = "default"
+
+DEFAULT_BULKHEADS = {
+    "token": 40,
+    "introspection": 40,
+    "authorization": 30,
+    "userinfo": 20,
+    "credential": 10,
+    "metadata": 10,
+    "federation": 5,
+    DEFAULT_GROUP: 10,
+}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+BREAKER_STATE = REGISTRY.gauge(
+    "authlete_circuit_breaker_state", "Circuit breaker state per operation (0 closed, 1 open, 2 half-open).",
+    ("operation",))
+AUTHLETE_CALLS_REJECTED = REGISTRY.counter(
+    "authlete_api_calls_rejected", "Authlete calls failed fast, by operation and reason.",
+    ("operation", "reason"))
+
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar("request_deadline", default=None)
+
+
+class AuthleteUnavailable(Exception):
+    def __init__(self, operation: str, reason: str, retry_after: float = 1.0):
+        super().__init__(f"Authlete {operation} unavailable ({reason})")
+        self.operation = operation
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _parse_mapping(spec: str, convert) -> dict:
+    mapping = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        mapping[name.strip()] = convert(value)
+    return mapping
+
+
+def is_upstream_failure(error: AuthleteApiException) -> bool:
+    """Connection errors and 5xx count against the breaker; 4xx are answers."""
+    return error.response is None or error.response.status_code >= 500
+
+
+# ----------------------------------------------------------------------
+# Deadline
+# ----------------------------------------------------------------------
+
+class DeadlineMiddleware:
+    """Pure ASGI middleware setting the request deadline for the Authlete calls it makes."""
+
+    def __init__(self, app, timeout: float | None = None):
+        self.app = app
+        self.timeout = timeout if timeout is not None else float(os.getenv("REQUEST_DEADLINE", 15))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = _deadline.set(time.monotonic() + self.timeout)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
+
+
+def remaining_time() -> float | None:
+    """Seconds left until the current request's deadline, or None outside a request."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+# ----------------------------------------------------------------------
+# Circuit breaker and bulkhead
+# ----------------------------------------------------------------------
+
+class CircuitBreaker:
+    def __init__(self, operation: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.operation = operation
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._probing = False
+        self._gauge = BREAKER_STATE.labels(operation)
+
+    def _set_state(self, state: str):
+        self.state = state
+        self._gauge.set(_STATE_VALUES[state])
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def before_call(self) -> bool:
+        """
+        Raises AuthleteUnavailable if the call must not be made. Returns True
+        when the admitted call is the half-open probe.
+        """
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                raise AuthleteUnavailable(self.operation, "circuit_open", self.retry_after())
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probing:
+                raise AuthleteUnavailable(self.operation, "circuit_open", 1.0)
+            self._probing = True
+            return True
+        return False
+
+    def end_probe(self):
+        # Whatever happened (including cancellation), the probe slot is free
+        self._probing = False
+
+    def record_success(self):
+        self.failures = 0
+        if self.state != CLOSED:
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+            self.trips += 1
+            self._set_state(OPEN)
+
+    def stats(self) -> dict:
+        stats = {"state": self.state, "consecutive_failures": self.failures, "trips": self.trips}
+        if self.state == OPEN:
+            stats["retry_after"] = round(self.retry_after(), 3)
+        return stats
+
+
+class Bulkhead:
+    def __init__(self, group: str, limit: int):
+        self.group = group
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def acquire(self, timeout: float) -> bool:
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        else:
+            self.waiting += 1
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._semaphore.acquire()
+            except TimeoutError:
+                self.rejected += 1
+                return False
+            finally:
+                self.waiting -= 1
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "in_flight": self.in_flight, "waiting": self.waiting, "rejected": self.rejected}
+
+
+# ----------------------------------------------------------------------
+# Guard
+# ----------------------------------------------------------------------
+
+class CallGuard:
+    def __init__(self, timeouts: dict[str, float] | None = None, default_timeout: float = 10.0,
+                 bulkheads: dict[str, int] | None = None, bulkhead_wait: float = 0.5,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.bulkhead_wait = bulkhead_wait
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        limits = {**DEFAULT_BULKHEADS, **(bulkheads or {})}
+        self.bulkheads = {group: Bulkhead(group, limit) for group, limit in limits.items()}
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def from_env(cls) -> "CallGuard":
+        return cls(
+            timeouts=_parse_mapping(os.getenv("AUTHLETE_TIMEOUTS", ""), float),
+            default_timeout=float(os.getenv("AUTHLETE_TIMEOUT_DEFAULT", 10)),
+            bulkheads=_parse_mapping(os.getenv("AUTHLETE_BULKHEADS", ""), int),
+            bulkhead_wait=float(os.getenv("AUTHLETE_BULKHEAD_WAIT", 0.5)),
+            failure_threshold=int(os.getenv("AUTHLETE_BREAKER_FAILURES", 5)),
+            reset_timeout=float(os.getenv("AUTHLETE_BREAKER_RESET", 30)),
+        )
+
+    def breaker(self, operation: str) -> CircuitBreaker:
+        breaker = self.breakers.get(operation)
+        if breaker is None:
+            breaker = self.breakers[operation] = CircuitBreaker(operation, self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def _reject(self, operation: str, reason: str, retry_after: float = 1.0):
+        AUTHLETE_CALLS_REJECTED.labels(operation, reason).inc()
+        return AuthleteUnavailable(operation, reason, retry_after)
+
+    async def call(self, operation: str, call: Callable[[], Awaitable]):
+        group = OPERATION_GROUPS.get(operation, DEFAULT_GROUP)
+        timeout = self.timeouts.get(group, self.default_timeout)
+        remaining = remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                raise self._reject(operation, "deadline_exceeded")
+            timeout = min(timeout, remaining)
+
+        breaker = self.breaker(operation)
+        try:
+            probe = breaker.before_call()
+        except AuthleteUnavailable as e:
+            raise self._reject(operation, e.reason, e.retry_after) from None
+
+        try:
+            bulkhead = self.bulkheads.get(group) or self.bulkheads[DEFAULT_GROUP]
+            started = time.monotonic()
+            if not await bulkhead.acquire(min(self.bulkhead_wait, timeout)):
+                raise self._reject(operation, "bulkhead_full")
+            try:
+                async with asyncio.timeout(timeout - (time.monotonic() - started)):
+                    result = await call()
+            except TimeoutError:
+                breaker.record_failure()
+                raise self._reject(operation, "timeout") from None
+            except AuthleteApiException as e:
+                if is_upstream_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                raise
+            finally:
+                bulkhead.release()
+            breaker.record_success()
+            return result
+        finally:
+            if probe:
+                breaker.end_probe()
+
+    def stats(self) -> dict:
+        return {
+            "breakers": {operation: breaker.stats() for operation, breaker in self.breakers.items()},
+            "bulkheads": {group: bulkhead.stats() for group, bulkhead in self.bulkheads.items()},
+        }
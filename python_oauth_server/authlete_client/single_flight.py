@@ -0,0 +1,102 @@
+"""
+Single-flight coalescing of identical Authlete calls
+----------------------------------------------------
+When a deploy makes hundreds of RPs fetch discovery, JWKS or the federation
+entity configuration at once, or a resource server introspects one hot token
+from many requests, every request used to make its own, identical Authlete
+call. `SingleFlight` lets the first caller (the leader) make the call and
+every identical call that arrives while it is in flight wait for, and share,
+the same result or exception.
+
+Only read-only operations are coalesced (`COALESCED_OPERATIONS`); anything
+that issues, consumes or changes state (authorization, token, revocation...)
+always gets its own call. Two calls are identical when the operation, the
+query and the request body match after canonicalization: JSON keys are
+sorted and the urlencoded `parameters` string is put in a stable key order,
+so the same request sent with its fields in a different order still
+coalesces. Keys are SHA-256 digests, so tokens are not held as dict keys.
+
+The shared result object is handed to every waiter and must be treated as
+read-only. The upstream call runs in its own task: a leader whose client
+disconnects does not cancel the call for the other waiters.
+
+Enabled by default; `AUTHLETE_SINGLE_FLIGHT=false` turns it off.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from typing import Awaitable, Callable
+
+from observability.metrics import REGISTRY
+
+COALESCED_OPERATIONS = frozenset({
+    "/service/configuration",
+    "/service/jwks/get",
+    "/federation/configuration",
+    "/vci/metadata",
+    "/vci/jwtissuer",
+    "/auth/introspection",
+    "/auth/introspection/standard",
+})
+
+AUTHLETE_CALLS_COALESCED = REGISTRY.counter(
+    "authlete_api_calls_coalesced", "Authlete calls answered by an identical call already in flight, by operation.",
+    ("operation",))
+
+
+def _canonical_parameters(parameters: str) -> str:
+    # Stable sort on the key only: repeated keys keep their relative order
+    return "&".join(sorted(parameters.split("&"), key=lambda pair: pair.partition("=")[0]))
+
+
+def canonical_key(method: str, operation: str, query_params: dict | None, data: str | None) -> bytes:
+    body = ""
+    if data:
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            body = data
+        else:
+            if isinstance(payload, dict) and isinstance(payload.get("parameters"), str):
+                payload["parameters"] = _canonical_parameters(payload["parameters"])
+            body = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    query = "&".join(f"{k}={v}" for k, v in sorted(query_params.items())) if query_params else ""
+    return hashlib.sha256(f"{method} {operation}?{query}\n{body}".encode("utf-8")).digest()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict[bytes, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls) -> "SingleFlight | None":
+        if os.getenv("AUTHLETE_SINGLE_FLIGHT", "true").strip().lower() not in ("1", "true", "yes", "on"):
+            return None
+        return cls()
+
+    async def do(self, key: bytes, operation: str, call: Callable[[], Awaitable]):
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._call_done(key, done))
+        else:
+            self.coalesced += 1
+            AUTHLETE_CALLS_COALESCED.labels(operation).inc()
+        return await asyncio.shield(task)
+
+    def _call_done(self, key: bytes, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Every waiter may have gone away; retrieve the exception so it is
+        # not reported as never retrieved.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {"enabled": True, "in_flight": len(self._calls), "calls": self.calls, "coalesced": self.coalesced}
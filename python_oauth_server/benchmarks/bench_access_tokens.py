@@ -0,0 +1,115 @@
+"""
+Access token benchmark: local JWT pre-validation vs an Authlete round trip
+=========================================================================
+Times `AccessTokenValidator.check()` on the token shapes a protected
+endpoint sees, signed with the mock Authlete's ES256 key and checked
+against its JWKS, and compares them with what a rejected token used to
+cost: one `/auth/userinfo` call to a local mock Authlete answering after
+`--latency` seconds.
+
+    valid (first)    signature verified, token remembered
+    valid (cached)   same token again: one SHA-256 and a dict lookup
+    expired          refused on exp, before any signature check
+    garbage          refused while splitting the JWS
+    bad signature    payload altered after signing
+    forged (again)   the same altered tokens replayed: the rejection is cached
+    unknown kid      signed by a key the JWKS does not have
+
+Usage (from python_oauth_server/):
+
+    uv run python -m benchmarks.bench_access_tokens --latency 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import secrets
+import time
+
+from authlete.dto.userinfo_request import UserInfoRequest
+from jwt.utils import base64url_encode
+
+from authlete_client import AsyncAuthleteApi
+from cache import CachedDocument
+from mock_authlete import MockSettings, mock_configuration, start_mock_authlete
+from mock_authlete.service import es256_jwt, service_jwks
+from security import AccessTokenValidator
+
+ISSUER = "http://localhost:8000"
+
+
+def claims(lifetime: int = 3600) -> dict:
+    now = int(time.time())
+    return {"iss": ISSUER, "sub": "1001", "client_id": "1234567", "scope": "openid profile",
+            "iat": now, "exp": now + lifetime, "jti": secrets.token_urlsafe(16)}
+
+
+def tampered(token: str) -> str:
+    header, payload, signature = token.split(".")
+    other = es256_jwt({**claims(), "sub": "1002"}).split(".")[1]
+    return f"{header}.{other}.{signature}"
+
+
+def foreign_kid(token: str) -> str:
+    header, payload, signature = token.split(".")
+    other = base64url_encode(json.dumps({"alg": "ES256", "typ": "at+jwt", "kid": "rotated-away"}).encode()).decode()
+    return f"{other}.{payload}.{signature}"
+
+
+async def timed(check, tokens: list[str]) -> float:
+    started = time.perf_counter()
+    for token in tokens:
+        await check(token)
+    return (time.perf_counter() - started) / len(tokens) * 1e6
+
+
+def validator() -> AccessTokenValidator:
+    jwks = CachedDocument.build(json.dumps(service_jwks()).encode(), "application/json")
+
+    async def load(refresh: bool) -> CachedDocument:
+        return jwks
+
+    return AccessTokenValidator(load, issuer=ISSUER, min_refresh=3600)
+
+
+async def main(args):
+    n = args.tokens
+    fresh = [es256_jwt(claims(), typ="at+jwt") for _ in range(n)]
+    cases = {
+        "valid (first)": fresh,
+        "valid (cached)": fresh,
+        "expired": [es256_jwt(claims(lifetime=-3600)) for _ in range(n)],
+        "garbage": [secrets.token_urlsafe(32) for _ in range(n)],
+        "bad signature": (forged := [tampered(token) for token in fresh[: max(n // 10, 1)]]),
+        "forged (again)": forged,
+        "unknown kid": [foreign_kid(token) for token in fresh[: max(n // 10, 1)]],
+    }
+
+    local = validator()
+    print(f"{'token':<16}{'us/check':>10}  outcome")
+    for name, tokens in cases.items():
+        us = await timed(local.check, tokens)
+        outcome = await local.check(tokens[0])
+        print(f"{name:<16}{us:>10.1f}  {outcome.reason if outcome else 'to Authlete'}")
+
+    mock = start_mock_authlete(MockSettings(latency=args.latency))
+    api = AsyncAuthleteApi(mock_configuration(mock.base_url))
+
+    async def round_trip(token: str):
+        req = UserInfoRequest()
+        req.token = token
+        return await api.userinfo(req)
+
+    us = await timed(round_trip, cases["garbage"][: args.round_trips])
+    print(f"{'Authlete call':<16}{us:>10.1f}  userinfo, mock latency {args.latency * 1000:.0f} ms")
+    await api.aclose()
+    mock.stop()
+    print(f"\n{local.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=500, help="tokens per case")
+    parser.add_argument("--round-trips", type=int, default=100, help="userinfo calls to the mock")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock Authlete latency in seconds")
+    asyncio.run(main(parser.parse_args()))
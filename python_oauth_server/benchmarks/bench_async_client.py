@@ -0,0 +1,85 @@
+"""
+Load benchmark: blocking SDK client vs AsyncAuthleteApi
+=======================================================
+Simulates an `async def` handler that makes one Authlete call
+(`standardIntrospection`) and drives it at increasing concurrency against a
+local mock Authlete (mock_authlete) that answers after a fixed latency.
+
+    sync   -> AuthleteApiImpl called directly inside the coroutine (old routers)
+    async  -> await AsyncAuthleteApi (current routers)
+
+With the blocking client, throughput stays flat at ~1/latency no matter how
+many requests are in flight, because every call freezes the event loop. With
+the async client, throughput grows with concurrency until the pool or the
+upstream saturates.
+
+Usage (from python_oauth_server/):
+
+    uv run python -m benchmarks.bench_async_client --latency 0.02 --requests 400
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from authlete.api.authlete_api_impl import AuthleteApiImpl
+from authlete.dto.standard_introspection_request import StandardIntrospectionRequest
+
+from authlete_client import AsyncAuthleteApi
+from mock_authlete import MockSettings, mock_configuration, start_mock_authlete
+
+
+async def run_level(call, concurrency: int, total: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            req = StandardIntrospectionRequest()
+            req.parameters = "token=bench"
+            started = time.perf_counter()
+            await call(req)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main(args):
+    mock = start_mock_authlete(MockSettings(latency=args.latency))
+    conf = mock_configuration(mock.base_url)
+
+    sync_api = AuthleteApiImpl(conf)
+    async_api = AsyncAuthleteApi(conf)
+
+    async def sync_call(req):
+        # Exactly what the routers used to do: a blocking call in a coroutine.
+        return sync_api.standardIntrospection(req)
+
+    print(f"upstream latency {args.latency * 1000:.0f} ms, {args.requests} requests per level\n")
+    print(f"{'client':<7}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+
+    for concurrency in args.concurrency:
+        for name, call in (("sync", sync_call), ("async", async_api.standardIntrospection)):
+            result = await run_level(call, concurrency, args.requests)
+            print(f"{name:<7}{concurrency:>6}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}")
+
+    await async_api.aclose()
+    mock.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.02, help="mock Authlete latency in seconds")
+    parser.add_argument("--requests", type=int, default=400, help="requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    asyncio.run(main(parser.parse_args()))
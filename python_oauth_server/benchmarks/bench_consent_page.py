@@ -0,0 +1,112 @@
+"""
+Consent page benchmark: TemplateResponse vs the precompiled template
+=====================================================================
+Serves the INTERACTION page (templates/authorization.html, with a ticket,
+a client name and `--scopes` requested scopes) from a bare FastAPI app,
+called directly as an ASGI app with the scope uvicorn sends (spec 2.3). The
+numbers are the server-side rendering and response cost, without an
+Authlete call or a socket:
+
+    template-response   Jinja2Templates(...).TemplateResponse per request (old router)
+    compiled            ConsentPage.response(): template compiled at startup,
+                        render() into an HTMLResponse (current)
+
+The `render us` column is the page alone, without the request/response
+round trip.
+
+Usage (from python_oauth_server/):
+
+    uv run python -m benchmarks.bench_consent_page --requests 5000 --scopes 4
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse
+from fastapi.templating import Jinja2Templates
+
+from api.consent_page import TEMPLATES_DIR, TEMPLATE_NAME, ConsentPage, ConsentScope
+
+TICKET = "hWGUSvUO1KYEdPg4TvL7ZoXfcqjTGRvhB-EHjQ8jpJU"
+CLIENT_NAME = "Bench RP & Co"
+DESCRIPTIONS = ["Your identity", "Your name and picture", "Your e-mail address", "Offline access <refresh>"]
+
+
+def build_app(scopes: list[ConsentScope]) -> tuple[FastAPI, dict]:
+    app = FastAPI()
+    page = ConsentPage.from_env()
+    context = {"ticket": TICKET, "client_name": CLIENT_NAME, "scopes": scopes}
+
+    async def template_response(request: Request):
+        # What the router did: a fresh TemplateResponse (lookup + render) per request
+        templates = app.state.templates
+        return templates.TemplateResponse(request, TEMPLATE_NAME, context)
+
+    async def compiled():
+        return page.response(TICKET, CLIENT_NAME, scopes)
+
+    app.state.templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+    renderers = {
+        "template-response": (template_response, lambda: app.state.templates.get_template(TEMPLATE_NAME).render(context)),
+        "compiled": (compiled, lambda: page.render(TICKET, CLIENT_NAME, scopes)),
+    }
+    for name, (endpoint, _) in renderers.items():
+        if name == "template-response":
+            app.add_api_route(f"/{name}", endpoint)
+        else:
+            app.add_api_route(f"/{name}", endpoint, response_class=HTMLResponse)
+    return app, renderers
+
+
+def render_us(render, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        render()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def get(app: FastAPI, path: str) -> bytes:
+    """One GET through the ASGI interface; returns the body."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"bench")], "server": ("bench", 80), "client": ("127.0.0.1", 1),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def main(args):
+    scopes = [ConsentScope(f"scope{i}", DESCRIPTIONS[i % len(DESCRIPTIONS)]) for i in range(args.scopes)]
+    app, renderers = build_app(scopes)
+
+    print(f"{args.scopes} scopes, {args.requests} requests per row\n")
+    print(f"{'renderer':<20}{'render us':>10}{'resp/s':>10}{'speedup':>9}")
+    baseline = None
+    expected = await get(app, "/template-response")
+    for name, (_, render) in renderers.items():
+        assert await get(app, f"/{name}") == expected, f"{name} renders a different page"
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            await get(app, f"/{name}")
+        rps = args.requests / (time.perf_counter() - started)
+        baseline = baseline or rps
+        print(f"{name:<20}{render_us(render, args.requests):>10.1f}{rps:>10.0f}{rps / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--scopes", type=int, default=4, help="requested scopes on the page")
+    asyncio.run(main(parser.parse_args()))
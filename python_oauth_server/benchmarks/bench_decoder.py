@@ -0,0 +1,125 @@
+"""
+Decode microbenchmark: SDK Jsonable.from_json vs compiled ResponseDecoder
+=========================================================================
+Decodes typical Authlete response bodies (every field of the DTO present,
+as the API sends them, most of them null) and measures, per response, the
+time and the allocations still live once the object is built:
+
+    sdk        XResponse.from_json(body.decode())           (old client)
+    compiled   authlete_client.decoder.X.decode(body)       (current)
+
+The last row is a grant management DELETE answered with NO_CONTENT, an action
+authlete-python 1.3.0 does not define: the SDK raises KeyError (which used to
+need sdk_compat_patch.py), the decoder returns an UnknownAction.
+
+Usage (from python_oauth_server/):
+
+    uv run python -m benchmarks.bench_decoder --iterations 20000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from authlete.dto import (
+    AuthorizationResponse,
+    GrantManagementResponse,
+    IntrospectionResponse,
+    StandardIntrospectionResponse,
+    TokenResponse,
+    UserInfoResponse,
+)
+from authlete.dto.client import Client
+
+from authlete_client import decoder
+
+ACCESS_TOKEN = "Zs3VqM2hKkUjZ1r9fV0m5uT7oO8s2aQ4bC6dE8fG0hI"
+
+
+def body(dto_type: type, **values) -> bytes:
+    # Every attribute of the DTO, null unless given, like the Authlete API
+    return json.dumps({**dict.fromkeys(vars(dto_type())), **values}).encode()
+
+
+CLIENT = {**dict.fromkeys(vars(Client())), "clientId": 1234567890, "clientName": "Bench RP",
+          "redirectUris": ["https://client.example.org/cb"], "tokenAuthMethod": "CLIENT_SECRET_BASIC",
+          "grantTypes": ["AUTHORIZATION_CODE", "REFRESH_TOKEN"], "responseTypes": ["CODE"]}
+
+CASES = {
+    "token": (TokenResponse, decoder.TOKEN, body(
+        TokenResponse, action="OK", resultCode="A050001", resultMessage="[A050001] The token request was processed.",
+        responseContent=json.dumps({"access_token": ACCESS_TOKEN, "refresh_token": ACCESS_TOKEN[::-1],
+                                    "token_type": "Bearer", "expires_in": 86400, "scope": "openid profile email"}),
+        accessToken=ACCESS_TOKEN, accessTokenDuration=86400, accessTokenExpiresAt=1792400000000,
+        refreshToken=ACCESS_TOKEN[::-1], refreshTokenDuration=864000, clientId=1234567890, subject="1001",
+        grantType="AUTHORIZATION_CODE", scopes=["openid", "profile", "email"], clientAuthMethod="CLIENT_SECRET_BASIC",
+        clientIdAliasUsed=False, previousRefreshTokenUsed=False)),
+    "introspection": (IntrospectionResponse, decoder.INTROSPECTION, body(
+        IntrospectionResponse, action="OK", resultCode="A056001", resultMessage="[A056001] The access token is valid.",
+        clientId=1234567890, subject="1001", scopes=["openid", "profile", "email"], existent=True, usable=True,
+        sufficient=True, refreshable=True, expiresAt=1792400000000, clientIdAliasUsed=False)),
+    "std-introspection": (StandardIntrospectionResponse, decoder.STANDARD_INTROSPECTION, body(
+        StandardIntrospectionResponse, action="OK", resultCode="A145001", resultMessage="[A145001] Introspection done.",
+        responseContent=json.dumps({"active": True, "scope": "openid profile email", "client_id": "1234567890",
+                                    "sub": "1001", "exp": 1792400000, "token_type": "Bearer"}))),
+    "userinfo": (UserInfoResponse, decoder.USERINFO, body(
+        UserInfoResponse, action="OK", resultCode="A091001", resultMessage="[A091001] The access token is valid.",
+        clientId=1234567890, subject="1001", scopes=["openid", "profile", "email"], claims=["name", "email"],
+        token=ACCESS_TOKEN, clientIdAliasUsed=False)),
+    "authorization": (AuthorizationResponse, decoder.AUTHORIZATION, body(
+        AuthorizationResponse, action="INTERACTION", resultCode="A004001", resultMessage="[A004001] Interaction required.",
+        ticket="hWGUSvUO1KYEdPg4TvL7ZoXfcqjTGRvhB-EHjQ8jpJU", client=CLIENT, subject=None, maxAge=0,
+        acrEssential=False, clientIdAliasUsed=False, claims=["name", "email"])),
+    "gm-no-content": (GrantManagementResponse, decoder.GRANT_MANAGEMENT, body(
+        GrantManagementResponse, action="NO_CONTENT", resultCode="A340001", resultMessage="[A340001] Grant revoked.")),
+}
+
+
+def sdk_decode(dto_type: type, raw: bytes):
+    # The old client decoded response.text, then Jsonable walked every field
+    return dto_type.from_json(raw.decode())
+
+
+def timed(decode, raw: bytes, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        decode(raw)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def allocations(decode, raw: bytes, iterations: int = 200) -> tuple[float, float]:
+    results = []
+    tracemalloc.start()
+    before_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    base, _ = tracemalloc.get_traced_memory()
+    for _ in range(iterations):
+        # Keep the results alive so every allocation is still visible
+        results.append(decode(raw))
+    current, _ = tracemalloc.get_traced_memory()
+    after_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    return (after_blocks - before_blocks) / iterations, (current - base) / iterations
+
+
+def main(args):
+    print(f"{'response':<19}{'decoder':<10}{'us/resp':>9}{'blocks':>9}{'bytes':>8}{'speedup':>9}")
+    for name, (dto_type, compiled, raw) in CASES.items():
+        decoders = (("sdk", lambda data: sdk_decode(dto_type, data)), ("compiled", compiled.decode))
+        baseline = None
+        for label, decode in decoders:
+            try:
+                decode(raw)
+            except KeyError as e:
+                print(f"{name:<19}{label:<10}{'KeyError ' + str(e):>35}")
+                continue
+            us = timed(decode, raw, args.iterations)
+            blocks, size = allocations(decode, raw)
+            baseline = baseline or us
+            print(f"{name:<19}{label:<10}{us:>9.2f}{blocks:>9.1f}{size:>8.0f}{baseline / us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    main(parser.parse_args())
@@ -0,0 +1,107 @@
+"""
+Form handling microbenchmark: request.form() + urlencode vs raw pass-through
+============================================================================
+Builds a Starlette `Request` over a typical token / PAR body and measures,
+per request, the time and the allocations (tracemalloc blocks and bytes that
+are still live once the handler returns, i.e. what each request holds on to)
+of:
+
+    form     await request.form(); urlencode(form); form.get(...)   (old routers)
+    raw      api.form_body.read_form_body(request, names)            (current)
+
+Usage (from python_oauth_server/):
+
+    uv run python -m benchmarks.bench_form_body --iterations 20000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from urllib.parse import urlencode
+
+from starlette.requests import Request
+
+from api.form_body import FormSettings, read_form_body
+
+BODIES = {
+    "token": (
+        b"grant_type=authorization_code&code=Zs3VqM2hKkUjZ1r9fV0m5uT7oO8s2aQ4bC6dE8fG0hI"
+        b"&redirect_uri=https%3A%2F%2Fclient.example.org%2Fcb&code_verifier=dBjftJeZ4CVP"
+        b"-mB92K27uhbUJU1p1r_wW1gFWFOEjXk&client_id=1234567890"
+    ),
+    "par": (
+        b"response_type=code&client_id=1234567890&client_secret=S3cr3t-S3cr3t-S3cr3t"
+        b"&redirect_uri=https%3A%2F%2Fclient.example.org%2Fcb&scope=openid+profile+email"
+        b"&state=af0ifjsldkj&nonce=n-0S6_WzA2Mj&code_challenge=E9Melhoa2OwvFrEMTJguCHaoeK1t8URWbuGJSstw-cM"
+        b"&code_challenge_method=S256"
+    ),
+}
+NAMES = ("client_id", "client_secret")
+MAX_BYTES = FormSettings().max_bytes
+
+
+def make_request(body: bytes) -> Request:
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "headers": [
+            (b"content-type", b"application/x-www-form-urlencoded"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request(scope, receive)
+
+
+async def old_path(request: Request):
+    form_data = await request.form()
+    parameters = urlencode(form_data)
+    return parameters, form_data.get("client_id"), form_data.get("client_secret")
+
+
+async def new_path(request: Request):
+    form = await read_form_body(request, NAMES, MAX_BYTES)
+    return form.parameters, form.fields.get("client_id"), form.fields.get("client_secret")
+
+
+async def timed(handler, body: bytes, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await handler(make_request(body))
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def allocations(handler, body: bytes, iterations: int = 200) -> tuple[float, float]:
+    requests = [make_request(body) for _ in range(iterations)]
+    results = []
+    tracemalloc.start()
+    before_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    for request in requests:
+        # Keep the results alive so every allocation is still visible
+        results.append(await handler(request))
+    current, _ = tracemalloc.get_traced_memory()
+    after_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    return (after_blocks - before_blocks) / iterations, (current - base) / iterations
+
+
+async def main(args):
+    print(f"{'body':<7}{'path':<6}{'us/req':>9}{'blocks/req':>12}{'bytes/req':>11}")
+    for name, body in BODIES.items():
+        for label, handler in (("form", old_path), ("raw", new_path)):
+            us = await timed(handler, body, args.iterations)
+            blocks, size = await allocations(handler, body)
+            print(f"{name:<7}{label:<6}{us:>9.2f}{blocks:>12.1f}{size:>11.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,128 @@
+"""
+Batch introspection benchmark: N single calls vs one batch call
+===============================================================
+Starts the server (uvicorn, mock Authlete answering after `--latency`
+seconds) and has a gateway check N tokens at a time, three ways:
+
+    sequential   N POST /api/introspection, one after another
+    concurrent   N POST /api/introspection at once (a pooled gateway client)
+    batch        one POST /api/introspection/batch with the N tokens
+
+Every single call pays the HTTP round trip, the resource server Basic
+authentication and the form parse; the batch pays them once and fans out
+to Authlete up to INTROSPECTION_BATCH_CONCURRENCY calls at a time.
+`--duplicates` makes that fraction of each set repeat an earlier token,
+which the batch introspects only once.
+
+    N  mode  ms/set  tokens/s  speedup over sequential
+
+Usage (from python_oauth_server/):
+
+    uv run python -m benchmarks.bench_introspection_batch --tokens 10 50 100 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+RS_BASIC = ("rs0", "rs0-secret")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, latency: float) -> subprocess.Popen:
+    env = {**os.environ, "AUTHLETE_MOCK": "true", "AUTHLETE_MOCK_LATENCY": str(latency)}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/.well-known/openid-configuration")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("the server did not come up")
+        await asyncio.sleep(0.2)
+
+
+def token_set(n: int, duplicates: float, rng: random.Random) -> list[str]:
+    tokens = []
+    for i in range(n):
+        if tokens and rng.random() < duplicates:
+            tokens.append(rng.choice(tokens))
+        else:
+            tokens.append(f"bench-{rng.getrandbits(64):016x}")
+    return tokens
+
+
+async def sequential(client: httpx.AsyncClient, tokens: list[str]):
+    for token in tokens:
+        res = await client.post("/api/introspection", auth=RS_BASIC, data={"token": token})
+        assert res.status_code == 200, res.text
+
+
+async def concurrent(client: httpx.AsyncClient, tokens: list[str]):
+    responses = await asyncio.gather(*(
+        client.post("/api/introspection", auth=RS_BASIC, data={"token": token}) for token in tokens))
+    assert all(res.status_code == 200 for res in responses)
+
+
+async def batch(client: httpx.AsyncClient, tokens: list[str]):
+    res = await client.post("/api/introspection/batch", auth=RS_BASIC, json={"tokens": tokens})
+    assert res.status_code == 200, res.text
+    assert [result["status"] for result in res.json()["results"]] == [200] * len(tokens)
+
+
+async def main(args):
+    port = free_port()
+    server = start_server(port, args.latency)
+    limits = httpx.Limits(max_connections=max(args.tokens), max_keepalive_connections=max(args.tokens))
+    rng = random.Random(1)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60.0, limits=limits) as client:
+            await wait_ready(client)
+            print(f"upstream latency {args.latency * 1000:.0f} ms, {args.rounds} sets per row, "
+                  f"{args.duplicates:.0%} duplicates\n")
+            print(f"{'N':>5}  {'mode':<12}{'ms/set':>10}{'tokens/s':>10}{'speedup':>9}")
+            for n in args.tokens:
+                baseline = None
+                for name, run in (("sequential", sequential), ("concurrent", concurrent), ("batch", batch)):
+                    sets = [token_set(n, args.duplicates, rng) for _ in range(args.rounds)]
+                    await run(client, sets[0])  # warm up connections
+                    started = time.perf_counter()
+                    for tokens in sets:
+                        await run(client, tokens)
+                    per_set = (time.perf_counter() - started) / args.rounds
+                    baseline = baseline or per_set
+                    print(f"{n:>5}  {name:<12}{per_set * 1000:>10.1f}{n / per_set:>10.0f}{baseline / per_set:>8.1f}x")
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, nargs="+", default=[10, 50, 100], help="tokens per set (N)")
+    parser.add_argument("--rounds", type=int, default=10, help="sets per row")
+    parser.add_argument("--duplicates", type=float, default=0.1, help="fraction of repeated tokens per set")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock Authlete latency in seconds")
+    asyncio.run(main(parser.parse_args()))
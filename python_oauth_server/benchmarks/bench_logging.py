@@ -0,0 +1,107 @@
+"""
+Logging cost per request: INFO vs DEBUG
+=======================================
+Measures what the authorization endpoint's logging costs the request path, in
+microseconds per request, for a realistic AuthorizationResponse:
+
+    print      print(json.dumps(ticket, indent=4))        (old endpoint)
+    info       structured log, endpoint at INFO: the DEBUG event is skipped
+    debug      structured log, endpoint at DEBUG, through the queue handler
+    debug-sync same, but formatted and written on the caller's thread
+
+Output goes to /dev/null, so the numbers are the caller-side cost only; for
+`debug` the time the listener thread needs to drain the queue is reported
+separately.
+
+Usage (from python_oauth_server/):
+
+    uv run python -m benchmarks.bench_logging --iterations 50000
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import time
+
+from authlete.dto import AuthorizationAction, AuthorizationResponse, Client
+
+from observability.log import ENDPOINT_LOGGER_PREFIX, StructuredFormatter, configure_logging, get_logger
+
+log = get_logger("authorization")
+
+
+def make_response() -> AuthorizationResponse:
+    res = AuthorizationResponse()
+    res.action = AuthorizationAction.INTERACTION
+    res.ticket = "nNR6-8S7bNAv5rM3wEmH_7yMZ5kwVIAS2QxZK9aWIXk"
+    res.client = Client()
+    res.client.clientId = 1234567890
+    return res
+
+
+def old_path(res):
+    print("ticket before authorization: ", json.dumps(res.ticket, indent=4))
+
+
+def new_path(res):
+    log.debug("authorization.response", action=res.action, ticket=res.ticket,
+              client_id=lambda: res.client.clientId if res.client else None)
+
+
+def timed(handler, res, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        handler(res)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run_structured(level: str, res, iterations: int, devnull) -> tuple[float, float]:
+    os.environ["LOG_LEVELS"] = f"authorization={level}"
+    setup = configure_logging(devnull)
+    try:
+        us = timed(new_path, res, iterations)
+        started = time.perf_counter()
+    finally:
+        setup.stop()
+    drain_ms = (time.perf_counter() - started) * 1000
+    return us, drain_ms
+
+
+def run_sync(res, iterations: int, devnull) -> float:
+    logger = logging.getLogger(ENDPOINT_LOGGER_PREFIX + "authorization")
+    handler = logging.StreamHandler(devnull)
+    handler.setFormatter(StructuredFormatter())
+    logger.addHandler(handler)
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    try:
+        return timed(new_path, res, iterations)
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+        logger.setLevel(logging.NOTSET)
+
+
+def main(args):
+    res = make_response()
+    os.environ["LOG_QUEUE_SIZE"] = str(args.iterations + 1)
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            print_us = timed(old_path, res, args.iterations)
+        info_us, _ = run_structured("INFO", res, args.iterations, devnull)
+        debug_us, drain_ms = run_structured("DEBUG", res, args.iterations, devnull)
+        sync_us = run_sync(res, args.iterations, devnull)
+
+    print(f"{'mode':<12}{'us/req':>9}")
+    print(f"{'print':<12}{print_us:>9.2f}")
+    print(f"{'info':<12}{info_us:>9.2f}")
+    print(f"{'debug':<12}{debug_us:>9.2f}   (+{drain_ms:.0f} ms to drain {args.iterations} records in the listener)")
+    print(f"{'debug-sync':<12}{sync_us:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50000)
+    main(parser.parse_args())
@@ -0,0 +1,129 @@
+"""
+Login benchmark: password KDF on the event loop vs the password pool
+====================================================================
+Drives `POST /api/authorization/decision` with concurrent logins against
+users whose passwords are stored as scrypt hashes, while a probe keeps calling
+a cheap endpoint (`/admin/authlete/pool`) on the same event loop. The probe
+stands in for the token / introspection traffic that shares the worker.
+
+    inline   the KDF runs directly in the handler (what a naive hash check does)
+    pool     security.PasswordVerifier: bounded thread pool, as the server runs
+
+With the KDF inline every login freezes the loop for the full hash time, so
+the probe's latency grows with the login backlog. With the pool the probe
+stays near its idle latency and login throughput scales with the workers.
+
+Usage (from python_oauth_server/):
+
+    uv run python -m benchmarks.bench_login --logins 200 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from authlete_client import AuthleteClientRegistry
+from db.json_store import JsonUserStore
+from db.user_dao import UserDao
+from main import app
+from mock_authlete import MockSettings, mock_configuration, start_mock_authlete
+from security import AdminToken, PasswordHasher, PasswordVerifier
+
+ADMIN_TOKEN = "bench-admin"
+
+
+class InlineVerifier(PasswordVerifier):
+    async def _run(self, fn, *args):
+        return fn(*args)
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[max(0, int(len(values) * fraction) - 1)] * 1000
+
+
+async def run(verifier: PasswordVerifier, users: int, logins: int, concurrency: int) -> dict:
+    app.state.password_verifier = verifier
+    app.state.admin_token = AdminToken(ADMIN_TOKEN)
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+    probe_latencies = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login(i: int):
+            async with semaphore:
+                data = {"ticket": "t", "subject": f"user{i % users}", "password": f"pw{i % users}", "authorized": "true"}
+                response = await client.post("/api/authorization/decision", data=data)
+                assert response.status_code == 302 and "code=" in response.headers["location"], response.text
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/admin/authlete/pool", headers={"Authorization": f"Bearer {ADMIN_TOKEN}"})
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return {
+        "logins_per_s": logins / elapsed,
+        "probe_p50_ms": statistics.median(probe_latencies) * 1000,
+        "probe_p99_ms": percentile(probe_latencies, 0.99),
+        "probe_max_ms": max(probe_latencies) * 1000,
+    }
+
+
+async def main(args):
+    # Every decision carries the same made-up ticket, so the issue call is
+    # forced to LOCATION instead of being checked against a real ticket.
+    mock = start_mock_authlete(MockSettings(latency=args.latency, actions={"/auth/authorization/issue": {"LOCATION": 1.0}}))
+    app.state.authlete = AuthleteClientRegistry(mock_configuration(mock.base_url))
+
+    hasher = PasswordHasher(scrypt_log_n=args.log_n)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "users.json")
+        with open(path, "w") as f:
+            json.dump([
+                {"loginId": f"user{i}", "password": hasher.hash(f"pw{i}"), "subject": str(1000 + i)}
+                for i in range(args.users)
+            ], f)
+        store = JsonUserStore(path)
+        await store.open()
+        UserDao.use(store)
+
+        print(f"scrypt ln={args.log_n}, {args.logins} logins at concurrency {args.concurrency}, "
+              f"upstream latency {args.latency * 1000:.0f} ms\n")
+        print(f"{'verifier':<12}{'logins/s':>10}{'probe p50 ms':>14}{'probe p99 ms':>14}{'probe max ms':>14}")
+        modes = [("inline", InlineVerifier(hasher, workers=1))]
+        modes += [(f"pool x{w}", PasswordVerifier(hasher, workers=w)) for w in args.workers]
+        for name, verifier in modes:
+            result = await run(verifier, args.users, args.logins, args.concurrency)
+            verifier.close()
+            print(f"{name:<12}{result['logins_per_s']:>10.1f}{result['probe_p50_ms']:>14.1f}"
+                  f"{result['probe_p99_ms']:>14.1f}{result['probe_max_ms']:>14.1f}")
+
+    await app.state.authlete.aclose()
+    mock.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--log-n", type=int, default=14, help="scrypt cost (log2 N)")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock Authlete latency in seconds")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,74 @@
+"""
+Metrics recording overhead
+==========================
+Calls a no-op ASGI route app directly and through `InstrumentedRoute`, and
+times the Authlete-call recording (`authlete_operation(...).observe`), to show
+what the /metrics instrumentation adds to each request, in microseconds.
+
+Usage (from python_oauth_server/):
+
+    uv run python -m benchmarks.bench_metrics --iterations 200000
+"""
+
+import argparse
+import asyncio
+import time
+
+from observability.metrics import REGISTRY, InstrumentedRoute, authlete_operation
+
+SCOPE = {"type": "http", "method": "POST", "path": "/api/token"}
+START = {"type": "http.response.start", "status": 200, "headers": []}
+BODY = {"type": "http.response.body", "body": b"{}"}
+
+
+async def route_app(scope, receive, send):
+    await send(START)
+    await send(BODY)
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def timed_route(app, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await app(SCOPE, receive, send)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def timed_authlete(iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        metrics = authlete_operation("/auth/token")
+        metrics.in_flight.value += 1
+        call_started = time.perf_counter()
+        metrics.in_flight.value -= 1
+        metrics.observe("OK", time.perf_counter() - call_started)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def main(args):
+    bare = await timed_route(route_app, args.iterations)
+    instrumented = await timed_route(InstrumentedRoute(route_app, "/api/token"), args.iterations)
+    authlete = timed_authlete(args.iterations)
+
+    started = time.perf_counter()
+    text = REGISTRY.render()
+    render_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{'':<22}{'us/req':>9}")
+    print(f"{'route, bare':<22}{bare:>9.2f}")
+    print(f"{'route, instrumented':<22}{instrumented:>9.2f}   (+{instrumented - bare:.2f})")
+    print(f"{'authlete call record':<22}{authlete:>9.2f}")
+    print(f"render /metrics: {render_ms:.2f} ms, {len(text)} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,91 @@
+"""
+Tracing overhead
+================
+Runs a token-endpoint-shaped request (SERVER span with form.parse, a DAO
+lookup and one Authlete CLIENT span inside) through `TracedRoute` and reports
+the cost per request, in microseconds:
+
+    bare       the route app called directly, no spans at all
+    disabled   no tracer installed, so the route is not wrapped and start_span()
+               returns the no-op span (production default)
+    enabled    TracedRoute, spans batched to an exporter that discards them
+
+Usage (from python_oauth_server/):
+
+    uv run python -m benchmarks.bench_tracing --iterations 100000
+"""
+
+import argparse
+import asyncio
+import time
+
+from observability.tracing import CLIENT, BatchSpanProcessor, Tracer, TracedRoute, set_tracer, start_span
+
+SCOPE = {"type": "http", "method": "POST", "path": "/api/token", "headers": [(b"content-type", b"application/x-www-form-urlencoded")]}
+START = {"type": "http.response.start", "status": 200, "headers": []}
+BODY = {"type": "http.response.body", "body": b"{}"}
+
+
+class DiscardingExporter:
+    def export(self, spans):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+async def bare_app(scope, receive, send):
+    await send(START)
+    await send(BODY)
+
+
+async def traced_app(scope, receive, send):
+    with start_span("form.parse"):
+        pass
+    with start_span("UserDao.get_by_login_id"):
+        pass
+    with start_span("authlete /auth/token", CLIENT) as span:
+        span.set_attribute("authlete.action", "OK")
+    await send(START)
+    await send(BODY)
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def timed(app, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await app(SCOPE, receive, send)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def main(args):
+    bare = await timed(bare_app, args.iterations)
+
+    set_tracer(None)
+    disabled = await timed(traced_app, args.iterations)
+
+    tracer = Tracer(BatchSpanProcessor(DiscardingExporter(), max_queue=args.iterations * 4 + 1, interval=0.1))
+    set_tracer(tracer)
+    try:
+        enabled = await timed(TracedRoute(traced_app, "/api/token"), args.iterations)
+    finally:
+        set_tracer(None)
+        tracer.shutdown()
+
+    print(f"{'mode':<10}{'us/req':>9}")
+    print(f"{'bare':<10}{bare:>9.2f}")
+    print(f"{'disabled':<10}{disabled:>9.2f}   (+{disabled - bare:.2f})")
+    print(f"{'enabled':<10}{enabled:>9.2f}   (+{enabled - bare:.2f}, {tracer.processor.exported} spans exported)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,160 @@
+"""
+UserDao benchmark: dict-of-dicts vs indexed snapshot vs SQLite
+==============================================================
+Generates a users.json with N users (1,000,000 by default) and, in a fresh
+subprocess per implementation so RSS numbers are not polluted, measures:
+
+    load     time to parse users.json and build the store
+    rss      resident memory added by the store
+    login    get_by_login_id latency
+    subject  get_by_subject latency (the /api/userinfo lookup)
+
+    legacy   the original UserDao: {loginId: dict} + linear scan by subject
+    indexed  db.json_store.JsonUserStore: one packed string per user, loginId
+             and subject indexes, expanded into a User tuple on lookup
+    sqlite   db.sqlite_store.SqliteUserStore after `db.import_json` (load is
+             the import time; lookups go through the query thread pool)
+
+Usage (from python_oauth_server/):
+
+    uv run python -m benchmarks.bench_user_dao --users 1000000
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class LegacyUserDao:
+    """Verbatim copy of the original implementation."""
+    _users = None
+    users_file = None
+
+    @classmethod
+    def _load_users(cls):
+        if cls._users is None:
+            with open(cls.users_file, "r") as f:
+                data = json.load(f)
+                cls._users = {user["loginId"]: user for user in data}
+        return cls._users
+
+    @classmethod
+    def get_by_login_id(cls, login_id):
+        return cls._load_users().get(login_id)
+
+    @classmethod
+    def get_by_subject(cls, subject):
+        for user in cls._load_users().values():
+            if user["subject"] == subject:
+                return user
+        return None
+
+
+async def per_call_us(fn, keys) -> float:
+    started = time.perf_counter()
+    if inspect.iscoroutinefunction(fn):
+        for key in keys:
+            await fn(key)
+    else:
+        for key in keys:
+            fn(key)
+    return (time.perf_counter() - started) / len(keys) * 1e6
+
+
+async def measure(mode: str, path: str, users: int):
+    rng = random.Random(7)
+    before = rss_mb()
+    started = time.perf_counter()
+
+    if mode == "legacy":
+        dao = LegacyUserDao
+        dao.users_file = path
+        dao._load_users()
+    elif mode == "indexed":
+        from db.json_store import JsonUserStore
+        dao = JsonUserStore(path)
+        await dao.open()
+    else:
+        from db.import_json import import_json
+        from db.sqlite_store import SqliteDatabase, SqliteUserStore
+        db_path = os.path.join(os.path.dirname(path), "users.db")
+        with open(os.path.join(os.path.dirname(path), "rs.json"), "w") as f:
+            f.write("[]")
+        import_json(db_path, path, f.name)
+        database = SqliteDatabase(db_path)
+        await database.open()
+        dao = SqliteUserStore(database)
+
+    load_s = time.perf_counter() - started
+    rss = rss_mb() - before
+
+    login_keys = [f"user{rng.randrange(users)}" for _ in range(100_000)]
+    # A linear scan over 1M users is ~50 ms, so only sample a few for legacy.
+    subject_keys = [str(100000 + rng.randrange(users)) for _ in range(20 if mode == "legacy" else 100_000)]
+
+    print(json.dumps({
+        "mode": mode,
+        "load_s": load_s,
+        "rss_mb": rss,
+        "login_us": await per_call_us(dao.get_by_login_id, login_keys),
+        "subject_us": await per_call_us(dao.get_by_subject, subject_keys),
+    }))
+
+
+def generate(path: str, users: int):
+    with open(path, "w") as f:
+        f.write("[\n")
+        for i in range(users):
+            sep = ",\n" if i + 1 < users else "\n"
+            f.write(json.dumps({
+                "loginId": f"user{i}",
+                "password": f"pw{i}",
+                "subject": str(100000 + i),
+                "name": f"User {i}",
+                "email": f"user{i}@example.com",
+            }) + sep)
+        f.write("]\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--measure", choices=["legacy", "indexed", "sqlite"], help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        asyncio.run(measure(args.measure, args.file, args.users))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "users.json")
+        generate(path, args.users)
+        print(f"{args.users:,} users, {os.path.getsize(path) / 1e6:.0f} MB of JSON\n")
+        print(f"{'store':<9}{'load s':>8}{'RSS MB':>9}{'login us':>10}{'subject us':>12}")
+        for mode in ("legacy", "indexed", "sqlite"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_user_dao", "--measure", mode, "--file", path, "--users", str(args.users)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out)
+            print(f"{mode:<9}{r['load_s']:>8.2f}{r['rss_mb']:>9.0f}{r['login_us']:>10.2f}{r['subject_us']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Scaling benchmark: one uvicorn process vs the prefork server
+============================================================
+Starts `serve.py` with 1, 2, 4, ... workers (WEB_CONCURRENCY), with the mock
+Authlete and the shared cache backend, and drives a mix of discovery
+(`/.well-known/openid-configuration`, answered from the metadata cache) and
+introspection requests (a resource server authentication plus one call to the
+mock) at a fixed concurrency.
+
+    workers  req/s  p50 ms  p99 ms  speedup over 1 worker
+
+Throughput can only grow up to the number of cores: the load generator runs
+on the same host and competes with the workers for them, so on a 1 or 2 CPU
+machine the table mostly shows what the extra processes cost.
+
+Usage (from python_oauth_server/):
+
+    uv run python -m benchmarks.bench_workers --workers 1 2 4 --requests 4000
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+RS_BASIC = ("rs0", "rs0-secret")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "AUTHLETE_MOCK": "true",
+        "CACHE_BACKEND": "shared",
+        "INTROSPECTION_CACHE_ENABLED": "true",
+        "UVICORN_LOG_LEVEL": "warning",
+    }
+    return subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, base_url: str, workers: int, timeout: float = 60.0):
+    # Every worker has to be up, not just the first one to accept
+    deadline = time.monotonic() + timeout
+    ok = 0
+    while ok < workers * 4:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"serve.py with {workers} workers did not come up")
+        try:
+            res = await client.get(base_url + "/.well-known/openid-configuration")
+            ok = ok + 1 if res.status_code == 200 else 0
+        except httpx.HTTPError:
+            ok = 0
+            await asyncio.sleep(0.2)
+
+
+async def run_level(base_url: str, workers: int, concurrency: int, total: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+        await wait_ready(client, base_url, workers)
+
+        latencies = []
+        errors = 0
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i: int):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                if i % 2:
+                    res = await client.post(base_url + "/api/introspection", auth=RS_BASIC,
+                                            data={"token": f"bench-token-{i % 64}"})
+                else:
+                    res = await client.get(base_url + "/.well-known/openid-configuration")
+                latencies.append(time.perf_counter() - started)
+                if res.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def main(args):
+    print(f"{os.process_cpu_count()} CPUs (shared with the load generator), concurrency {args.concurrency}, "
+          f"{args.requests} requests per run\n")
+    print(f"{'workers':<9}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}{'speedup':>9}")
+
+    baseline = None
+    for workers in args.workers:
+        port = free_port()
+        server = start_server(workers, port)
+        try:
+            result = await run_level(f"http://127.0.0.1:{port}", workers, args.concurrency, args.requests)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+        baseline = baseline or result["rps"]
+        print(f"{workers:<9}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+              f"{result['errors']:>8}{result['rps'] / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=4000, help="requests per worker count")
+    parser.add_argument("--concurrency", type=int, default=64)
+    asyncio.run(main(parser.parse_args()))
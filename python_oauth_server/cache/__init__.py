@@ -0,0 +1,20 @@
+from cache.introspection_cache import IntrospectionCache, SharedIntrospectionCache, get_introspection_cache, token_hash
+from cache.metadata_cache import CachedDocument, MetadataCache, get_metadata_cache
+from cache.negative_cache import NegativeTokenCache, get_negative_token_cache
+from cache.shared import SharedCacheClient, SharedCacheServer, SharedCacheUnavailable, get_shared_cache
+
+__all__ = [
+    "CachedDocument",
+    "IntrospectionCache",
+    "MetadataCache",
+    "NegativeTokenCache",
+    "SharedCacheClient",
+    "SharedCacheServer",
+    "SharedCacheUnavailable",
+    "SharedIntrospectionCache",
+    "get_introspection_cache",
+    "get_metadata_cache",
+    "get_negative_token_cache",
+    "get_shared_cache",
+    "token_hash",
+]
@@ -0,0 +1,31 @@
+"""
+Runs the shared cache server (see shared.py).
+
+Usage (from python_oauth_server/):
+
+    uv run python -m cache --socket /tmp/oauth-shared-cache.sock --max-entries 100000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+
+from cache.shared import DEFAULT_SOCKET, SharedCacheServer
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m cache", description="Runs the shared cache server.")
+    parser.add_argument("--socket", default=os.getenv("SHARED_CACHE_SOCKET", DEFAULT_SOCKET))
+    parser.add_argument("--max-entries", type=int, default=int(os.getenv("SHARED_CACHE_MAX_ENTRIES", 100000)))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        asyncio.run(SharedCacheServer(args.socket, args.max_entries).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
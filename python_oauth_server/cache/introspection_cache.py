@@ -0,0 +1,225 @@
+"""
+Introspection result cache
+--------------------------
+Resource servers tend to introspect the same hot access token over and over.
+`IntrospectionCache` is an optional, bounded LRU + TTL cache in front of
+`standardIntrospection`, keyed by the SHA-256 of the token so raw tokens are
+never held as dictionary keys.
+
+Only `active: true` results are cached, and an entry never outlives the
+token's own `exp` claim. Because this process cannot see which access token
+belongs to which refresh token or grant, invalidation is deliberately
+conservative:
+
+    revocation of a cached token      -> that entry is dropped
+    revocation of any other token     -> the whole cache is cleared
+    (e.g. a refresh token, which takes its access tokens with it)
+    grant management DELETE           -> the whole cache is cleared
+
+An introspection call still in flight when a revocation lands would put the
+pre-revocation `active: true` answer back. Every invalidation therefore bumps
+a generation counter first, and a caller takes `generation()` before calling
+Authlete and hands it to `put()`, which stores nothing if it has changed
+since (the `stale_puts` counter).
+
+Enable with `INTROSPECTION_CACHE_ENABLED=true`; size and TTL are set with
+`INTROSPECTION_CACHE_MAX_ENTRIES` and `INTROSPECTION_CACHE_TTL` (seconds).
+
+With `CACHE_BACKEND=shared` the entries live in the shared cache server
+(shared.py) instead, so that every worker process sees a revocation at once
+(`SharedIntrospectionCache`); the server then bounds the size and keeps the
+generation counter, so a revocation in one worker also stops the in-flight
+puts of the others. An invalidation the server does not confirm raises
+`SharedCacheUnavailable` (503 to the revoking client) instead of passing
+silently.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import Request
+
+from cache.shared import SharedCacheClient, SharedCacheUnavailable
+
+
+def token_hash(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+@dataclass(frozen=True, slots=True)
+class CachedIntrospection:
+    body: bytes
+    expires_at: float
+
+
+class IntrospectionCache:
+    def __init__(self, max_entries: int = 10000, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, CachedIntrospection] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+        self._generation = 0
+
+    @classmethod
+    def from_env(cls, shared: SharedCacheClient | None = None) -> "IntrospectionCache | None":
+        if os.getenv("INTROSPECTION_CACHE_ENABLED", "false").strip().lower() not in ("1", "true", "yes", "on"):
+            return None
+        ttl = float(os.getenv("INTROSPECTION_CACHE_TTL", 30))
+        if shared is not None:
+            return SharedIntrospectionCache(shared, ttl)
+        return cls(max_entries=int(os.getenv("INTROSPECTION_CACHE_MAX_ENTRIES", 10000)), ttl=ttl)
+
+    async def get(self, key: bytes) -> CachedIntrospection | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.time():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def _expires_at(self, response_content: str) -> float | None:
+        """When a response may stop being served: None unless the token is active and not yet expired."""
+        try:
+            claims = json.loads(response_content)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(claims, dict) or claims.get("active") is not True:
+            return None
+
+        now = time.time()
+        expires_at = now + self.ttl
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        return expires_at if expires_at > now else None
+
+    async def generation(self) -> int | None:
+        """Taken before the Authlete call and passed to `put()`; None means do not store."""
+        return self._generation
+
+    async def put(self, key: bytes, response_content: str, generation: int | None):
+        """
+        Stores an OK introspection response if the token is active and not yet
+        expired, and nothing was invalidated since `generation` was taken.
+        """
+        expires_at = self._expires_at(response_content)
+        if expires_at is None:
+            return
+        if generation != self._generation:
+            self.stale_puts += 1
+            return
+
+        self._entries[key] = CachedIntrospection(response_content.encode("utf-8"), expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def invalidate_token(self, token: str | None):
+        """Called after a successful revocation of `token`."""
+        self._generation += 1
+        if token and self._entries.pop(token_hash(token), None) is not None:
+            self.invalidations += 1
+            return
+        # Unknown to us (refresh token, or never cached): its access tokens may be.
+        await self.clear()
+
+    async def clear(self):
+        self._generation += 1
+        if self._entries:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "backend": "local",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_puts": self.stale_puts,
+        }
+
+
+class SharedIntrospectionCache(IntrospectionCache):
+    """The same policy, with the entries kept by the shared cache server."""
+
+    PREFIX = b"introspection:"
+    GENERATION = b"introspection-generation"
+
+    def __init__(self, shared: SharedCacheClient, ttl: float = 30.0):
+        super().__init__(max_entries=0, ttl=ttl)
+        self.shared = shared
+
+    async def get(self, key: bytes) -> CachedIntrospection | None:
+        # The server drops an entry once its TTL (capped at `exp`) has passed
+        body = await self.shared.get(self.PREFIX + key)
+        if body is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedIntrospection(body, 0.0)
+
+    async def generation(self) -> int | None:
+        # None when the server does not answer: the result is then not stored
+        return await self.shared.counter(self.GENERATION)
+
+    async def put(self, key: bytes, response_content: str, generation: int | None):
+        expires_at = self._expires_at(response_content)
+        if expires_at is None or generation is None:
+            return
+        # Invalidations bump the generation before they delete, so checking it
+        # after the write catches one that ran between the call and the write
+        await self.shared.set(self.PREFIX + key, response_content.encode("utf-8"), expires_at - time.time())
+        if await self.shared.counter(self.GENERATION) != generation:
+            self.stale_puts += 1
+            try:
+                await self.shared.delete(self.PREFIX + key)
+            except SharedCacheUnavailable:
+                pass  # Logged by the client; the entry still expires with the token's TTL
+
+    async def invalidate_token(self, token: str | None):
+        await self.shared.incr(self.GENERATION)
+        if token and await self.shared.delete(self.PREFIX + token_hash(token)):
+            self.invalidations += 1
+            return
+        await self.clear()
+
+    async def clear(self):
+        await self.shared.incr(self.GENERATION)
+        self.invalidations += await self.shared.clear(self.PREFIX)
+
+    def stats(self) -> dict:
+        # Counters are this worker's; the entries are shared by all of them
+        return {
+            "backend": "shared",
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "stale_puts": self.stale_puts,
+        }
+
+
+def get_introspection_cache(request: Request) -> IntrospectionCache | None:
+    """FastAPI dependency returning the introspection cache, or None when disabled."""
+    return request.app.state.introspection_cache
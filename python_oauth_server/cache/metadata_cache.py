@@ -0,0 +1,223 @@
+"""
+Metadata document cache
+-----------------------
+Discovery, JWKS and the issuer / federation metadata documents change rarely
+but are polled constantly by every RP and wallet. `MetadataCache` keeps the
+raw response bytes of each document together with a precomputed ETag and
+content type, so a hit is served straight from memory with no Authlete call
+and no JSON parse / re-serialise step.
+
+Freshness follows a stale-while-revalidate model:
+
+    age < ttl - refresh_ahead     fresh, served as is
+    age < ttl + max_stale         served as is; one background refresh is
+                                  started to replace the entry
+    otherwise                     the caller waits for a synchronous refresh
+
+A failed background refresh keeps the previous document, so an Authlete
+hiccup never turns into an outage of the well-known endpoints.
+
+With `CACHE_BACKEND=shared` the documents are also written to the shared
+cache server (shared.py). A worker whose own copy is missing or due for a
+refresh first looks there, so one Authlete fetch serves every worker.
+`fetched_at` is CLOCK_MONOTONIC, which all processes of a host share.
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import struct
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+
+from cache.shared import SharedCacheClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedDocument:
+    body: bytes
+    media_type: str | None
+    status_code: int = 200
+    etag: str = ""
+    fetched_at: float = 0.0
+
+    @classmethod
+    def build(cls, body: bytes, media_type: str | None, status_code: int = 200) -> "CachedDocument":
+        digest = hashlib.sha256(body).digest()
+        etag = '"' + base64.urlsafe_b64encode(digest[:18]).decode("ascii") + '"'
+        return cls(body, media_type, status_code, etag, time.monotonic())
+
+    @property
+    def cacheable(self) -> bool:
+        return self.status_code == 200
+
+    _HEADER = struct.Struct("!dHHH")
+
+    def encode(self) -> bytes:
+        media_type = (self.media_type or "").encode()
+        etag = self.etag.encode()
+        return self._HEADER.pack(self.fetched_at, self.status_code, len(media_type), len(etag)) + media_type + etag + self.body
+
+    @classmethod
+    def decode(cls, data: bytes) -> "CachedDocument":
+        fetched_at, status_code, media_len, etag_len = cls._HEADER.unpack_from(data)
+        offset = cls._HEADER.size
+        media_type = data[offset:offset + media_len].decode() or None
+        etag = data[offset + media_len:offset + media_len + etag_len].decode()
+        return cls(data[offset + media_len + etag_len:], media_type, status_code, etag, fetched_at)
+
+
+Loader = Callable[[], Awaitable[CachedDocument]]
+
+
+class MetadataCache:
+    SHARED_PREFIX = b"metadata:"
+
+    def __init__(self, ttl: float = 300.0, refresh_ahead: float = 30.0, max_stale: float = 3600.0,
+                 shared: SharedCacheClient | None = None):
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl)
+        self.max_stale = max_stale
+        self.shared = shared
+        self._entries: dict[str, CachedDocument] = {}
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.shared_hits = 0
+
+    @classmethod
+    def from_env(cls, shared: SharedCacheClient | None = None) -> "MetadataCache":
+        return cls(
+            ttl=float(os.getenv("METADATA_CACHE_TTL", 300)),
+            refresh_ahead=float(os.getenv("METADATA_CACHE_REFRESH_AHEAD", 30)),
+            max_stale=float(os.getenv("METADATA_CACHE_MAX_STALE", 3600)),
+            shared=shared,
+        )
+
+    async def get(self, key: str, loader: Loader) -> CachedDocument:
+        """Returns the cached document for `key`, loading or refreshing it as needed."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < self.ttl - self.refresh_ahead:
+                self.hits += 1
+                return entry
+            if age < self.ttl + self.max_stale:
+                self.hits += 1
+                if key not in self._refreshing:
+                    self._start_refresh(key, loader)
+                return entry
+
+        # Miss: every concurrent caller waits on the same upstream fetch.
+        self.misses += 1
+        task = self._refreshing.get(key) or self._start_refresh(key, loader)
+        return await asyncio.shield(task)
+
+    async def reload(self, key: str, loader: Loader) -> CachedDocument:
+        """Fetches `key` from upstream now (e.g. a JWKS after a key rotation), skipping the shared copy."""
+        self.misses += 1
+        task = self._refreshing.get(key) or self._start_refresh(key, loader, use_shared=False)
+        return await asyncio.shield(task)
+
+    def _start_refresh(self, key: str, loader: Loader, use_shared: bool = True) -> asyncio.Task:
+        task = asyncio.create_task(self._refresh(key, loader, use_shared))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda done: self._refresh_done(key, done))
+        return task
+
+    async def _refresh(self, key: str, loader: Loader, use_shared: bool = True) -> CachedDocument:
+        document = await self._shared_get(key) if self.shared is not None and use_shared else None
+        if document is None:
+            document = await loader()
+            self.refreshes += 1
+            if document.cacheable and self.shared is not None:
+                await self.shared.set(self.SHARED_PREFIX + key.encode(), document.encode(), self.ttl + self.max_stale)
+        if document.cacheable:
+            self._entries[key] = document
+        return document
+
+    async def _shared_get(self, key: str) -> CachedDocument | None:
+        """Another worker's copy, if it is still fresh enough to serve without a refresh."""
+        data = await self.shared.get(self.SHARED_PREFIX + key.encode())
+        if data is None:
+            return None
+        document = CachedDocument.decode(data)
+        if time.monotonic() - document.fetched_at >= self.ttl - self.refresh_ahead:
+            return None
+        self.shared_hits += 1
+        return document
+
+    def _refresh_done(self, key: str, task: asyncio.Task):
+        if self._refreshing.get(key) is task:
+            del self._refreshing[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.refresh_failures += 1
+            if key in self._entries:
+                logger.warning("Refresh of %s failed; serving the previous document.", key,
+                               exc_info=task.exception())
+
+    def invalidate(self, key: str | None = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "local" if self.shared is None else "shared",
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_hits": self.shared_hits,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+        }
+
+    async def aclose(self):
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        self._refreshing.clear()
+
+    def respond(self, request: Request, document: CachedDocument) -> Response:
+        """Builds the HTTP response, answering a matching If-None-Match with 304."""
+        if not document.cacheable:
+            return Response(content=document.body, status_code=document.status_code, media_type=document.media_type)
+
+        remaining = max(0, int(self.ttl - (time.monotonic() - document.fetched_at)))
+        headers = {"ETag": document.etag, "Cache-Control": f"public, max-age={remaining}"}
+
+        if _etag_matches(request.headers.get("if-none-match"), document.etag):
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=document.body, status_code=200, media_type=document.media_type, headers=headers)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): ignore the W/ prefix on candidates.
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def get_metadata_cache(request: Request) -> MetadataCache:
+    """FastAPI dependency returning the application-wide metadata cache."""
+    return request.app.state.metadata_cache
@@ -0,0 +1,145 @@
+"""
+Negative token cache
+--------------------
+Misconfigured clients and scanners send the same expired, revoked or made-up
+token to `/api/userinfo` and `/api/introspection` again and again, and every
+one of those requests is an Authlete call. `NegativeTokenCache` remembers,
+per endpoint, the tokens Authlete refused and the refusal itself:
+
+    userinfo        UNAUTHORIZED, with its WWW-Authenticate value
+    introspection   OK with `{"active": false}` (also for the batch endpoint)
+
+A repeat of such a token within `NEGATIVE_TOKEN_CACHE_TTL` seconds (default
+30) gets the same protocol response without the Authlete call. Only these
+answers are remembered: FORBIDDEN (insufficient scope) and errors are not.
+A token that is no longer active does not become active again, so nothing
+invalidates an entry; the short TTL only bounds how long a token Authlete
+has not yet seen (replication lag) can be refused.
+
+Entries are keyed by the SHA-256 of the token, like the introspection cache,
+and capped at `NEGATIVE_TOKEN_CACHE_MAX_ENTRIES` (default 10000; the oldest
+are dropped first). The few distinct refusal bodies are stored once and
+shared by all entries. The cache is per process, even with
+`CACHE_BACKEND=shared`: a miss in another worker costs one more Authlete
+call, never a wrong answer.
+
+Enable with `NEGATIVE_TOKEN_CACHE_ENABLED=true`. Lookups, stores and
+evictions are counted on `/metrics` (`oauth_negative_token_cache_*`) and at
+`GET /admin/cache/negative`.
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+
+from fastapi import Request
+
+from observability.metrics import REGISTRY
+
+USERINFO = "userinfo"
+INTROSPECTION = "introspection"
+ENDPOINTS = (USERINFO, INTROSPECTION)
+
+# Distinct refusal bodies kept for sharing; past this, entries hold their own
+MAX_SHARED_BODIES = 256
+
+NEGATIVE_LOOKUPS = REGISTRY.counter(
+    "oauth_negative_token_cache_lookups", "Negative token cache lookups, by endpoint and result.",
+    ("endpoint", "result"))
+NEGATIVE_STORES = REGISTRY.counter(
+    "oauth_negative_token_cache_stores", "Tokens remembered as refused, by endpoint.", ("endpoint",))
+NEGATIVE_EVICTIONS = REGISTRY.counter(
+    "oauth_negative_token_cache_evictions", "Negative entries dropped to stay under the size cap.")
+NEGATIVE_ENTRIES = REGISTRY.gauge(
+    "oauth_negative_token_cache_entries", "Tokens currently remembered as refused.")
+
+
+def is_inactive(response_content: str | None) -> bool:
+    """True for an introspection response saying `active: false`."""
+    try:
+        claims = json.loads(response_content)
+    except (TypeError, ValueError):
+        return False
+    return isinstance(claims, dict) and claims.get("active") is False
+
+
+class NegativeTokenCache:
+    def __init__(self, max_entries: int = 10000, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # endpoint prefix + SHA-256 of the token -> (refusal, expires_at)
+        self._entries: OrderedDict[bytes, tuple[str, float]] = OrderedDict()
+        self._bodies: dict[str, str] = {}
+        self._prefixes = {endpoint: endpoint.encode("ascii") + b":" for endpoint in ENDPOINTS}
+        self._hit = {endpoint: NEGATIVE_LOOKUPS.labels(endpoint, "hit") for endpoint in ENDPOINTS}
+        self._miss = {endpoint: NEGATIVE_LOOKUPS.labels(endpoint, "miss") for endpoint in ENDPOINTS}
+        self._stored = {endpoint: NEGATIVE_STORES.labels(endpoint) for endpoint in ENDPOINTS}
+        self._evicted = NEGATIVE_EVICTIONS.labels()
+        self._size = NEGATIVE_ENTRIES.labels()
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls) -> "NegativeTokenCache | None":
+        if os.getenv("NEGATIVE_TOKEN_CACHE_ENABLED", "false").strip().lower() not in ("1", "true", "yes", "on"):
+            return None
+        return cls(
+            max_entries=int(os.getenv("NEGATIVE_TOKEN_CACHE_MAX_ENTRIES", 10000)),
+            ttl=float(os.getenv("NEGATIVE_TOKEN_CACHE_TTL", 30)),
+        )
+
+    def get(self, endpoint: str, key: bytes) -> str | None:
+        """The remembered refusal of the token hashed to `key`, or None."""
+        entry_key = self._prefixes[endpoint] + key
+        entry = self._entries.get(entry_key)
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self._hit[endpoint].inc()
+                return entry[0]
+            del self._entries[entry_key]
+            self._size.set(len(self._entries))
+            self.expirations += 1
+        self._miss[endpoint].inc()
+        return None
+
+    def put(self, endpoint: str, key: bytes, refusal: str | None):
+        """Remembers that Authlete refused the token hashed to `key` with `refusal`."""
+        if refusal is None:
+            return
+        body = self._bodies.get(refusal)
+        if body is None:
+            body = refusal
+            if len(self._bodies) < MAX_SHARED_BODIES:
+                self._bodies[body] = body
+
+        entry_key = self._prefixes[endpoint] + key
+        self._entries[entry_key] = (body, time.monotonic() + self.ttl)
+        self._entries.move_to_end(entry_key)
+        self._stored[endpoint].inc()
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evicted.inc()
+        self._size.set(len(self._entries))
+
+    def put_introspection(self, key: bytes, response_content: str | None):
+        """Stores an OK introspection response if it says the token is not active."""
+        if is_inactive(response_content):
+            self.put(INTROSPECTION, key, response_content)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": {endpoint: self._hit[endpoint].value for endpoint in ENDPOINTS},
+            "misses": {endpoint: self._miss[endpoint].value for endpoint in ENDPOINTS},
+            "stores": {endpoint: self._stored[endpoint].value for endpoint in ENDPOINTS},
+            "evictions": self._evicted.value,
+            "expirations": self.expirations,
+            "shared_bodies": len(self._bodies),
+        }
+
+
+def get_negative_token_cache(request: Request) -> NegativeTokenCache | None:
+    """FastAPI dependency returning the negative token cache, or None when disabled."""
+    return request.app.state.negative_token_cache
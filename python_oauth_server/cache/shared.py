@@ -0,0 +1,272 @@
+"""
+Shared cache
+------------
+With several worker processes (see serve.py) an in-process cache is per
+worker: every worker warms its own copy, and an introspection entry dropped
+on revocation in one worker stays active in the others. `SharedCacheServer`
+is a small Redis stand-in that all workers of a host talk to over a Unix
+socket; `SharedCacheClient` is the worker side, used by the introspection and
+metadata caches when `CACHE_BACKEND=shared`.
+
+The server is a bounded LRU of byte strings with a TTL per entry. Requests
+and answers are length-prefixed binary frames:
+
+    request   op:u8  key_len:u16  value_len:u32  ttl:f64  key  value
+    answer    found:u8  value_len:u32  value
+
+    GET     value of a live entry
+    SET     stores value for ttl seconds
+    DELETE  found=1 if the entry existed
+    CLEAR   drops every key starting with `key`; value = count (ASCII)
+    INCR    adds `value` (ASCII, default 1) to the counter at `key`; value =
+            the new count. Counters have no TTL and are never evicted.
+    STATS   value = JSON counters
+
+Reads and writes are an optimisation, never a dependency: a GET or SET that
+fails or takes longer than SHARED_CACHE_TIMEOUT is counted and treated as a
+miss. Invalidations are not: a DELETE, CLEAR or INCR that is lost would leave
+a revoked token cached for every worker. They get SHARED_CACHE_INVALIDATION_ATTEMPTS
+tries of SHARED_CACHE_INVALIDATION_TIMEOUT each, and if none is answered the
+client raises `SharedCacheUnavailable`, which the revocation and grant
+management endpoints turn into 503 `temporarily_unavailable`: the client
+retries the revocation (harmless for a token that is already revoked, RFC 7009
+§2.2) and the invalidation with it.
+
+    CACHE_BACKEND                       "local" (default) or "shared"
+    SHARED_CACHE_SOCKET                 Unix socket path (/tmp/oauth-shared-cache.sock)
+    SHARED_CACHE_POOL_SIZE              connections per worker (8)
+    SHARED_CACHE_TIMEOUT                seconds per read / write (0.05)
+    SHARED_CACHE_INVALIDATION_TIMEOUT   seconds per invalidation attempt (1.0)
+    SHARED_CACHE_INVALIDATION_ATTEMPTS  tries per invalidation (3)
+    SHARED_CACHE_MAX_ENTRIES            entries kept by the server (100000)
+
+serve.py starts the server next to the workers; it can also run on its own:
+
+    uv run python -m cache --socket /tmp/oauth-shared-cache.sock
+"""
+
+import asyncio
+import json
+import logging
+import os
+import struct
+import time
+from collections import OrderedDict
+
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = "/tmp/oauth-shared-cache.sock"
+
+GET, SET, DELETE, CLEAR, STATS, INCR = 1, 2, 3, 4, 5, 6
+
+REQUEST = struct.Struct("!BHId")
+ANSWER = struct.Struct("!BI")
+
+
+class SharedCacheUnavailable(Exception):
+    """An invalidation the shared cache server did not confirm."""
+
+    def __init__(self, path: str, retry_after: float = 1.0):
+        super().__init__(f"Shared cache at {path} did not confirm an invalidation")
+        self.retry_after = retry_after
+
+
+def shared_backend_enabled() -> bool:
+    return os.getenv("CACHE_BACKEND", "local").strip().lower() == "shared"
+
+
+class SharedCacheServer:
+    def __init__(self, path: str = DEFAULT_SOCKET, max_entries: int = 100000):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, bytes]] = OrderedDict()
+        # Counters are kept apart from the entries: never evicted, expired or cleared
+        self._counters: dict[bytes, int] = {}
+        self.counters = {"gets": 0, "hits": 0, "sets": 0, "deletes": 0, "clears": 0, "evictions": 0, "connections": 0}
+
+    def _get(self, key: bytes) -> bytes | None:
+        self.counters["gets"] += 1
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.counters["hits"] += 1
+        return entry[1]
+
+    def _set(self, key: bytes, value: bytes, ttl: float):
+        self.counters["sets"] += 1
+        if ttl <= 0:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _clear(self, prefix: bytes) -> int:
+        self.counters["clears"] += 1
+        if not prefix:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+        doomed = [key for key in self._entries if key.startswith(prefix)]
+        for key in doomed:
+            del self._entries[key]
+        return len(doomed)
+
+    def execute(self, op: int, key: bytes, value: bytes, ttl: float) -> tuple[bool, bytes]:
+        if op == GET:
+            found = self._get(key)
+            return found is not None, found or b""
+        if op == SET:
+            self._set(key, value, ttl)
+            return True, b""
+        if op == DELETE:
+            self.counters["deletes"] += 1
+            return self._entries.pop(key, None) is not None, b""
+        if op == CLEAR:
+            return True, str(self._clear(key)).encode()
+        if op == INCR:
+            self._counters[key] = count = self._counters.get(key, 0) + int(value or 1)
+            return True, str(count).encode()
+        if op == STATS:
+            return True, json.dumps({"entries": len(self._entries), "max_entries": self.max_entries, **self.counters}).encode()
+        raise ValueError(f"Unknown shared cache op {op}")
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.counters["connections"] += 1
+        try:
+            while True:
+                op, key_len, value_len, ttl = REQUEST.unpack(await reader.readexactly(REQUEST.size))
+                key = await reader.readexactly(key_len)
+                value = await reader.readexactly(value_len) if value_len else b""
+                found, answer = self.execute(op, key, value, ttl)
+                writer.write(ANSWER.pack(found, len(answer)) + answer)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError:
+            logger.warning("Closing a shared cache connection that sent a malformed frame.")
+        finally:
+            writer.close()
+
+    async def serve_forever(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self._serve_connection, self.path)
+        os.chmod(self.path, 0o600)
+        logger.info("Shared cache listening on %s", self.path)
+        async with server:
+            await server.serve_forever()
+
+
+class SharedCacheClient:
+    def __init__(self, path: str = DEFAULT_SOCKET, pool_size: int = 8, timeout: float = 0.05,
+                 invalidation_timeout: float = 1.0, invalidation_attempts: int = 3):
+        self.path = path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.invalidation_timeout = invalidation_timeout
+        self.invalidation_attempts = max(1, invalidation_attempts)
+        self.invalidation_failures = 0
+        self._slots = asyncio.Semaphore(pool_size)
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.calls = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "SharedCacheClient | None":
+        if not shared_backend_enabled():
+            return None
+        return cls(
+            path=os.getenv("SHARED_CACHE_SOCKET", DEFAULT_SOCKET),
+            pool_size=int(os.getenv("SHARED_CACHE_POOL_SIZE", 8)),
+            timeout=float(os.getenv("SHARED_CACHE_TIMEOUT", 0.05)),
+            invalidation_timeout=float(os.getenv("SHARED_CACHE_INVALIDATION_TIMEOUT", 1.0)),
+            invalidation_attempts=int(os.getenv("SHARED_CACHE_INVALIDATION_ATTEMPTS", 3)),
+        )
+
+    async def _call(self, op: int, key: bytes, value: bytes = b"", ttl: float = 0.0,
+                    timeout: float | None = None) -> tuple[bool, bytes] | None:
+        self.calls += 1
+        async with self._slots:
+            connection = None
+            try:
+                async with asyncio.timeout(timeout or self.timeout):
+                    connection = self._idle.pop() if self._idle else await asyncio.open_unix_connection(self.path)
+                    reader, writer = connection
+                    writer.write(REQUEST.pack(op, len(key), len(value), ttl) + key + value)
+                    await writer.drain()
+                    found, length = ANSWER.unpack(await reader.readexactly(ANSWER.size))
+                    answer = await reader.readexactly(length) if length else b""
+            except (OSError, asyncio.IncompleteReadError, TimeoutError):
+                # A half-used connection may still carry the late answer; never reuse it
+                if connection is not None:
+                    connection[1].close()
+                self.errors += 1
+                if self.errors == 1 or self.errors % 1000 == 0:
+                    logger.warning("Shared cache at %s unavailable (%d errors); treating calls as misses.",
+                                   self.path, self.errors)
+                return None
+            self._idle.append(connection)
+            return bool(found), answer
+
+    async def _invalidate(self, op: int, key: bytes, value: bytes = b"") -> tuple[bool, bytes]:
+        """Like _call, with the invalidation budget; raises SharedCacheUnavailable instead of missing."""
+        for _ in range(self.invalidation_attempts):
+            result = await self._call(op, key, value, timeout=self.invalidation_timeout)
+            if result is not None:
+                return result
+        self.invalidation_failures += 1
+        logger.error("Shared cache at %s did not confirm an invalidation after %d attempts.",
+                     self.path, self.invalidation_attempts)
+        raise SharedCacheUnavailable(self.path)
+
+    async def get(self, key: bytes) -> bytes | None:
+        result = await self._call(GET, key)
+        return result[1] if result is not None and result[0] else None
+
+    async def set(self, key: bytes, value: bytes, ttl: float):
+        await self._call(SET, key, value, ttl)
+
+    async def delete(self, key: bytes) -> bool:
+        """True if the entry existed. Raises SharedCacheUnavailable if the server does not answer."""
+        return (await self._invalidate(DELETE, key))[0]
+
+    async def clear(self, prefix: bytes = b"") -> int:
+        """Number of entries dropped. Raises SharedCacheUnavailable if the server does not answer."""
+        return int((await self._invalidate(CLEAR, prefix))[1])
+
+    async def incr(self, key: bytes) -> int:
+        """The new count. Raises SharedCacheUnavailable if the server does not answer."""
+        return int((await self._invalidate(INCR, key))[1])
+
+    async def counter(self, key: bytes) -> int | None:
+        """Current value of an INCR counter (0 if never incremented), or None if the server did not answer."""
+        result = await self._call(INCR, key, b"0")
+        return int(result[1]) if result is not None else None
+
+    async def server_stats(self) -> dict | None:
+        result = await self._call(STATS, b"")
+        return json.loads(result[1]) if result is not None else None
+
+    def stats(self) -> dict:
+        return {"socket": self.path, "pool_size": self.pool_size, "calls": self.calls, "errors": self.errors,
+                "invalidation_failures": self.invalidation_failures, "idle_connections": len(self._idle)}
+
+    async def aclose(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+def get_shared_cache(request: Request) -> SharedCacheClient | None:
+    """FastAPI dependency returning the shared cache client, or None with the local backend."""
+    return request.app.state.shared_cache
+
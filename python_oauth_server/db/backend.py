@@ -0,0 +1,89 @@
+"""
+Storage backend selection.
+
+`open_stores()` is called from the lifespan hook in `main.py`; it builds the
+configured stores, opens them and installs them behind `UserDao` and
+`ResourceServerDao`.
+
+`preload_stores()` is called by the prefork master in serve.py before it
+forks: the JSON stores are parsed once there and every worker's
+`open_stores()` picks them up, so the indexes are shared copy-on-write
+instead of being rebuilt per worker. The SQLite backend opens connections,
+which must not cross a fork, so it is not preloaded.
+
+    DB_BACKEND               "json" (default) or "sqlite"
+    USERS_FILE               users.json path for the JSON backend
+    USERS_RELOAD_INTERVAL    seconds between users.json change checks (2, 0 disables)
+    SQLITE_PATH              database file for the SQLite backend (oauth.db)
+    SQLITE_POOL_SIZE         query threads / read connections (4)
+"""
+
+import os
+
+from db.json_store import USERS_FILE, JsonResourceServerStore, JsonUserStore
+from db.resource_server_dao import ResourceServerDao
+from db.sqlite_store import SqliteDatabase, SqliteResourceServerStore, SqliteUserStore
+from db.user_dao import UserDao
+
+_database = None
+_preloaded = None
+
+
+def _backend() -> str:
+    return os.getenv("DB_BACKEND", "json").strip().lower()
+
+
+def _json_stores():
+    user_store = JsonUserStore(
+        os.getenv("USERS_FILE", USERS_FILE),
+        reload_interval=float(os.getenv("USERS_RELOAD_INTERVAL", 2)),
+    )
+    return user_store, JsonResourceServerStore()
+
+
+def preload_stores() -> bool:
+    """Loads the JSON stores in this process for `open_stores()` to reuse; False for other backends."""
+    global _preloaded
+
+    if _backend() != "json":
+        return False
+    user_store, rs_store = _json_stores()
+    user_store.reload()
+    rs_store.load()
+    _preloaded = (user_store, rs_store)
+    return True
+
+
+async def open_stores():
+    global _database
+
+    backend = _backend()
+    if backend == "json" and _preloaded is not None:
+        user_store, rs_store = _preloaded
+    elif backend == "sqlite":
+        _database = SqliteDatabase(
+            os.getenv("SQLITE_PATH", "oauth.db"),
+            pool_size=int(os.getenv("SQLITE_POOL_SIZE", 4)),
+        )
+        await _database.open()
+        user_store = SqliteUserStore(_database)
+        rs_store = SqliteResourceServerStore(_database)
+    elif backend == "json":
+        user_store, rs_store = _json_stores()
+    else:
+        raise RuntimeError(f"Unknown DB_BACKEND '{backend}' (expected 'json' or 'sqlite').")
+
+    await user_store.open()
+    await rs_store.open()
+    UserDao.use(user_store)
+    ResourceServerDao.use(rs_store)
+
+
+async def close_stores():
+    global _database
+
+    await UserDao.store.close()
+    await ResourceServerDao.store.close()
+    if _database is not None:
+        await _database.close()
+        _database = None
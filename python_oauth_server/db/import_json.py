@@ -0,0 +1,77 @@
+"""
+Bulk import of the JSON resources into the SQLite backend.
+
+    python -m db.import_json [--db oauth.db] [--users resources/users.json]
+                             [--resource-servers resources/resource_servers.json]
+
+users.json is read incrementally, one array element at a time, and rows are
+inserted in batches inside a single transaction, so memory stays flat no
+matter how large the file is. Existing rows with the same key are replaced,
+which makes the import safe to re-run.
+"""
+
+import argparse
+import time
+
+from db.json_array import iter_json_array
+from db.json_store import RS_FILE, USERS_FILE
+from db.sqlite_store import connect_writable
+
+UPSERT_USER = "INSERT OR REPLACE INTO users (login_id, password, subject, name, email) VALUES (?, ?, ?, ?, ?)"
+UPSERT_RESOURCE_SERVER = "INSERT OR REPLACE INTO resource_servers (id, secret) VALUES (?, ?)"
+
+BATCH_SIZE = 5000
+
+
+def _user_rows(path):
+    for record in iter_json_array(path):
+        yield (record["loginId"], record["password"], record["subject"], record.get("name"), record.get("email"))
+
+
+def _rs_rows(path):
+    for record in iter_json_array(path):
+        yield (record["id"], record["secret"])
+
+
+def _insert(connection, sql, rows, batch_size: int) -> int:
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            connection.executemany(sql, batch)
+            count += len(batch)
+            batch.clear()
+    if batch:
+        connection.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+
+def import_json(db_path, users_file=USERS_FILE, rs_file=RS_FILE, batch_size: int = BATCH_SIZE) -> tuple[int, int]:
+    connection = connect_writable(db_path)
+    try:
+        with connection:
+            users = _insert(connection, UPSERT_USER, _user_rows(users_file), batch_size)
+            servers = _insert(connection, UPSERT_RESOURCE_SERVER, _rs_rows(rs_file), batch_size)
+    finally:
+        connection.close()
+    return users, servers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import users.json and resource_servers.json into SQLite.")
+    parser.add_argument("--db", default="oauth.db")
+    parser.add_argument("--users", default=str(USERS_FILE))
+    parser.add_argument("--resource-servers", default=str(RS_FILE))
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    users, servers = import_json(args.db, args.users, args.resource_servers, args.batch_size)
+    print(f"Imported {users} users and {servers} resource servers into {args.db} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
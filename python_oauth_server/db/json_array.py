@@ -0,0 +1,81 @@
+"""
+Streaming reader for the JSON resource files.
+
+users.json and resource_servers.json are one top-level JSON array of
+records. `iter_json_array()` yields those elements one at a time, reading
+the file in chunks, so neither the JSON user store nor the SQLite import
+ever holds the whole file or the whole parsed list. Nested objects (an
+address claim...) stay part of their element. The array syntax is checked:
+elements must be separated by single commas and nothing may follow the
+closing bracket.
+"""
+
+import json
+
+READ_SIZE = 1 << 20
+
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = ",]" + _WHITESPACE
+
+
+def iter_json_array(path, read_size: int = READ_SIZE):
+    """Yields the elements of the top-level JSON array in `path`."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        position = 0
+        eof = False
+        # "[" before the array, "value" / "first" before an element (the
+        # first may also be "]"), "," after one, "end" after the array
+        expect = "["
+
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+
+            if position < len(buffer):
+                char = buffer[position]
+                if expect == "end":
+                    raise ValueError(f"{path}: extra data after the JSON array")
+                if expect == "[":
+                    if char != "[":
+                        raise ValueError(f"{path} does not contain a JSON array")
+                    expect = "first"
+                    position += 1
+                    continue
+                if expect == ",":
+                    if char == "]":
+                        expect = "end"
+                    elif char == ",":
+                        expect = "value"
+                    else:
+                        raise ValueError(f"{path}: expected ',' or ']' in the JSON array")
+                    position += 1
+                    continue
+                if expect == "first" and char == "]":
+                    expect = "end"
+                    position += 1
+                    continue
+                try:
+                    element, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError as e:
+                    if eof:
+                        raise ValueError(f"{path}: {e.msg} in the JSON array") from e
+                else:
+                    # A number cut off by the chunk boundary ("2." of "2.5")
+                    # still decodes; only trust a match followed by a delimiter.
+                    if eof or (end < len(buffer) and buffer[end] in _DELIMITERS):
+                        yield element
+                        position = end
+                        expect = ","
+                        continue
+            elif eof:
+                if expect == "end":
+                    return
+                raise ValueError(f"{path}: unexpected end of JSON array")
+
+            # Need more input: drop what was consumed and read the next chunk
+            chunk = f.read(read_size)
+            buffer = buffer[position:] + chunk
+            position = 0
+            eof = not chunk
@@ -0,0 +1,256 @@
+"""
+JSON file backend
+-----------------
+The original storage: `resources/users.json` and
+`resources/resource_servers.json` held entirely in memory. Lookups are plain
+dict reads, so they never block the event loop even though the store API is
+async.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # Windows: a single process, nothing to lock against
+    fcntl = None
+
+from db.json_array import iter_json_array
+from db.models import ResourceServer, User
+from db.stores import ResourceServerStore, UserStore
+
+logger = logging.getLogger(__name__)
+
+# Resolve the path to the resources directory
+BASE_DIR = Path(__file__).resolve().parent.parent
+USERS_FILE = BASE_DIR / "resources" / "users.json"
+RS_FILE = BASE_DIR / "resources" / "resource_servers.json"
+
+
+# Each user is stored as ONE packed string ("subject|password|name|email")
+# keyed by loginId, plus a subject -> loginId index that shares the key
+# strings. At a million users the per-object overhead of five separate str
+# objects (or a dict per user) dominates memory, so records are only expanded
+# into a User tuple when they are looked up.
+_SEP = "\x1f"
+_NONE = "\x00"
+
+
+def _pack(subject, password, name, email) -> str:
+    fields = (subject, password, _NONE if name is None else name, _NONE if email is None else email)
+    if any(_SEP in field for field in fields):
+        raise ValueError("user record contains the reserved \\x1f character")
+    return _SEP.join(fields)
+
+
+def _unpack(login_id: str, packed: str) -> User:
+    subject, password, name, email = packed.split(_SEP)
+    return User(login_id, password, subject, None if name == _NONE else name, None if email == _NONE else email)
+
+
+class _Snapshot:
+    """Immutable view of users.json: both indexes plus the file version it came from."""
+    __slots__ = ("by_login_id", "by_subject", "version")
+
+    def __init__(self, by_login_id, by_subject, version):
+        self.by_login_id = by_login_id
+        self.by_subject = by_subject
+        self.version = version
+
+
+class JsonUserStore(UserStore):
+    # Readers only ever dereference _snapshot once; a reload builds a complete
+    # new snapshot off to the side and swaps the reference in a single store,
+    # so lookups never take a lock and never see a half-built index.
+    def __init__(self, users_file=USERS_FILE, reload_interval: float = 0):
+        self.users_file = Path(users_file)
+        self.reload_interval = reload_interval
+        self._snapshot = None
+        self._failed_version = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop_watching = None
+
+    def _file_version(self):
+        stat = os.stat(self.users_file)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _build_snapshot(self):
+        version = self._file_version()
+        by_login_id = {}
+        by_subject = {}
+
+        # Records go straight into the indexes, so the parsed dicts never
+        # accumulate in memory
+        for record in iter_json_array(self.users_file):
+            if not isinstance(record, dict):
+                raise ValueError(f"{self.users_file}: every user must be a JSON object")
+            login_id = record["loginId"]
+            subject = record["subject"]
+            # A later record would silently shadow the earlier one
+            if login_id in by_login_id:
+                raise ValueError(f"{self.users_file}: duplicate loginId {login_id!r}")
+            if subject in by_subject:
+                raise ValueError(f"{self.users_file}: duplicate subject {subject!r} "
+                                 f"(users {by_subject[subject]!r} and {login_id!r})")
+            by_login_id[login_id] = _pack(subject, record["password"], record.get("name"), record.get("email"))
+            by_subject[subject] = login_id
+
+        return _Snapshot(by_login_id, by_subject, version)
+
+    def reload(self):
+        """Loads users.json and atomically replaces the current snapshot."""
+        with self._reload_lock:
+            snapshot = self._build_snapshot()
+            self._snapshot = snapshot
+        logger.info("Loaded %d users from %s", len(snapshot.by_login_id), self.users_file)
+        return snapshot
+
+    def reload_if_changed(self) -> bool:
+        try:
+            version = self._file_version()
+        except OSError:
+            return False
+
+        snapshot = self._snapshot
+        if (snapshot is not None and snapshot.version == version) or version == self._failed_version:
+            return False
+
+        try:
+            self.reload()
+            return True
+        except (OSError, ValueError, KeyError):
+            # A half-written or broken file must not take the user store down;
+            # remember it so it is not re-parsed (and re-logged) every poll
+            self._failed_version = version
+            logger.warning("Could not reload %s; keeping the previous snapshot.", self.users_file, exc_info=True)
+            return False
+
+    def start_watching(self, interval: float = 2.0):
+        """Polls users.json from a daemon thread and hot-swaps it when it changes."""
+        if self._watcher is not None or interval <= 0:
+            return
+
+        stop = threading.Event()
+
+        def watch():
+            while not stop.wait(interval):
+                self.reload_if_changed()
+
+        self._stop_watching = stop
+        self._watcher = threading.Thread(target=watch, name="users-json-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is None:
+            return
+        self._stop_watching.set()
+        self._watcher.join()
+        self._watcher = None
+        self._stop_watching = None
+
+    def _load_users(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.reload()
+        return snapshot
+
+    def _rewrite_password(self, login_id: str, password: str) -> bool:
+        """
+        Sets one user's password in users.json itself. Every worker process
+        may do this, so it holds an exclusive lock on users.json.lock, edits
+        the file as it is on disk (keeping the other workers' changes and any
+        field the store does not know about), writes a private temp file next
+        to it and renames that over users.json: the watcher, a reader in
+        another process or a crash never sees a half-written file.
+        """
+        lock_file = self.users_file.with_name(self.users_file.name + ".lock")
+        with open(lock_file, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            records = list(iter_json_array(self.users_file))
+            for record in records:
+                if isinstance(record, dict) and record.get("loginId") == login_id:
+                    record["password"] = password
+                    break
+            else:
+                return False
+
+            fd, tmp = tempfile.mkstemp(prefix=self.users_file.name + ".", suffix=".tmp", dir=self.users_file.parent)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write("[\n    " + ",\n    ".join(json.dumps(record) for record in records) + "\n]\n")
+                os.chmod(tmp, os.stat(self.users_file).st_mode & 0o777)
+                os.replace(tmp, self.users_file)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        return True
+
+    def _save_password(self, login_id: str, password: str):
+        self._load_users()
+        with self._reload_lock:
+            if not self._rewrite_password(login_id, password):
+                return
+            snapshot = self._snapshot
+            packed = snapshot.by_login_id.get(login_id)
+            if packed is None:
+                return
+            user = _unpack(login_id, packed)
+            # A new snapshot, not an in-place edit: the preloaded one stays
+            # shared copy-on-write with the other workers. It keeps the old
+            # file version, so the watcher still reloads the file and picks up
+            # what other workers wrote to it.
+            by_login_id = dict(snapshot.by_login_id)
+            by_login_id[login_id] = _pack(user.subject, password, user.name, user.email)
+            self._snapshot = _Snapshot(by_login_id, snapshot.by_subject, snapshot.version)
+
+    async def open(self):
+        # Already loaded when serve.py preloaded the store before forking
+        if self._snapshot is None:
+            self.reload()
+        self.start_watching(self.reload_interval)
+
+    async def close(self):
+        self.stop_watching()
+
+    async def get_by_login_id(self, login_id: str) -> User | None:
+        packed = self._load_users().by_login_id.get(login_id)
+        return None if packed is None else _unpack(login_id, packed)
+
+    async def get_by_subject(self, subject: str) -> User | None:
+        snapshot = self._load_users()
+        login_id = snapshot.by_subject.get(subject)
+        return None if login_id is None else _unpack(login_id, snapshot.by_login_id[login_id])
+
+    async def update_password(self, login_id: str, password: str):
+        await asyncio.to_thread(self._save_password, login_id, password)
+
+    def count(self) -> int:
+        return len(self._load_users().by_login_id)
+
+
+class JsonResourceServerStore(ResourceServerStore):
+    def __init__(self, rs_file=RS_FILE):
+        self.rs_file = Path(rs_file)
+        self._servers = None
+
+    def load(self):
+        with open(self.rs_file, "r") as f:
+            data = json.load(f)
+        self._servers = {rs["id"]: ResourceServer(rs["id"], rs["secret"]) for rs in data}
+        return self._servers
+
+    def _load_servers(self):
+        return self._servers if self._servers is not None else self.load()
+
+    async def open(self):
+        self._load_servers()
+
+    async def get(self, rs_id: str) -> ResourceServer | None:
+        return self._load_servers().get(rs_id)
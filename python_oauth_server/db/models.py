@@ -0,0 +1,14 @@
+from typing import NamedTuple
+
+
+class User(NamedTuple):
+    login_id: str
+    password: str
+    subject: str
+    name: str | None = None
+    email: str | None = None
+
+
+class ResourceServer(NamedTuple):
+    id: str
+    secret: str
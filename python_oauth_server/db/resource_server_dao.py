@@ -1,22 +1,17 @@
-import json
-import os
-from pathlib import Path
+from db.json_store import JsonResourceServerStore
+from db.models import ResourceServer
+from db.stores import ResourceServerStore
+from observability.tracing import start_span
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-RS_FILE = BASE_DIR / "resources" / "resource_servers.json"
 
 class ResourceServerDao:
-    _servers = None
+    store: ResourceServerStore = JsonResourceServerStore()
 
     @classmethod
-    def _load_servers(cls):
-        if cls._servers is None:
-            with open(RS_FILE, "r") as f:
-                data = json.load(f)
-                cls._servers = {rs["id"]: rs for rs in data}
-        return cls._servers
+    def use(cls, store: ResourceServerStore):
+        cls.store = store
 
     @classmethod
-    def get(cls, rs_id: str):
-        servers = cls._load_servers()
-        return servers.get(rs_id)
\ No newline at end of file
+    async def get(cls, rs_id: str) -> ResourceServer | None:
+        with start_span("ResourceServerDao.get"):
+            return await cls.store.get(rs_id)
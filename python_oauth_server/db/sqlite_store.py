@@ -0,0 +1,143 @@
+"""
+SQLite backend
+--------------
+Indexed, on-disk storage for users and resource servers, for user bases that
+do not fit the JSON file and for several worker processes reading the same
+data.
+
+* The database runs in WAL mode, so the import tool (or any other writer) never
+  blocks readers and each worker sees a consistent snapshot per query.
+* `sqlite3` is synchronous, so every query runs on a small dedicated thread
+  pool; the event loop only awaits the result.
+* Each pool thread owns one long-lived read-only connection (the connection
+  pool). Queries are fixed SQL strings, so they hit sqlite3's per-connection
+  prepared statement cache after the first call.
+
+Use `python -m db.import_json` to load the existing JSON files.
+"""
+
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from db.models import ResourceServer, User
+from db.stores import ResourceServerStore, UserStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    login_id TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    subject  TEXT NOT NULL,
+    name     TEXT,
+    email    TEXT
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS users_subject ON users (subject);
+
+CREATE TABLE IF NOT EXISTS resource_servers (
+    id     TEXT PRIMARY KEY,
+    secret TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+SELECT_USER_BY_LOGIN_ID = "SELECT login_id, password, subject, name, email FROM users WHERE login_id = ?"
+SELECT_USER_BY_SUBJECT = "SELECT login_id, password, subject, name, email FROM users WHERE subject = ?"
+SELECT_RESOURCE_SERVER = "SELECT id, secret FROM resource_servers WHERE id = ?"
+UPDATE_USER_PASSWORD = "UPDATE users SET password = ? WHERE login_id = ?"
+
+
+def connect_writable(path) -> sqlite3.Connection:
+    """Opens a read-write connection and makes sure the schema and WAL mode are in place."""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(SCHEMA)
+    connection.commit()
+    return connection
+
+
+class SqliteDatabase:
+    def __init__(self, path, pool_size: int = 4):
+        self.path = Path(path)
+        self.pool_size = pool_size
+        self._executor = None
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._writer = None
+        self._write_lock = threading.Lock()
+
+    async def open(self):
+        # Create the file / schema once, then hand out read-only connections
+        connect_writable(self.path).close()
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="sqlite")
+
+    async def close(self):
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True, check_same_thread=False, cached_statements=64
+            )
+            connection.execute("PRAGMA query_only=ON")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def _fetchone(self, sql: str, params: tuple):
+        return self._connection().execute(sql, params).fetchone()
+
+    async def fetchone(self, sql: str, params: tuple):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._fetchone, sql, params)
+
+    def _execute(self, sql: str, params: tuple):
+        # Writes are rare (password upgrades); one serialized writer is enough,
+        # and WAL keeps the read connections unblocked while it commits.
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = sqlite3.connect(self.path, check_same_thread=False)
+            with self._writer:
+                self._writer.execute(sql, params)
+
+    async def execute(self, sql: str, params: tuple):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._execute, sql, params)
+
+
+class SqliteUserStore(UserStore):
+    def __init__(self, database: SqliteDatabase):
+        self.database = database
+
+    async def get_by_login_id(self, login_id: str) -> User | None:
+        row = await self.database.fetchone(SELECT_USER_BY_LOGIN_ID, (login_id,))
+        return None if row is None else User(*row)
+
+    async def get_by_subject(self, subject: str) -> User | None:
+        row = await self.database.fetchone(SELECT_USER_BY_SUBJECT, (subject,))
+        return None if row is None else User(*row)
+
+    async def update_password(self, login_id: str, password: str):
+        await self.database.execute(UPDATE_USER_PASSWORD, (password, login_id))
+
+
+class SqliteResourceServerStore(ResourceServerStore):
+    def __init__(self, database: SqliteDatabase):
+        self.database = database
+
+    async def get(self, rs_id: str) -> ResourceServer | None:
+        row = await self.database.fetchone(SELECT_RESOURCE_SERVER, (rs_id,))
+        return None if row is None else ResourceServer(*row)
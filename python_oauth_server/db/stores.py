@@ -0,0 +1,40 @@
+"""
+Storage interfaces behind `UserDao` and `ResourceServerDao`.
+
+Every lookup is a coroutine so a backend that does real I/O (SQLite, a
+network database) can run it off the event loop. In-memory backends simply
+return without suspending.
+"""
+
+from abc import ABC, abstractmethod
+
+from db.models import ResourceServer, User
+
+
+class UserStore(ABC):
+    async def open(self):
+        """Loads data / acquires connections. Called once from the lifespan hook."""
+
+    async def close(self):
+        """Releases whatever open() acquired."""
+
+    @abstractmethod
+    async def get_by_login_id(self, login_id: str) -> User | None: ...
+
+    @abstractmethod
+    async def get_by_subject(self, subject: str) -> User | None: ...
+
+    @abstractmethod
+    async def update_password(self, login_id: str, password: str):
+        """Replaces the stored password (hash) of `login_id`."""
+
+
+class ResourceServerStore(ABC):
+    async def open(self):
+        """Loads data / acquires connections. Called once from the lifespan hook."""
+
+    async def close(self):
+        """Releases whatever open() acquired."""
+
+    @abstractmethod
+    async def get(self, rs_id: str) -> ResourceServer | None: ...
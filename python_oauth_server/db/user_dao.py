@@ -1,33 +1,29 @@
-import json
-import os
-from pathlib import Path
+from db.json_store import JsonUserStore
+from db.models import User
+from db.stores import UserStore
+from observability.tracing import start_span
 
-# Resolve the path to the resources directory
-BASE_DIR = Path(__file__).resolve().parent.parent
-USERS_FILE = BASE_DIR / "resources" / "users.json"
 
 class UserDao:
-    _users = None
+    # The backing store is chosen at startup (see db/backend.py); the JSON
+    # file store is the default so the DAO works without any configuration.
+    store: UserStore = JsonUserStore()
 
     @classmethod
-    def _load_users(cls):
-        if cls._users is None:
-            with open(USERS_FILE, "r") as f:
-                data = json.load(f)
-                # Index by loginId for fast lookups
-                cls._users = {user["loginId"]: user for user in data}
-        return cls._users
+    def use(cls, store: UserStore):
+        cls.store = store
 
     @classmethod
-    def get_by_login_id(cls, login_id: str):
-        users = cls._load_users()
-        return users.get(login_id)
+    async def get_by_login_id(cls, login_id: str) -> User | None:
+        with start_span("UserDao.get_by_login_id"):
+            return await cls.store.get_by_login_id(login_id)
 
     @classmethod
-    def get_by_subject(cls, subject: str):
-        users = cls._load_users()
-        # Search the loaded users for a matching subject ID
-        for user in users.values():
-            if user["subject"] == subject:
-                return user
-        return None
\ No newline at end of file
+    async def get_by_subject(cls, subject: str) -> User | None:
+        with start_span("UserDao.get_by_subject"):
+            return await cls.store.get_by_subject(subject)
+
+    @classmethod
+    async def update_password(cls, login_id: str, password: str):
+        with start_span("UserDao.update_password"):
+            await cls.store.update_password(login_id, password)
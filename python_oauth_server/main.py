@@ -1,10 +1,76 @@
-import sdk_compat_patch
-sdk_compat_patch.apply_all()
-
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from api import authorization, token, authorization_decision, metadata, userinfo, introspection, revocation, par, register, gm, federation_configuration, federation_registration, credential_issuer_metadata, credential, jwt_issuer_metadata
+from authlete_client import AuthleteClientRegistry, AuthleteUnavailable, DeadlineMiddleware
+from cache import IntrospectionCache, MetadataCache, NegativeTokenCache, SharedCacheClient, SharedCacheUnavailable
+from db.backend import close_stores, open_stores
+from observability import Tracer, configure_logging, instrument_routes, set_tracer, trace_routes
+from security import AccessTokenValidator, AdminToken, PasswordVerifier, PasswordVerifierBusy, ResourceServerAuthenticator
+from api.consent_page import ConsentPage
+from api.form_body import FormSettings
+from api.introspection_batch import IntrospectionBatchSettings
+from api import authorization, token, authorization_decision, metadata, userinfo, introspection, introspection_batch, revocation, par, register, gm, federation_configuration, federation_registration, credential_issuer_metadata, credential, jwt_issuer_metadata, admin, metrics, responses
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Structured logs, written from a background thread (see observability/log.py)
+    app.state.logging = configure_logging()
+    # Optional; None (and every /admin route 404) unless ADMIN_TOKEN is set
+    app.state.admin_token = AdminToken.from_env()
+    # Optional; None (and no tracer installed) unless TRACING_ENABLED is set
+    app.state.tracer = Tracer.from_env()
+    if app.state.tracer is not None:
+        set_tracer(app.state.tracer)
+        trace_routes(app)
+    # One Authlete client (and one keep-alive pool) for the whole application
+    app.state.authlete = AuthleteClientRegistry.from_env()
+    # Optional; None unless CACHE_BACKEND=shared (one cache for all workers, see serve.py)
+    app.state.shared_cache = SharedCacheClient.from_env()
+    # Discovery / JWKS / issuer metadata documents, served from memory
+    app.state.metadata_cache = MetadataCache.from_env(app.state.shared_cache)
+    # Optional; None unless INTROSPECTION_CACHE_ENABLED is set
+    app.state.introspection_cache = IntrospectionCache.from_env(app.state.shared_cache)
+    # Optional; None unless NEGATIVE_TOKEN_CACHE_ENABLED is set (tokens Authlete refused)
+    app.state.negative_token_cache = NegativeTokenCache.from_env()
+    # User / resource server storage (JSON files or SQLite, see db/backend.py)
+    await open_stores()
+    # Bounded thread pool for password hashing / verification
+    app.state.password_verifier = PasswordVerifier.from_env()
+    # Request limits: form body size, batch introspection size and fan-out
+    app.state.form_settings = FormSettings.from_env()
+    app.state.introspection_batch = IntrospectionBatchSettings.from_env()
+    # Login / consent page, compiled once (see api/consent_page.py)
+    app.state.consent_page = ConsentPage.from_env()
+    # Hashed resource server secrets, with verified headers cached
+    app.state.rs_authenticator = ResourceServerAuthenticator.from_env()
+    # Optional; None unless ACCESS_TOKEN_LOCAL_VALIDATION is set (JWT access tokens
+    # checked against the cached service JWKS before they go to Authlete)
+    app.state.access_token_validator = AccessTokenValidator.from_env(
+        jwks=lambda refresh: metadata.service_jwks(app.state.authlete.api, app.state.metadata_cache, refresh),
+        configuration=lambda: metadata.service_configuration(app.state.authlete.api, app.state.metadata_cache),
+    )
+    yield
+    await close_stores()
+    app.state.password_verifier.close()
+    await app.state.metadata_cache.aclose()
+    if app.state.shared_cache is not None:
+        await app.state.shared_cache.aclose()
+    await app.state.authlete.aclose()
+    set_tracer(None)
+    if app.state.tracer is not None:
+        app.state.tracer.shutdown()
+    app.state.logging.stop()
 
-app = FastAPI(title="Authlete Python Reference Server")
+
+app = FastAPI(title="Authlete Python Reference Server", lifespan=lifespan)
+# Per-request deadline that bounds every Authlete call (authlete_client/resilience.py)
+app.add_middleware(DeadlineMiddleware)
+# Failed-fast Authlete calls -> 503 temporarily_unavailable
+app.add_exception_handler(AuthleteUnavailable, responses.temporarily_unavailable)
+# Unconfirmed shared cache invalidation after a revocation -> 503, so the client retries it
+app.add_exception_handler(SharedCacheUnavailable, responses.temporarily_unavailable)
+# Password hashing backlog full -> 503 instead of an ever longer queue
+app.add_exception_handler(PasswordVerifierBusy, responses.temporarily_unavailable)
 
 app.include_router(authorization_decision.router)
 app.include_router(authorization.router)
@@ -12,6 +78,7 @@ app.include_router(token.router)
 app.include_router(metadata.router)
 app.include_router(userinfo.router)
 app.include_router(introspection.router)
+app.include_router(introspection_batch.router)
 app.include_router(revocation.router)
 app.include_router(par.router)
 app.include_router(register.router)
@@ -21,3 +88,8 @@ app.include_router(federation_registration.router)
 app.include_router(credential_issuer_metadata.router)
 app.include_router(credential.router)
 app.include_router(jwt_issuer_metadata.router)
+app.include_router(admin.router)
+app.include_router(metrics.router)
+
+# Per-route latency histograms and in-flight gauges, exposed on /metrics
+instrument_routes(app)
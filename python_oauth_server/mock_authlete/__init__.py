@@ -0,0 +1,19 @@
+"""
+Offline stand-in for the Authlete API (see app.py, service.py, settings.py).
+
+    python -m mock_authlete --port 8089 --latency 0.02 --properties mock.properties
+    AUTHLETE_MOCK=true uvicorn main:app     # the server starts its own mock
+"""
+
+from mock_authlete.app import MockAuthlete, MockAuthleteServer, mock_configuration, start_mock_authlete
+from mock_authlete.service import MockAuthleteService
+from mock_authlete.settings import MockSettings
+
+__all__ = [
+    "MockAuthlete",
+    "MockAuthleteServer",
+    "MockAuthleteService",
+    "MockSettings",
+    "mock_configuration",
+    "start_mock_authlete",
+]
@@ -0,0 +1,63 @@
+"""
+Runs the mock Authlete API on a local port.
+
+Usage (from python_oauth_server/):
+
+    uv run python -m mock_authlete --port 8089 --latency 0.02 --jitter 0.005 \
+        --actions "/auth/token:INVALID_CLIENT=0.05" --properties mock.properties
+    AUTHLETE_PROPERTIES=mock.properties uv run uvicorn main:app --port 8000
+
+Options left unset fall back to the AUTHLETE_MOCK_* environment variables
+(see settings.py). --properties writes an authlete.properties file that
+points the server at the mock.
+"""
+
+import argparse
+from dataclasses import replace
+
+import uvicorn
+
+from mock_authlete.app import MockAuthlete
+from mock_authlete.settings import MockSettings, _parse_mapping, parse_actions, parse_clients
+
+PROPERTIES = """\
+# Generated by `python -m mock_authlete`; points the server at the local mock
+[authlete]
+api_version = V3
+base_url = {base_url}
+service.api_key = mock
+service.access_token = mock-token
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m mock_authlete", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, help="base latency of every call, seconds")
+    parser.add_argument("--latencies", type=lambda s: _parse_mapping(s, float), help='e.g. "/auth/token=0.05"')
+    parser.add_argument("--jitter", type=float, help="mean of an exponential extra delay, seconds")
+    parser.add_argument("--error-rate", type=float, help="fraction of calls answered with HTTP 500")
+    parser.add_argument("--error-rates", type=lambda s: _parse_mapping(s, float), help='e.g. "/auth/userinfo=0.1"')
+    parser.add_argument("--actions", type=parse_actions, help='e.g. "/auth/token:INVALID_CLIENT=0.05"')
+    parser.add_argument("--clients", type=parse_clients, help='e.g. "1234:secret,5678:other"')
+    parser.add_argument("--issuer")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--properties", help="write an authlete.properties file pointing at the mock")
+    args = parser.parse_args()
+
+    overrides = {name: value for name, value in vars(args).items()
+                 if name in MockSettings.__dataclass_fields__ and value is not None}
+    settings = replace(MockSettings.from_env(), **overrides)
+
+    if args.properties:
+        with open(args.properties, "w") as f:
+            f.write(PROPERTIES.format(base_url=f"http://{args.host}:{args.port}"))
+        print(f"Wrote {args.properties}; start the server with AUTHLETE_PROPERTIES={args.properties}")
+
+    uvicorn.run(MockAuthlete(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Mock Authlete ASGI application
+------------------------------
+`MockAuthlete` answers the Authlete API paths this server calls, under either
+the V3 (`/api/{serviceId}/...`) or the V2 (`/api/...`) prefix, from the
+in-memory `MockAuthleteService`. Before answering, each call is delayed by the
+configured latency, may be failed with an HTTP 500 (error rate), and may be
+answered with a forced action instead of its normal one (action
+distribution); see settings.py.
+
+`GET /mock/stats` reports call counts, injected faults and state sizes.
+
+`start_mock_authlete()` serves the app on a local port from a background
+thread with its own event loop, so injected latency never blocks the caller's
+loop; `mock_configuration()` builds the matching `AuthleteConfiguration`.
+"""
+
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+
+import uvicorn
+from authlete.conf.authlete_configuration import AuthleteConfiguration
+
+from mock_authlete.service import MockAuthleteService, result
+from mock_authlete.settings import MockSettings
+
+API_ROOTS = frozenset({"auth", "client", "federation", "gm", "pushed_auth_req", "service", "vci"})
+
+# Operations that answer with a plain JSON document instead of an action
+RAW_OPERATIONS = frozenset({"/service/configuration", "/service/jwks/get"})
+
+# Forced error actions whose responseContent is a WWW-Authenticate value
+BEARER_OPERATIONS = frozenset({"/auth/introspection", "/auth/userinfo", "/auth/userinfo/issue", "/vci/single/issue"})
+
+ERROR_CODES = {
+    "BAD_REQUEST": "invalid_request",
+    "INVALID_CLIENT": "invalid_client",
+    "UNAUTHORIZED": "invalid_token",
+    "FORBIDDEN": "insufficient_scope",
+    "NOT_FOUND": "not_found",
+    "PAYLOAD_TOO_LARGE": "invalid_request",
+}
+
+FORCED_CONTENT = {
+    "LOCATION": "https://client.example.org/cb?code=mock",
+    "NO_INTERACTION": "https://client.example.org/cb?error=login_required",
+    "FORM": '<html><body onload="javascript:document.forms[0].submit()">'
+            '<form method="post" action="https://client.example.org/cb"></form></body></html>',
+    "OK": "{}",
+    "CREATED": "{}",
+    "JSON": "{}",
+    "NO_CONTENT": None,
+}
+
+
+def forced_result(operation: str, action: str) -> dict:
+    if action == "INTERACTION":
+        return result(action, None, ticket="mock-ticket")
+    if action in FORCED_CONTENT:
+        return result(action, FORCED_CONTENT[action])
+    error = ERROR_CODES.get(action, "server_error")
+    if operation in BEARER_OPERATIONS:
+        return result(action, f'Bearer error="{error}",error_description="[mock] Forced {action}."')
+    return result(action, json.dumps({"error": error, "error_description": f"[mock] Forced {action}."}))
+
+
+def operation_of(path: str) -> str:
+    """'/api/{serviceId}/auth/token' or '/api/auth/token' -> '/auth/token'"""
+    parts = path.split("/")[2:] if path.startswith("/api/") else path.split("/")[1:]
+    if parts and parts[0] not in API_ROOTS:
+        parts = parts[1:]
+    return "/" + "/".join(parts)
+
+
+class MockAuthlete:
+    def __init__(self, settings: MockSettings | None = None, service: MockAuthleteService | None = None):
+        self.settings = settings or MockSettings()
+        self.service = service or MockAuthleteService(self.settings.issuer, self.settings.clients,
+                                                         jwt_access_tokens=self.settings.jwt_access_tokens)
+        self._random = random.Random(self.settings.seed)
+        self.calls: dict[str, int] = {}
+        self.injected_errors: dict[str, int] = {}
+        self.forced_actions: dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "MockAuthlete":
+        return cls(MockSettings.from_env())
+
+    def _delay(self, operation: str) -> float:
+        settings = self.settings
+        delay = settings.latencies.get(operation, settings.latency)
+        if settings.jitter > 0:
+            delay += self._random.expovariate(1.0 / settings.jitter)
+        return delay
+
+    def _forced_action(self, operation: str) -> str | None:
+        weights = self.settings.actions.get(operation)
+        if not weights or operation in RAW_OPERATIONS:
+            return None
+        draw = self._random.random()
+        for action, probability in weights.items():
+            if draw < probability:
+                return action
+            draw -= probability
+        return None
+
+    async def _answer(self, method: str, path: str, body: bytes) -> tuple[int, object]:
+        if path == "/mock/stats":
+            return 200, self.stats()
+
+        operation = operation_of(path)
+        handler = self.service.handlers.get(operation)
+        if handler is None:
+            return 404, {"resultCode": "A001101", "resultMessage": f"[mock] Unknown API {method} {path}"}
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+
+        delay = self._delay(operation)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        error_rate = self.settings.error_rates.get(operation, self.settings.error_rate)
+        if error_rate > 0 and self._random.random() < error_rate:
+            self.injected_errors[operation] = self.injected_errors.get(operation, 0) + 1
+            return 500, {"resultCode": "A001201", "resultMessage": "[mock] Injected server error"}
+
+        action = self._forced_action(operation)
+        if action is not None:
+            key = f"{operation}:{action}"
+            self.forced_actions[key] = self.forced_actions.get(key, 0) + 1
+            return 200, forced_result(operation, action)
+
+        try:
+            request = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"resultCode": "A001202", "resultMessage": "[mock] The request body is not JSON"}
+        return handler(request)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        status, payload = await self._answer(scope["method"], scope["path"], body)
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": json.dumps(payload).encode()})
+
+    def stats(self) -> dict:
+        return {
+            "calls": dict(sorted(self.calls.items())),
+            "injected_errors": dict(sorted(self.injected_errors.items())),
+            "forced_actions": dict(sorted(self.forced_actions.items())),
+            "state": self.service.stats(),
+        }
+
+
+class MockAuthleteServer:
+    """A `MockAuthlete` served by uvicorn on a daemon thread."""
+
+    def __init__(self, app: MockAuthlete, host: str = "127.0.0.1", port: int = 0):
+        self.app = app
+        self._socket = socket.socket()
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Inherited by accepted connections; without it every call on a
+        # pre-bound socket picked up a ~40 ms delayed-ACK stall.
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.bind((host, port))
+        self.host, self.port = self._socket.getsockname()[:2]
+        self._server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [self._socket]},
+                                        name="mock-authlete", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "MockAuthleteServer":
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("The mock Authlete server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+        self._socket.close()
+
+
+def start_mock_authlete(settings: MockSettings | None = None, host: str = "127.0.0.1", port: int = 0) -> MockAuthleteServer:
+    """Starts a mock on a background thread; port 0 picks a free port."""
+    return MockAuthleteServer(MockAuthlete(settings), host, port).start()
+
+
+def mock_configuration(base_url: str) -> AuthleteConfiguration:
+    return AuthleteConfiguration({
+        "apiVersion": "V3",
+        "baseUrl": base_url,
+        "serviceApiKey": "mock",
+        "serviceAccessToken": "mock-token",
+    })
@@ -0,0 +1,640 @@
+"""
+Mock Authlete service
+---------------------
+In-memory stand-in for the parts of an Authlete service this server uses.
+It keeps just enough state for the compliance flows to behave like the real
+thing: tickets from `/auth/authorization` are consumed by the issue / fail
+calls, codes are exchanged once at `/auth/token`, issued tokens introspect as
+active until they expire or are revoked, and grants created with
+`grant_management_action=create` can be queried and revoked through `/gm`.
+
+Every handler takes the decoded JSON request body (empty for GET operations)
+and returns `(http_status, payload)`; the payload is the JSON the real API
+would return, so the SDK response DTOs parse it unchanged.
+
+Codes and tickets are random opaque strings; ID tokens and entity
+statements are unsigned JWT-shaped strings (`alg: none`). Access tokens are
+opaque too, or, with `jwt_access_tokens`, ES256 JWTs signed with the fixed
+key published at `/service/jwks/get`, like a service configured with an
+access token signing algorithm. Nothing here is meant to be secure: the
+private key is derived from a constant. Each store is capped at
+`max_entries`, dropping its oldest entries, so a long load test cannot grow
+the process without bound.
+
+All state is touched from the mock's event loop only, so it needs no locks.
+"""
+
+import base64
+import hashlib
+import json
+import secrets
+import time
+from dataclasses import dataclass, field
+from functools import cache
+from html import escape
+from urllib.parse import parse_qsl, urlencode
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+
+DEFAULT_CLIENT_NAME = "Mock Client"
+
+# Claims released per scope (OpenID Connect Core §5.4)
+SCOPE_CLAIMS = {
+    "profile": ("name", "family_name", "given_name", "middle_name", "nickname", "preferred_username", "profile",
+                "picture", "website", "gender", "birthdate", "zoneinfo", "locale", "updated_at"),
+    "email": ("email", "email_verified"),
+    "address": ("address",),
+    "phone": ("phone_number", "phone_number_verified"),
+}
+
+SUPPORTED_RESPONSE_TYPES = frozenset({
+    "code", "id_token", "token", "code id_token", "code token", "id_token token", "code id_token token",
+})
+
+# AuthorizationFailReason -> OAuth error code
+FAIL_REASONS = {
+    "DENIED": "access_denied",
+    "NOT_AUTHENTICATED": "login_required",
+    "NOT_LOGGED_IN": "login_required",
+    "CONSENT_REQUIRED": "consent_required",
+    "ACCOUNT_SELECTION_REQUIRED": "account_selection_required",
+    "INTERACTION_REQUIRED": "interaction_required",
+}
+
+# Fixed P-256 signing key for JWT access tokens; the public half is the JWKS
+SIGNING_KID = "mock-authlete-1"
+_P256_ORDER = 0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551
+_SIGNING_KEY = ec.derive_private_key(
+    int.from_bytes(hashlib.sha256(b"mock-authlete-d").digest(), "big") % (_P256_ORDER - 1) + 1, ec.SECP256R1())
+
+
+@cache
+def service_jwks() -> dict:
+    numbers = _SIGNING_KEY.public_key().public_numbers()
+    return {"keys": [{
+        "kty": "EC",
+        "crv": "P-256",
+        "use": "sig",
+        "alg": "ES256",
+        "kid": SIGNING_KID,
+        "x": _b64url(numbers.x.to_bytes(32, "big")),
+        "y": _b64url(numbers.y.to_bytes(32, "big")),
+    }]}
+
+
+def es256_jwt(claims: dict, typ: str = "JWT") -> str:
+    return jwt.encode(claims, _SIGNING_KEY, algorithm="ES256", headers={"typ": typ, "kid": SIGNING_KID})
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def unsigned_jwt(claims: dict, typ: str = "JWT") -> str:
+    header = _b64url(json.dumps({"alg": "none", "typ": typ}, separators=(",", ":")).encode())
+    payload = _b64url(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{header}.{payload}."
+
+
+def _form(parameters: str | None) -> dict[str, str]:
+    return dict(parse_qsl(parameters or "", keep_blank_values=True))
+
+
+def _response_type(value: str) -> str:
+    # "id_token code" and "code id_token" are the same response type
+    parts = value.split()
+    if not set(parts) <= {"code", "id_token", "token"}:
+        return value
+    return " ".join(sorted(parts, key=("code", "id_token", "token").index))
+
+
+def _error(error: str, description: str) -> str:
+    return json.dumps({"error": error, "error_description": description})
+
+
+def _bearer_error(error: str, description: str) -> str:
+    return f'Bearer error="{error}",error_description="{description}"'
+
+
+def result(action: str, content: str | None = None, **fields) -> dict:
+    return {"action": action, "responseContent": content, "resultCode": "A000",
+            "resultMessage": f"[mock] {action}", **fields}
+
+
+class _Store(dict):
+    """dict that forgets its oldest entries beyond `limit`."""
+
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if len(self) > self.limit:
+            del self[next(iter(self))]
+
+
+@dataclass(slots=True)
+class AuthorizationContext:
+    client_id: str
+    redirect_uri: str
+    response_type: str
+    response_mode: str
+    scopes: list[str]
+    state: str | None = None
+    nonce: str | None = None
+    code_challenge: str | None = None
+    code_challenge_method: str | None = None
+    grant_management_action: str | None = None
+    grant_id: str | None = None
+    subject: str | None = None
+    auth_time: int = 0
+    expires_at: float = 0.0
+
+
+@dataclass(slots=True)
+class TokenRecord:
+    client_id: str
+    subject: str | None
+    scopes: list[str]
+    expires_at: float
+    grant_id: str | None = None
+    issued_at: int = 0
+
+
+@dataclass(slots=True)
+class Grant:
+    client_id: str
+    subject: str | None
+    scopes: list[str]
+    tokens: set[str] = field(default_factory=set)
+
+
+class MockAuthleteService:
+    def __init__(self, issuer: str = "http://localhost:8000", clients: dict[str, str | None] | None = None,
+                 max_entries: int = 100_000, access_token_lifetime: int = 3600, code_lifetime: int = 600,
+                 jwt_access_tokens: bool = False):
+        self.issuer = issuer.rstrip("/")
+        self.jwt_access_tokens = jwt_access_tokens
+        # None: every numeric client_id is a registered client with any secret
+        self.clients = dict(clients) if clients is not None else None
+        self.registered: dict[str, str | None] = {}
+        self.access_token_lifetime = access_token_lifetime
+        self.code_lifetime = code_lifetime
+        self.tickets: _Store = _Store(max_entries)
+        self.codes: _Store = _Store(max_entries)
+        self.request_uris: _Store = _Store(max_entries)
+        self.access_tokens: _Store = _Store(max_entries)
+        self.refresh_tokens: _Store = _Store(max_entries)
+        self.grants: _Store = _Store(max_entries)
+        self.handlers = {
+            "/auth/authorization": self.authorization,
+            "/auth/authorization/issue": self.authorization_issue,
+            "/auth/authorization/fail": self.authorization_fail,
+            "/pushed_auth_req": self.pushed_auth_req,
+            "/auth/token": self.token,
+            "/auth/introspection": self.introspection,
+            "/auth/introspection/standard": self.standard_introspection,
+            "/auth/revocation": self.revocation,
+            "/auth/userinfo": self.userinfo,
+            "/auth/userinfo/issue": self.userinfo_issue,
+            "/gm": self.grant_management,
+            "/client/registration": self.client_registration,
+            "/service/configuration": self.service_configuration,
+            "/service/jwks/get": self.service_jwks,
+            "/federation/configuration": self.federation_configuration,
+            "/federation/registration": self.federation_registration,
+            "/vci/metadata": self.credential_issuer_metadata,
+            "/vci/jwtissuer": self.credential_jwt_issuer_metadata,
+            "/vci/single/issue": self.credential_single_issue,
+        }
+
+    # ------------------------------------------------------------------
+    # Clients and tokens
+    # ------------------------------------------------------------------
+
+    def _expected_secret(self, client_id: str | None) -> tuple[bool, str | None]:
+        """(known, secret); a secret of None accepts any (or no) secret."""
+        if not client_id:
+            return False, None
+        if client_id in self.registered:
+            return True, self.registered[client_id]
+        if self.clients is None:
+            return client_id.isdigit(), None
+        return client_id in self.clients, self.clients.get(client_id)
+
+    def _authenticate(self, client_id: str | None, secret: str | None) -> bool:
+        known, expected = self._expected_secret(client_id)
+        return known and (expected is None or secrets.compare_digest(expected, secret or ""))
+
+    def _active(self, token: str | None) -> TokenRecord | None:
+        record = self.access_tokens.get(token) if token else None
+        if record is None:
+            return None
+        if record.expires_at <= time.time():
+            del self.access_tokens[token]
+            return None
+        return record
+
+    def _issue_tokens(self, client_id: str, subject: str | None, scopes: list[str], grant_id: str | None = None,
+                      nonce: str | None = None, auth_time: int = 0, refresh: bool = True) -> tuple[dict, dict]:
+        """Returns (token response JSON, TokenResponse fields)."""
+        now = int(time.time())
+        if self.jwt_access_tokens:
+            claims = {"iss": self.issuer, "sub": subject or client_id, "client_id": client_id, "scope": " ".join(scopes),
+                      "iat": now, "exp": now + self.access_token_lifetime, "jti": secrets.token_urlsafe(16)}
+            access_token = es256_jwt(claims, typ="at+jwt")
+        else:
+            access_token = secrets.token_urlsafe(32)
+        record = TokenRecord(client_id, subject, scopes, now + self.access_token_lifetime, grant_id, now)
+        self.access_tokens[access_token] = record
+        if grant_id is not None and grant_id in self.grants:
+            self.grants[grant_id].tokens.add(access_token)
+
+        content = {"access_token": access_token, "token_type": "Bearer",
+                   "expires_in": self.access_token_lifetime, "scope": " ".join(scopes)}
+        fields = {"accessToken": access_token, "accessTokenDuration": self.access_token_lifetime,
+                  "accessTokenExpiresAt": record.expires_at * 1000, "clientId": client_id,
+                  "subject": subject, "scopes": scopes, "grantId": grant_id}
+        if refresh and subject is not None:
+            refresh_token = secrets.token_urlsafe(32)
+            self.refresh_tokens[refresh_token] = record
+            content["refresh_token"] = fields["refreshToken"] = refresh_token
+        if "openid" in scopes and subject is not None:
+            content["id_token"] = fields["idToken"] = self._id_token(client_id, subject, nonce, auth_time)
+        if grant_id is not None:
+            content["grant_id"] = grant_id
+        return content, fields
+
+    def _id_token(self, client_id: str, subject: str, nonce: str | None, auth_time: int) -> str:
+        now = int(time.time())
+        claims = {"iss": self.issuer, "sub": subject, "aud": client_id, "iat": now, "exp": now + 3600}
+        if auth_time:
+            claims["auth_time"] = auth_time
+        if nonce:
+            claims["nonce"] = nonce
+        return unsigned_jwt(claims)
+
+    # ------------------------------------------------------------------
+    # Authorization endpoint
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _redirect(context: AuthorizationContext, params: dict) -> tuple[str, str]:
+        """(action, responseContent) sending `params` back to the client."""
+        if context.state is not None:
+            params = {**params, "state": context.state}
+        if context.response_mode == "form_post":
+            inputs = "".join(f'<input type="hidden" name="{escape(k)}" value="{escape(v)}"/>' for k, v in params.items())
+            return "FORM", (
+                '<!DOCTYPE html><html><head><title>Submit This Form</title></head>'
+                '<body onload="javascript:document.forms[0].submit()">'
+                f'<form method="post" action="{escape(context.redirect_uri)}">{inputs}</form></body></html>')
+        separator = "#" if context.response_mode == "fragment" else ("&" if "?" in context.redirect_uri else "?")
+        return "LOCATION", context.redirect_uri + separator + urlencode(params)
+
+    def authorization(self, request: dict) -> tuple[int, dict]:
+        params = _form(request.get("parameters"))
+        if "request_uri" in params:
+            pushed = self.request_uris.pop(params["request_uri"], None)
+            if pushed is None or pushed.get("client_id") != params.get("client_id"):
+                return 200, result("BAD_REQUEST", _error("invalid_request_uri", "[mock] Unknown request_uri."))
+            params = pushed
+
+        client_id = params.get("client_id")
+        if not self._expected_secret(client_id)[0]:
+            return 200, result("BAD_REQUEST", _error("invalid_client", "[mock] Unknown client_id."))
+        redirect_uri = params.get("redirect_uri")
+        if not redirect_uri:
+            return 200, result("BAD_REQUEST", _error("invalid_request", "[mock] redirect_uri is required."))
+
+        response_type = _response_type(params.get("response_type", ""))
+        default_mode = "query" if response_type == "code" else "fragment"
+        context = AuthorizationContext(
+            client_id=client_id,
+            redirect_uri=redirect_uri,
+            response_type=response_type,
+            response_mode=params.get("response_mode") or default_mode,
+            scopes=params.get("scope", "").split(),
+            state=params.get("state"),
+            nonce=params.get("nonce"),
+            code_challenge=params.get("code_challenge"),
+            code_challenge_method=params.get("code_challenge_method"),
+            grant_management_action=params.get("grant_management_action"),
+            grant_id=params.get("grant_id"),
+        )
+        if response_type not in SUPPORTED_RESPONSE_TYPES:
+            action, content = self._redirect(context, {"error": "unsupported_response_type"})
+            return 200, result(action, content)
+        if "id_token" in response_type and not context.nonce:
+            action, content = self._redirect(context, {"error": "invalid_request", "error_description": "nonce is required"})
+            return 200, result(action, content)
+        if params.get("prompt") == "none":
+            action, content = self._redirect(context, {"error": "login_required"})
+            return 200, result("NO_INTERACTION", content)
+
+        ticket = secrets.token_urlsafe(24)
+        context.expires_at = time.time() + self.code_lifetime
+        self.tickets[ticket] = context
+        return 200, result(
+            "INTERACTION", None, ticket=ticket,
+            client={"clientId": int(client_id) if client_id.isdigit() else 0, "clientName": DEFAULT_CLIENT_NAME},
+            scopes=[{"name": scope} for scope in context.scopes],
+            responseMode=context.response_mode.upper(),
+        )
+
+    def _take_ticket(self, request: dict) -> AuthorizationContext | None:
+        context = self.tickets.pop(request.get("ticket"), None)
+        if context is None or context.expires_at <= time.time():
+            return None
+        return context
+
+    def authorization_issue(self, request: dict) -> tuple[int, dict]:
+        context = self._take_ticket(request)
+        if context is None:
+            return 200, result("BAD_REQUEST", _error("invalid_request", "[mock] Unknown or expired ticket."))
+        context.subject = request.get("subject")
+        context.auth_time = request.get("authTime") or int(time.time())
+
+        if context.grant_management_action == "create":
+            context.grant_id = secrets.token_urlsafe(16)
+            self.grants[context.grant_id] = Grant(context.client_id, context.subject, context.scopes)
+
+        params = {}
+        response_types = context.response_type.split()
+        if "code" in response_types:
+            code = secrets.token_urlsafe(24)
+            context.expires_at = time.time() + self.code_lifetime
+            self.codes[code] = context
+            params["code"] = code
+        if "token" in response_types:
+            token_content, _ = self._issue_tokens(context.client_id, context.subject, context.scopes,
+                                                  context.grant_id, refresh=False)
+            params.update(access_token=token_content["access_token"], token_type="Bearer",
+                          expires_in=str(self.access_token_lifetime))
+        if "id_token" in response_types:
+            params["id_token"] = self._id_token(context.client_id, context.subject, context.nonce, context.auth_time)
+        action, content = self._redirect(context, params)
+        return 200, result(action, content)
+
+    def authorization_fail(self, request: dict) -> tuple[int, dict]:
+        context = self._take_ticket(request)
+        if context is None:
+            return 200, result("BAD_REQUEST", _error("invalid_request", "[mock] Unknown or expired ticket."))
+        action, content = self._redirect(context, {"error": FAIL_REASONS.get(request.get("reason"), "access_denied")})
+        return 200, result(action, content)
+
+    def pushed_auth_req(self, request: dict) -> tuple[int, dict]:
+        params = _form(request.get("parameters"))
+        client_id = request.get("clientId") or params.get("client_id")
+        if not self._authenticate(client_id, request.get("clientSecret") or params.get("client_secret")):
+            return 200, result("UNAUTHORIZED", _error("invalid_client", "[mock] Client authentication failed."))
+        if not params.get("response_type") or not params.get("redirect_uri"):
+            return 200, result("BAD_REQUEST", _error("invalid_request", "[mock] response_type and redirect_uri are required."))
+        params["client_id"] = client_id
+        params.pop("client_secret", None)
+        request_uri = "urn:ietf:params:oauth:request_uri:" + secrets.token_urlsafe(24)
+        self.request_uris[request_uri] = params
+        return 200, result("CREATED", json.dumps({"expires_in": 600, "request_uri": request_uri}),
+                           requestUri=request_uri)
+
+    # ------------------------------------------------------------------
+    # Token, introspection, revocation
+    # ------------------------------------------------------------------
+
+    def token(self, request: dict) -> tuple[int, dict]:
+        params = _form(request.get("parameters"))
+        grant_type = params.get("grant_type")
+        if grant_type == "password":
+            return 200, result("PASSWORD", _error("unsupported_grant_type", "[mock] Password grant."))
+        if grant_type == "urn:ietf:params:oauth:grant-type:token-exchange":
+            return 200, result("TOKEN_EXCHANGE", None)
+        if grant_type == "urn:ietf:params:oauth:grant-type:jwt-bearer":
+            return 200, result("JWT_BEARER", None)
+
+        client_id = request.get("clientId") or params.get("client_id")
+        if not self._authenticate(client_id, request.get("clientSecret") or params.get("client_secret")):
+            return 200, result("INVALID_CLIENT", _error("invalid_client", "[mock] Client authentication failed."))
+
+        if grant_type == "authorization_code":
+            context = self.codes.pop(params.get("code"), None)
+            if (context is None or context.expires_at <= time.time() or context.client_id != client_id
+                    or params.get("redirect_uri", context.redirect_uri) != context.redirect_uri):
+                return 200, result("BAD_REQUEST", _error("invalid_grant", "[mock] Invalid authorization code."))
+            if context.code_challenge and not self._pkce_ok(context, params.get("code_verifier")):
+                return 200, result("BAD_REQUEST", _error("invalid_grant", "[mock] PKCE verification failed."))
+            content, fields = self._issue_tokens(client_id, context.subject, context.scopes, context.grant_id,
+                                                 context.nonce, context.auth_time)
+        elif grant_type == "refresh_token":
+            previous = self.refresh_tokens.pop(params.get("refresh_token"), None)
+            if previous is None or previous.client_id != client_id:
+                return 200, result("BAD_REQUEST", _error("invalid_grant", "[mock] Invalid refresh token."))
+            content, fields = self._issue_tokens(client_id, previous.subject, previous.scopes, previous.grant_id)
+        elif grant_type == "client_credentials":
+            content, fields = self._issue_tokens(client_id, None, params.get("scope", "").split(), refresh=False)
+        else:
+            return 200, result("BAD_REQUEST", _error("unsupported_grant_type", "[mock] Unsupported grant_type."))
+        return 200, result("OK", json.dumps(content), grantType=grant_type.upper(), **fields)
+
+    @staticmethod
+    def _pkce_ok(context: AuthorizationContext, verifier: str | None) -> bool:
+        if not verifier:
+            return False
+        if context.code_challenge_method == "S256":
+            return _b64url(hashlib.sha256(verifier.encode()).digest()) == context.code_challenge
+        return verifier == context.code_challenge
+
+    def standard_introspection(self, request: dict) -> tuple[int, dict]:
+        params = _form(request.get("parameters"))
+        token = params.get("token")
+        if not token:
+            return 200, result("BAD_REQUEST", _error("invalid_request", "[mock] token is required."))
+        record = self._active(token)
+        if record is None:
+            return 200, result("OK", '{"active":false}')
+        content = {"active": True, "client_id": record.client_id, "scope": " ".join(record.scopes),
+                   "token_type": "Bearer", "exp": int(record.expires_at), "iat": record.issued_at,
+                   "iss": self.issuer}
+        if record.subject is not None:
+            content["sub"] = record.subject
+        if record.grant_id is not None:
+            content["grant_id"] = record.grant_id
+        return 200, result("OK", json.dumps(content))
+
+    def introspection(self, request: dict) -> tuple[int, dict]:
+        record = self._active(request.get("token"))
+        if record is None:
+            return 200, result("UNAUTHORIZED", _bearer_error("invalid_token", "[mock] The access token is not active."))
+        required = request.get("scopes") or []
+        if not set(required) <= set(record.scopes):
+            return 200, result("FORBIDDEN", _bearer_error("insufficient_scope", "[mock] Missing scopes."))
+        return 200, result("OK", None, clientId=int(record.client_id) if record.client_id.isdigit() else 0,
+                           subject=record.subject, scopes=record.scopes, expiresAt=int(record.expires_at * 1000),
+                           usable=True, sufficient=True, grantId=record.grant_id)
+
+    def revocation(self, request: dict) -> tuple[int, dict]:
+        params = _form(request.get("parameters"))
+        client_id = request.get("clientId") or params.get("client_id")
+        if not self._authenticate(client_id, request.get("clientSecret") or params.get("client_secret")):
+            return 200, result("INVALID_CLIENT", _error("invalid_client", "[mock] Client authentication failed."))
+        token = params.get("token")
+        if not token:
+            return 200, result("BAD_REQUEST", _error("invalid_request", "[mock] token is required."))
+        # RFC 7009 §2.2: unknown tokens are not an error
+        for store in (self.access_tokens, self.refresh_tokens):
+            record = store.get(token)
+            if record is not None and record.client_id == client_id:
+                del store[token]
+        return 200, result("OK", "")
+
+    # ------------------------------------------------------------------
+    # UserInfo
+    # ------------------------------------------------------------------
+
+    def _userinfo_record(self, token: str | None) -> tuple[TokenRecord | None, dict | None]:
+        record = self._active(token)
+        if record is None:
+            return None, result("UNAUTHORIZED", _bearer_error("invalid_token", "[mock] The access token is not active."))
+        if "openid" not in record.scopes or record.subject is None:
+            return None, result("FORBIDDEN", _bearer_error("insufficient_scope", "[mock] The openid scope is required."))
+        return record, None
+
+    def userinfo(self, request: dict) -> tuple[int, dict]:
+        record, error = self._userinfo_record(request.get("token"))
+        if error is not None:
+            return 200, error
+        claims = [claim for scope in record.scopes for claim in SCOPE_CLAIMS.get(scope, ())]
+        return 200, result("OK", None, subject=record.subject, clientId=int(record.client_id) if record.client_id.isdigit() else 0,
+                           scopes=record.scopes, claims=claims, token=request.get("token"))
+
+    def userinfo_issue(self, request: dict) -> tuple[int, dict]:
+        record, error = self._userinfo_record(request.get("token"))
+        if error is not None:
+            return 200, error
+        try:
+            claims = json.loads(request.get("claims") or "{}")
+        except ValueError:
+            claims = {}
+        return 200, result("JSON", json.dumps({**claims, "sub": record.subject}))
+
+    # ------------------------------------------------------------------
+    # Grant management and client registration
+    # ------------------------------------------------------------------
+
+    def grant_management(self, request: dict) -> tuple[int, dict]:
+        record = self._active(request.get("accessToken"))
+        if record is None:
+            return 200, result("UNAUTHORIZED", _error("invalid_token", "[mock] The access token is not active."))
+        gm_action = request.get("gmAction")
+        required = "grant_management_query" if gm_action == "QUERY" else "grant_management_revoke"
+        if required not in record.scopes:
+            return 200, result("FORBIDDEN", _error("insufficient_scope", f"[mock] The {required} scope is required."))
+        grant_id = request.get("grantId")
+        grant = self.grants.get(grant_id)
+        if grant is None or grant.client_id != record.client_id:
+            return 200, result("NOT_FOUND", _error("invalid_grant_id", "[mock] Unknown grant."))
+
+        if gm_action == "QUERY":
+            return 200, result("OK", json.dumps({"scopes": [{"scope": " ".join(grant.scopes)}]}))
+        del self.grants[grant_id]
+        for token in grant.tokens:
+            self.access_tokens.pop(token, None)
+        return 200, result("NO_CONTENT", None)
+
+    def client_registration(self, request: dict) -> tuple[int, dict]:
+        try:
+            metadata = json.loads(request.get("json") or "")
+        except ValueError:
+            metadata = None
+        if not isinstance(metadata, dict):
+            return 200, result("BAD_REQUEST", _error("invalid_client_metadata", "[mock] The body is not a JSON object."))
+        if not metadata.get("redirect_uris"):
+            return 200, result("BAD_REQUEST", _error("invalid_redirect_uri", "[mock] redirect_uris is required."))
+        client_id = str(10_000_000 + len(self.registered))
+        client_secret = secrets.token_urlsafe(32)
+        self.registered[client_id] = client_secret
+        content = {**metadata, "client_id": client_id, "client_secret": client_secret,
+                   "client_id_issued_at": int(time.time()), "client_secret_expires_at": 0}
+        return 200, result("CREATED", json.dumps(content))
+
+    # ------------------------------------------------------------------
+    # Metadata, federation and verifiable credentials
+    # ------------------------------------------------------------------
+
+    def service_configuration(self, request: dict) -> tuple[int, dict]:
+        issuer = self.issuer
+        return 200, {
+            "issuer": issuer,
+            "authorization_endpoint": f"{issuer}/api/authorization",
+            "token_endpoint": f"{issuer}/api/token",
+            "userinfo_endpoint": f"{issuer}/api/userinfo",
+            "jwks_uri": f"{issuer}/api/jwks",
+            "registration_endpoint": f"{issuer}/api/register",
+            "introspection_endpoint": f"{issuer}/api/introspection",
+            "revocation_endpoint": f"{issuer}/api/revocation",
+            "pushed_authorization_request_endpoint": f"{issuer}/api/par",
+            "grant_management_endpoint": f"{issuer}/api/gm",
+            "scopes_supported": ["openid", "profile", "email", "address", "phone",
+                                 "grant_management_query", "grant_management_revoke"],
+            "response_types_supported": sorted(SUPPORTED_RESPONSE_TYPES),
+            "response_modes_supported": ["query", "fragment", "form_post"],
+            "grant_types_supported": ["authorization_code", "refresh_token", "client_credentials"],
+            "subject_types_supported": ["public"],
+            "id_token_signing_alg_values_supported": ["ES256"],
+            "token_endpoint_auth_methods_supported": ["client_secret_basic", "client_secret_post"],
+            "code_challenge_methods_supported": ["plain", "S256"],
+            "grant_management_actions_supported": ["create", "update", "replace"],
+            "claims_supported": ["sub", *sorted({claim for claims in SCOPE_CLAIMS.values() for claim in claims})],
+        }
+
+    def service_jwks(self, request: dict) -> tuple[int, dict]:
+        return 200, service_jwks()
+
+    def federation_configuration(self, request: dict) -> tuple[int, dict]:
+        now = int(time.time())
+        statement = unsigned_jwt({"iss": self.issuer, "sub": self.issuer, "iat": now, "exp": now + 86400,
+                                  "jwks": service_jwks(), "metadata": {"openid_provider": {"issuer": self.issuer}}},
+                                 typ="entity-statement+jwt")
+        return 200, result("OK", statement)
+
+    def federation_registration(self, request: dict) -> tuple[int, dict]:
+        # No trust anchors are configured, so no trust chain can be resolved
+        return 200, result("BAD_REQUEST", _error("invalid_request", "[mock] The trust chain could not be resolved."))
+
+    def credential_issuer_metadata(self, request: dict) -> tuple[int, dict]:
+        return 200, result("OK", json.dumps({
+            "credential_issuer": self.issuer,
+            "authorization_servers": [self.issuer],
+            "credential_endpoint": f"{self.issuer}/api/credential",
+            "credential_configurations_supported": {
+                "IdentityCredential": {
+                    "format": "jwt_vc_json",
+                    "scope": "identity_credential",
+                    "credential_definition": {"type": ["VerifiableCredential", "IdentityCredential"]},
+                },
+            },
+        }))
+
+    def credential_jwt_issuer_metadata(self, request: dict) -> tuple[int, dict]:
+        return 200, result("OK", json.dumps({"issuer": self.issuer, "jwks_uri": f"{self.issuer}/api/jwks"}))
+
+    def credential_single_issue(self, request: dict) -> tuple[int, dict]:
+        record = self._active(request.get("accessToken"))
+        if record is None:
+            return 200, result("UNAUTHORIZED", _bearer_error("invalid_token", "[mock] The access token is not active."))
+        now = int(time.time())
+        credential = unsigned_jwt({"iss": self.issuer, "sub": record.subject, "iat": now,
+                                   "vc": {"type": ["VerifiableCredential", "IdentityCredential"]}})
+        return 200, result("OK", json.dumps({"credential": credential}))
+
+    def stats(self) -> dict:
+        return {
+            "tickets": len(self.tickets),
+            "codes": len(self.codes),
+            "request_uris": len(self.request_uris),
+            "access_tokens": len(self.access_tokens),
+            "refresh_tokens": len(self.refresh_tokens),
+            "grants": len(self.grants),
+            "registered_clients": len(self.registered),
+        }
@@ -0,0 +1,87 @@
+"""
+Mock Authlete settings
+----------------------
+Read from the environment (`MockSettings.from_env`) or built directly in
+benchmarks and tests. Operations are the API paths without the service
+prefix, as in authlete_client/resilience.py (`/auth/token`, `/gm`...).
+
+    AUTHLETE_MOCK_LATENCY      base latency of every call, seconds (0)
+    AUTHLETE_MOCK_LATENCIES    per operation, e.g. "/auth/token=0.05,/gm=0.2"
+    AUTHLETE_MOCK_JITTER       mean of an exponential extra delay, seconds (0)
+    AUTHLETE_MOCK_ERROR_RATE   fraction of calls answered with HTTP 500 (0)
+    AUTHLETE_MOCK_ERROR_RATES  per operation, e.g. "/auth/userinfo=0.1"
+    AUTHLETE_MOCK_ACTIONS      forced actions, e.g. "/auth/token:INVALID_CLIENT=0.05";
+                               the remaining calls get the normal answer
+    AUTHLETE_MOCK_CLIENTS      "client_id:secret,..." (default: every numeric
+                               client_id is registered, with any secret)
+    AUTHLETE_MOCK_ISSUER       issuer of the served metadata (http://localhost:8000)
+    AUTHLETE_MOCK_JWT_ACCESS_TOKENS  "true": ES256 JWT access tokens instead of opaque ones
+    AUTHLETE_MOCK_SEED         seed for latency, error and action draws
+    AUTHLETE_MOCK_PORT         port of the mock the server starts itself when
+                               AUTHLETE_MOCK=true (0: any free port)
+"""
+
+import os
+from dataclasses import dataclass, field
+
+
+def _parse_mapping(spec: str, convert) -> dict:
+    mapping = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        mapping[name.strip()] = convert(value)
+    return mapping
+
+
+def parse_actions(spec: str) -> dict[str, dict[str, float]]:
+    """"/auth/token:INVALID_CLIENT=0.05,/auth/token:BAD_REQUEST=0.01" -> {"/auth/token": {...}}"""
+    actions: dict[str, dict[str, float]] = {}
+    for key, probability in _parse_mapping(spec, float).items():
+        operation, _, action = key.rpartition(":")
+        if not operation or not action:
+            raise ValueError(f"Expected operation:ACTION=probability, got {key!r}")
+        actions.setdefault(operation, {})[action.upper()] = probability
+    for operation, weights in actions.items():
+        if sum(weights.values()) > 1.0:
+            raise ValueError(f"Forced action probabilities for {operation} add up to more than 1")
+    return actions
+
+
+def parse_clients(spec: str) -> dict[str, str | None] | None:
+    if not spec.strip():
+        return None
+    clients = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        client_id, _, secret = item.partition(":")
+        clients[client_id] = secret or None
+    return clients
+
+
+@dataclass(frozen=True)
+class MockSettings:
+    latency: float = 0.0
+    latencies: dict[str, float] = field(default_factory=dict)
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_rates: dict[str, float] = field(default_factory=dict)
+    actions: dict[str, dict[str, float]] = field(default_factory=dict)
+    clients: dict[str, str | None] | None = None
+    issuer: str = "http://localhost:8000"
+    jwt_access_tokens: bool = False
+    seed: int | None = None
+
+    @classmethod
+    def from_env(cls) -> "MockSettings":
+        seed = os.getenv("AUTHLETE_MOCK_SEED")
+        return cls(
+            latency=float(os.getenv("AUTHLETE_MOCK_LATENCY", 0)),
+            latencies=_parse_mapping(os.getenv("AUTHLETE_MOCK_LATENCIES", ""), float),
+            jitter=float(os.getenv("AUTHLETE_MOCK_JITTER", 0)),
+            error_rate=float(os.getenv("AUTHLETE_MOCK_ERROR_RATE", 0)),
+            error_rates=_parse_mapping(os.getenv("AUTHLETE_MOCK_ERROR_RATES", ""), float),
+            actions=parse_actions(os.getenv("AUTHLETE_MOCK_ACTIONS", "")),
+            clients=parse_clients(os.getenv("AUTHLETE_MOCK_CLIENTS", "")),
+            issuer=os.getenv("AUTHLETE_MOCK_ISSUER", cls.issuer),
+            jwt_access_tokens=os.getenv("AUTHLETE_MOCK_JWT_ACCESS_TOKENS", "false").strip().lower() in ("1", "true", "yes", "on"),
+            seed=int(seed) if seed else None,
+        )
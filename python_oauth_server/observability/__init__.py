@@ -0,0 +1,30 @@
+from observability.log import (
+    LoggingSetup,
+    StructuredLogger,
+    configure_logging,
+    get_logger,
+    get_logging_setup,
+    redact,
+)
+from observability.metrics import REGISTRY, Counter, Gauge, Histogram, MetricsRegistry, instrument_routes
+from observability.tracing import Tracer, get_tracer, set_tracer, start_span, trace_routes
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "LoggingSetup",
+    "MetricsRegistry",
+    "REGISTRY",
+    "StructuredLogger",
+    "Tracer",
+    "configure_logging",
+    "get_logger",
+    "get_logging_setup",
+    "get_tracer",
+    "instrument_routes",
+    "redact",
+    "set_tracer",
+    "start_span",
+    "trace_routes",
+]
@@ -0,0 +1,276 @@
+"""
+Structured, non-blocking logging
+--------------------------------
+Request handlers must never wait on stdout. `configure_logging()` installs a
+`QueueHandler` on the root logger: the calling coroutine only checks the level
+and appends the record to a bounded in-memory queue, and a `QueueListener`
+thread does the formatting (JSON by default) and the write. If the queue is
+full the record is dropped and counted rather than blocking the event loop.
+
+Routers log through `get_logger(__name__)`, which returns a
+`StructuredLogger` for `oauth.endpoint.<endpoint>`, the endpoint being the
+router module's name (`api.token` -> `token`):
+
+    log = get_logger(__name__)
+    log.debug("authorization.response", action=res.action, ticket=res.ticket,
+              claims=lambda: expensive_summary(res))
+
+Field values that are callables are only called when the level is enabled,
+and nothing is serialized on the request path. Sensitive fields (tickets,
+tokens, codes, secrets, passwords, Authorization headers) are replaced by a
+short fingerprint, so related log lines can still be correlated:
+
+    "ticket": "redacted:3f9a1c2e"
+
+    LOG_LEVEL        root level (INFO); below DEBUG the httpx/httpcore loggers,
+                     which log every Authlete call, are kept at WARNING
+    LOG_LEVELS       per-endpoint levels, e.g. "authorization=DEBUG,token=WARNING";
+                     an entry with an unknown level is skipped with a warning
+    LOG_FORMAT       "json" (default) or "text"
+    LOG_QUEUE_SIZE   records buffered before new ones are dropped (10000)
+"""
+
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+
+from fastapi import Request
+
+ENDPOINT_LOGGER_PREFIX = "oauth.endpoint."
+
+# One INFO line per outbound HTTP request is noise (and a cost) on every call
+QUIET_LOGGERS = ("httpx", "httpcore")
+
+SENSITIVE_FIELDS = frozenset({
+    "access_token", "authorization", "client_secret", "code", "code_verifier",
+    "password", "refresh_token", "secret", "ticket", "token",
+})
+
+# key=value pairs and Authorization header values inside free-text messages
+_SENSITIVE_TEXT = re.compile(
+    r"(?i)\b(access_token|refresh_token|client_secret|code_verifier|password|ticket|token|code)=([^&\s\"']+)"
+    r"|\b(Bearer|Basic|DPoP)\s+([A-Za-z0-9\-._~+/]+=*)"
+)
+
+# LogRecord attributes that are not user fields
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "fields"}
+
+
+def fingerprint(value) -> str:
+    digest = hashlib.sha256(str(value).encode("utf-8")).hexdigest()
+    return "redacted:" + digest[:8]
+
+
+def redact(fields: dict) -> dict:
+    redacted = {}
+    for key, value in fields.items():
+        if value is not None and key.lower() in SENSITIVE_FIELDS:
+            redacted[key] = fingerprint(value)
+        elif isinstance(value, dict):
+            redacted[key] = redact(value)
+        else:
+            redacted[key] = value
+    return redacted
+
+
+def redact_text(text: str) -> str:
+    def replace(match):
+        if match.group(1):
+            return f"{match.group(1)}={fingerprint(match.group(2))}"
+        return f"{match.group(3)} {fingerprint(match.group(4))}"
+    return _SENSITIVE_TEXT.sub(replace, text)
+
+
+def _jsonable(value):
+    name = getattr(value, "name", None)
+    # Enum members (Authlete actions) log as their name
+    return name if isinstance(name, str) else str(value)
+
+
+def _text(value) -> str:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return str(value)
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, default=_jsonable, separators=(",", ":"))
+    return _jsonable(value)
+
+
+class StructuredFormatter(logging.Formatter):
+    """Runs on the listener thread: redacts and serializes one record."""
+
+    def __init__(self, fmt: str = "json"):
+        super().__init__()
+        self.fmt = fmt
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", None) or {}
+        extra = {k: v for k, v in vars(record).items() if k not in _RESERVED}
+        if extra:
+            fields = {**extra, **fields}
+        fields = redact(fields)
+        message = redact_text(record.getMessage())
+
+        if self.fmt == "text":
+            text = f"{self.formatTime(record)} {record.levelname:<7} {record.name}: {message}"
+            if fields:
+                text += " " + " ".join(f"{k}={_text(v)}" for k, v in fields.items())
+        else:
+            entry = {
+                "ts": round(record.created, 6),
+                "level": record.levelname,
+                "logger": record.name,
+                "event": message,
+            }
+            entry.update(fields)
+            text = json.dumps(entry, default=_jsonable, separators=(",", ":"))
+
+        if record.exc_info:
+            exc_text = self.formatException(record.exc_info)
+            if self.fmt == "text":
+                text += "\n" + exc_text
+            else:
+                text = text[:-1] + ',"exc":' + json.dumps(exc_text) + "}"
+        return text
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks and never formats on the caller's thread."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The default implementation formats here, on the request path. The
+        # queue stays in-process, so the record can be handed over as is.
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredLogger:
+    __slots__ = ("logger",)
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    # Each level method checks the level itself, so a disabled call costs one
+    # method call and an isEnabledFor() lookup.
+    def debug(self, event: str, /, **fields):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self._emit(logging.DEBUG, event, fields)
+
+    def info(self, event: str, /, **fields):
+        if self.logger.isEnabledFor(logging.INFO):
+            self._emit(logging.INFO, event, fields)
+
+    def warning(self, event: str, /, exc_info: bool = False, **fields):
+        if self.logger.isEnabledFor(logging.WARNING):
+            self._emit(logging.WARNING, event, fields, sys.exc_info() if exc_info else None)
+
+    def error(self, event: str, /, **fields):
+        if self.logger.isEnabledFor(logging.ERROR):
+            self._emit(logging.ERROR, event, fields)
+
+    def exception(self, event: str, /, **fields):
+        if self.logger.isEnabledFor(logging.ERROR):
+            self._emit(logging.ERROR, event, fields, sys.exc_info())
+
+    def _emit(self, level: int, event: str, fields: dict, exc_info=None):
+        for key, value in fields.items():
+            if callable(value):
+                fields[key] = value()
+        # makeRecord() + handle() rather than _log(): skips the stack walk
+        # that findCaller() does for every record.
+        record = self.logger.makeRecord(self.logger.name, level, "", 0, event, (), exc_info, extra={"fields": fields})
+        self.logger.handle(record)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """The logger of an endpoint, by name or by its router's `__name__`."""
+    return StructuredLogger(logging.getLogger(ENDPOINT_LOGGER_PREFIX + name.rpartition(".")[2]))
+
+
+def parse_level(name: str) -> int | None:
+    """A level number for a name such as "debug" or "WARNING", or None."""
+    return logging.getLevelNamesMapping().get(name.strip().upper())
+
+
+def parse_levels(spec: str) -> dict[str, int]:
+    """LOG_LEVELS as {endpoint: level}; malformed entries are skipped with a warning."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level_name = item.partition("=")
+        level = parse_level(level_name)
+        if not name.strip() or level is None:
+            logging.getLogger(__name__).warning(
+                "Ignoring LOG_LEVELS entry %r: expected <endpoint>=<level>, the level one of %s",
+                item, ", ".join(sorted(logging.getLevelNamesMapping())))
+            continue
+        levels[name.strip()] = level
+    return levels
+
+
+class LoggingSetup:
+    """Handle returned by configure_logging(); stop() flushes and restores."""
+
+    def __init__(self, handler: DroppingQueueHandler, listener: logging.handlers.QueueListener, previous: list):
+        self.handler = handler
+        self.listener = listener
+        self._previous = previous
+
+    def stats(self) -> dict:
+        return {"queued": self.handler.queue.qsize(), "dropped": self.handler.dropped}
+
+    def stop(self):
+        root = logging.getLogger()
+        root.removeHandler(self.handler)
+        for handler in self._previous:
+            root.addHandler(handler)
+        self.listener.stop()
+
+
+def configure_logging(stream=None) -> LoggingSetup:
+    fmt = os.getenv("LOG_FORMAT", "json").strip().lower()
+    log_queue = queue.Queue(int(os.getenv("LOG_QUEUE_SIZE", 10000)))
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(StructuredFormatter(fmt))
+    handler = DroppingQueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+
+    root = logging.getLogger()
+    previous = list(root.handlers)
+    for existing in previous:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root_level = parse_level(os.getenv("LOG_LEVEL", "INFO"))
+    root.setLevel(logging.INFO if root_level is None else root_level)
+    if root_level is None:
+        logging.getLogger(__name__).warning("Ignoring LOG_LEVEL %r; using INFO", os.getenv("LOG_LEVEL"))
+    quiet_level = logging.NOTSET if root.level <= logging.DEBUG else logging.WARNING
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(quiet_level)
+
+    for endpoint, level in parse_levels(os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(ENDPOINT_LOGGER_PREFIX + endpoint).setLevel(level)
+
+    listener.start()
+    return LoggingSetup(handler, listener, previous)
+
+
+def get_logging_setup(request: Request) -> LoggingSetup:
+    """FastAPI dependency returning the running logging setup."""
+    return request.app.state.logging
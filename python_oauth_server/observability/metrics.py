@@ -0,0 +1,277 @@
+"""
+Prometheus metrics
+------------------
+A small, dependency-free implementation of the Prometheus counter, gauge and
+histogram types, rendered in the text exposition format on `GET /metrics`.
+
+Two things are measured, so a slow request can be split into our own time and
+the Authlete round-trip:
+
+    oauth_http_request_duration_seconds{route,method,status}   histogram
+    oauth_http_requests_in_flight{route}                       gauge
+    authlete_api_call_duration_seconds{operation,action}       histogram
+    authlete_api_calls_in_flight{operation}                    gauge
+
+(the `_count` series of each histogram is the request / call counter).
+
+Recording is kept to a few microseconds: `instrument_routes()` wraps every
+route's ASGI app once at startup with an object that already holds its label
+children, so a request does one dict lookup for its (method, status) child and
+a bisect over the bucket bounds. No label tuple is built or hashed against the
+whole metric on the request path. Metrics are only updated from the event
+loop, so the children need no locks.
+"""
+
+import math
+import time
+from bisect import bisect_left
+
+from fastapi import FastAPI
+from starlette.routing import Route
+
+# Prometheus' default buckets, with finer resolution below 5 ms for the
+# purely local endpoints (cached metadata, introspection cache hits).
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        # Non-cumulative per bucket (the last one is +Inf); summed on render
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _Metric:
+    type_name = ""
+    child_class = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        return self.child_class()
+
+    def labels(self, *values: str):
+        """Returns the child for these label values; callers keep it to skip the lookup."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for values, child in self._children.items():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> list[str]:
+        return [f"{self.name}{_labels(self.labelnames, values)} {_number(child.value)}"]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+    child_class = _CounterChild
+
+    def _render_child(self, values, child) -> list[str]:
+        return [f"{self.name}_total{_labels(self.labelnames, values)} {_number(child.value)}"]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+    child_class = _GaugeChild
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(float(b) for b in buckets if b != math.inf))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def _render_child(self, values, child) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (math.inf,), child.counts):
+            cumulative += count
+            le = 'le="' + _number(bound) + '"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}")
+        labels = _labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {repr(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "oauth_http_request_duration_seconds", "Time spent handling a request, by route and final status.",
+    ("route", "method", "status"))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "oauth_http_requests_in_flight", "Requests currently being handled, by route.", ("route",))
+AUTHLETE_CALL_SECONDS = REGISTRY.histogram(
+    "authlete_api_call_duration_seconds", "Authlete API round-trip time, by operation and returned action.",
+    ("operation", "action"))
+AUTHLETE_CALLS_IN_FLIGHT = REGISTRY.gauge(
+    "authlete_api_calls_in_flight", "Authlete API calls currently waiting for a response, by operation.",
+    ("operation",))
+
+
+# ----------------------------------------------------------------------
+# Routes
+# ----------------------------------------------------------------------
+
+class InstrumentedRoute:
+    """ASGI wrapper around one route's app, holding that route's label children."""
+
+    def __init__(self, app, route: str):
+        self.app = app
+        self.route = route
+        self.in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(route)
+        self._durations = {}
+
+    def _duration(self, method: str, status: int) -> _HistogramChild:
+        child = self._durations.get((method, status))
+        if child is None:
+            child = self._durations[(method, status)] = HTTP_REQUEST_SECONDS.labels(self.route, method, str(status))
+        return child
+
+    async def __call__(self, scope, receive, send):
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight.value += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.in_flight.value -= 1
+            self._duration(scope["method"], status).observe(time.perf_counter() - started)
+
+
+def instrument_routes(app: FastAPI):
+    """Wraps every HTTP route of `app` (call once, after the routers are included)."""
+    for route in app.routes:
+        if isinstance(route, Route) and not isinstance(route.app, InstrumentedRoute):
+            route.app = InstrumentedRoute(route.app, route.path)
+
+
+# ----------------------------------------------------------------------
+# Authlete API calls
+# ----------------------------------------------------------------------
+
+class AuthleteOperationMetrics:
+    __slots__ = ("operation", "in_flight", "_durations")
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.in_flight = AUTHLETE_CALLS_IN_FLIGHT.labels(operation)
+        self._durations = {}
+
+    def observe(self, action: str, seconds: float):
+        child = self._durations.get(action)
+        if child is None:
+            child = self._durations[action] = AUTHLETE_CALL_SECONDS.labels(self.operation, action)
+        child.observe(seconds)
+
+
+_operations: dict[str, AuthleteOperationMetrics] = {}
+
+
+def authlete_operation(operation: str) -> AuthleteOperationMetrics:
+    metrics = _operations.get(operation)
+    if metrics is None:
+        metrics = _operations[operation] = AuthleteOperationMetrics(operation)
+    return metrics
@@ -0,0 +1,394 @@
+"""
+Request tracing
+---------------
+OpenTelemetry-compatible spans (W3C trace context, OTLP/JSON export) without
+the OpenTelemetry SDK. Every route gets a SERVER span; inside it, form parsing,
+`UserDao` / `ResourceServerDao` lookups, template rendering and each Authlete
+API call get child spans:
+
+    POST /api/token                    SERVER
+    ├── form.parse                     INTERNAL
+    └── authlete /auth/token           CLIENT    authlete.action=OK
+
+An incoming `traceparent` header continues the caller's trace (and a parent
+that was not sampled is not traced), and the Authlete calls carry a
+`traceparent` of their own, so a multi-hop flow such as authorization ->
+decision -> token -> userinfo can be followed end to end.
+
+Finished spans go to a `BatchSpanProcessor`: a bounded in-memory queue that a
+daemon thread drains every `TRACING_EXPORT_INTERVAL` seconds (or once
+`TRACING_BATCH_SIZE` spans are waiting) into a pluggable exporter:
+
+    file    one OTLP/JSON `ExportTraceServiceRequest` per line (TRACING_FILE)
+    otlp    POST OTLP/JSON to a collector (TRACING_OTLP_ENDPOINT)
+
+Tracing is off unless `TRACING_ENABLED=true`. When it is off the routes are
+not wrapped at all and `start_span()` returns a shared no-op span after one
+global check, so it can stay compiled in under production load (see
+benchmarks/bench_tracing.py).
+
+    TRACING_SAMPLE_RATIO   fraction of new traces recorded (1.0)
+    TRACING_QUEUE_SIZE     spans buffered before new ones are dropped (2048)
+"""
+
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.routing import Route
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "python-oauth-server"
+
+# OTLP SpanKind / StatusCode values
+INTERNAL = 1
+SERVER = 2
+CLIENT = 3
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id(bits: int) -> str:
+    value = 0
+    while value == 0:
+        value = random.getrandbits(bits)
+    return format(value, f"0{bits // 4}x")
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """Returns (trace_id, parent_span_id, sampled) from a W3C traceparent header."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff":
+        return None
+    trace_id, span_id, flags = parts[1], parts[2], parts[3]
+    if len(trace_id) != 32 or len(span_id) != 16 or len(flags) != 2:
+        return None
+    try:
+        if int(trace_id, 16) == 0 or int(span_id, 16) == 0:
+            return None
+        sampled = bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+    return trace_id.lower(), span_id.lower(), sampled
+
+
+class Span:
+    __slots__ = ("tracer", "trace_id", "span_id", "parent_id", "name", "kind",
+                 "attributes", "start_ns", "end_ns", "status", "status_message", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, kind: int, trace_id: str, parent_id: str | None, attributes: dict):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.status = STATUS_UNSET
+        self.status_message = None
+        self._token = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_error(self, message: str | None = None):
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None and self.status == STATUS_UNSET:
+            self.set_error(f"{exc_type.__name__}: {exc}")
+        self.tracer.processor.on_end(self)
+        return False
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """Returned whenever there is nothing to record; one shared instance."""
+    __slots__ = ()
+    traceparent = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_error(self, message=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def otlp_request(spans: list[Span]) -> dict:
+    """Wraps finished spans in an OTLP ExportTraceServiceRequest."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+        "scopeSpans": [{
+            "scope": {"name": "python_oauth_server"},
+            "spans": [span.to_otlp() for span in spans],
+        }],
+    }]}
+
+
+# ----------------------------------------------------------------------
+# Exporters
+# ----------------------------------------------------------------------
+
+class FileSpanExporter:
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: list[Span]):
+        line = json.dumps(otlp_request(spans), separators=(",", ":"))
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def shutdown(self):
+        pass
+
+
+class OtlpHttpSpanExporter:
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self._client = httpx.Client(timeout=timeout)
+
+    def export(self, spans: list[Span]):
+        response = self._client.post(self.endpoint, json=otlp_request(spans))
+        response.raise_for_status()
+
+    def shutdown(self):
+        self._client.close()
+
+
+EXPORTERS = {
+    "file": lambda: FileSpanExporter(os.getenv("TRACING_FILE", "traces.jsonl")),
+    "otlp": lambda: OtlpHttpSpanExporter(os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")),
+}
+
+
+class BatchSpanProcessor:
+    def __init__(self, exporter, max_queue: int = 2048, batch_size: int = 512, interval: float = 2.0):
+        self.exporter = exporter
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval = interval
+        # deque.append / popleft are atomic, so the request path takes no lock
+        self._queue: deque[Span] = deque()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span):
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.append(span)
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(self._queue.popleft())
+            try:
+                self.exporter.export(batch)
+                self.exported += len(batch)
+            except Exception:
+                self.failed += len(batch)
+                logger.warning("Could not export %d spans.", len(batch), exc_info=True)
+
+    def shutdown(self):
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join()
+        self.exporter.shutdown()
+
+    def stats(self) -> dict:
+        return {"queued": len(self._queue), "exported": self.exported, "dropped": self.dropped, "failed": self.failed}
+
+
+# ----------------------------------------------------------------------
+# Tracer
+# ----------------------------------------------------------------------
+
+class Tracer:
+    def __init__(self, processor: BatchSpanProcessor, sample_ratio: float = 1.0):
+        self.processor = processor
+        self.sample_ratio = sample_ratio
+
+    @classmethod
+    def from_env(cls) -> "Tracer | None":
+        if os.getenv("TRACING_ENABLED", "false").strip().lower() not in ("1", "true", "yes", "on"):
+            return None
+        name = os.getenv("TRACING_EXPORTER", "file").strip().lower()
+        if name not in EXPORTERS:
+            raise RuntimeError(f"Unknown TRACING_EXPORTER '{name}' (expected one of {', '.join(EXPORTERS)})")
+        processor = BatchSpanProcessor(
+            EXPORTERS[name](),
+            max_queue=int(os.getenv("TRACING_QUEUE_SIZE", 2048)),
+            batch_size=int(os.getenv("TRACING_BATCH_SIZE", 512)),
+            interval=float(os.getenv("TRACING_EXPORT_INTERVAL", 2.0)),
+        )
+        return cls(processor, float(os.getenv("TRACING_SAMPLE_RATIO", 1.0)))
+
+    def start_server_span(self, name: str, traceparent: str | None, attributes: dict):
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+            if not sampled:
+                return NOOP_SPAN
+        else:
+            if self.sample_ratio < 1.0 and random.random() >= self.sample_ratio:
+                return NOOP_SPAN
+            trace_id, parent_id = _new_id(128), None
+        return Span(self, name, SERVER, trace_id, parent_id, attributes)
+
+    def shutdown(self):
+        self.processor.shutdown()
+
+    def stats(self) -> dict:
+        return {"enabled": True, "sample_ratio": self.sample_ratio, **self.processor.stats()}
+
+
+_tracer: Tracer | None = None
+
+
+def set_tracer(tracer: Tracer | None):
+    global _tracer
+    _tracer = tracer
+
+
+def start_span(name: str, kind: int = INTERNAL, attributes: dict | None = None):
+    """
+    Child span of the current request's span. Outside a traced request (or
+    with tracing disabled) this returns the shared no-op span.
+    """
+    if _tracer is None:
+        return NOOP_SPAN
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent.tracer, name, kind, parent.trace_id, parent.span_id, attributes or {})
+
+
+def current_span():
+    return _current_span.get() or NOOP_SPAN
+
+
+class TracedRoute:
+    """ASGI wrapper that opens the SERVER span for one route."""
+
+    def __init__(self, app, route: str):
+        self.app = app
+        self.route = route
+
+    async def __call__(self, scope, receive, send):
+        tracer = _tracer
+        if tracer is None:
+            return await self.app(scope, receive, send)
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        method = scope["method"]
+        span = tracer.start_server_span(f"{method} {self.route}", traceparent, {
+            "http.request.method": method,
+            "http.route": self.route,
+        })
+        if span is NOOP_SPAN:
+            return await self.app(scope, receive, send)
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                span.attributes["http.response.status_code"] = status
+                if status >= 500:
+                    span.set_error()
+            await send(message)
+
+        with span:
+            await self.app(scope, receive, send_with_status)
+
+
+def trace_routes(app: FastAPI):
+    """Wraps every HTTP route of `app`; called from the lifespan when a tracer is installed."""
+    for route in app.routes:
+        if isinstance(route, Route) and not isinstance(route.app, TracedRoute):
+            route.app = TracedRoute(route.app, route.path)
+
+
+def get_tracer(request: Request) -> Tracer | None:
+    """FastAPI dependency returning the tracer, or None when tracing is disabled."""
+    return request.app.state.tracer
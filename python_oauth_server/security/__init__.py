@@ -0,0 +1,19 @@
+from security.access_tokens import AccessTokenValidator, Rejection, get_access_token_validator
+from security.admin_token import AdminToken, require_admin
+from security.basic_auth import ResourceServerAuthenticator, get_resource_server_authenticator, parse_basic_authorization
+from security.passwords import PasswordHasher, PasswordVerifier, PasswordVerifierBusy, get_password_verifier
+
+__all__ = [
+    "AccessTokenValidator",
+    "AdminToken",
+    "PasswordHasher",
+    "PasswordVerifier",
+    "PasswordVerifierBusy",
+    "Rejection",
+    "ResourceServerAuthenticator",
+    "get_access_token_validator",
+    "get_password_verifier",
+    "get_resource_server_authenticator",
+    "parse_basic_authorization",
+    "require_admin",
+]
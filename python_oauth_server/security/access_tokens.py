@@ -0,0 +1,274 @@
+"""
+Local access token pre-validation
+---------------------------------
+`/api/userinfo`, `/api/credential` and `/api/gm/{grantId}` hand every bearer
+token to Authlete. When the service issues JWT access tokens, a token that
+is malformed, expired, for another issuer or audience, or not signed by the
+service can be refused locally. `AccessTokenValidator.check()` returns a
+`Rejection` for those, answered with 401 `invalid_token` and no Authlete
+call, and None for everything else. Locally valid tokens still go to Authlete,
+which alone knows about revocation, scopes and grants.
+
+Signatures are checked against the service JWKS (`getServiceJwks`), taken
+from the metadata cache, so it follows the cache's refresh cycle. A `kid`
+that is not in the set triggers an immediate refetch, at most once per
+`ACCESS_TOKEN_JWKS_MIN_REFRESH` seconds, so a rotated key is picked up
+without waiting for the TTL. A verified token is remembered by its SHA-256
+until it expires, so the signature check (security/jwt.py) runs once per
+token, not once per request. A rejected token is remembered the same way for
+`ACCESS_TOKEN_JWKS_MIN_REFRESH` seconds (and until the JWKS changes), so
+replaying a forged token costs a hash and a dictionary lookup.
+
+The check fails open: when the JWKS or the issuer cannot be loaded, or the
+token uses an algorithm the server cannot verify (EdDSA...), the token is
+passed on to Authlete as before.
+
+    ACCESS_TOKEN_LOCAL_VALIDATION   "true" if the service issues JWT access tokens (false)
+    ACCESS_TOKEN_ISSUER             expected `iss` (default: the discovery document's issuer)
+    ACCESS_TOKEN_AUDIENCES          comma-separated; when set, `aud` must contain one of them
+    ACCESS_TOKEN_LEEWAY             allowed clock skew on exp / nbf, seconds (30)
+    ACCESS_TOKEN_CACHE_SIZE         verified tokens remembered, and rejected tokens (10000 each)
+    ACCESS_TOKEN_JWKS_MIN_REFRESH   minimum seconds between refetches for an unknown kid,
+                                    and how long a rejection is remembered (30)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from fastapi import Request
+
+from cache import CachedDocument
+from security.jwt import ALGORITHMS, JsonWebKeySet, MalformedToken, split_jws
+
+logger = logging.getLogger(__name__)
+
+# refresh -> the JWKS document; refresh=True bypasses the cached copy
+JwksLoader = Callable[[bool], Awaitable[CachedDocument]]
+ConfigurationLoader = Callable[[], Awaitable[CachedDocument]]
+
+
+@dataclass(frozen=True, slots=True)
+class Rejection:
+    reason: str
+    description: str
+
+    @property
+    def www_authenticate(self) -> str:
+        return f'Bearer error="invalid_token",error_description="{self.description}"'
+
+    @property
+    def json(self) -> str:
+        return json.dumps({"error": "invalid_token", "error_description": self.description})
+
+
+MALFORMED = Rejection("malformed", "The access token is not a valid JWT.")
+UNSIGNED = Rejection("unsigned", "The access token is not signed.")
+EXPIRED = Rejection("expired", "The access token has expired.")
+NOT_YET_VALID = Rejection("not_yet_valid", "The access token is not valid yet.")
+WRONG_ISSUER = Rejection("wrong_issuer", "The access token was not issued by this server.")
+WRONG_AUDIENCE = Rejection("wrong_audience", "The access token is not intended for this server.")
+UNKNOWN_KEY = Rejection("unknown_key", "The access token is signed with an unknown key.")
+BAD_SIGNATURE = Rejection("bad_signature", "The access token signature is invalid.")
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class AccessTokenValidator:
+    def __init__(self, jwks: JwksLoader, configuration: ConfigurationLoader | None = None, issuer: str | None = None,
+                 audiences: tuple[str, ...] = (), leeway: float = 30.0, max_entries: int = 10000,
+                 min_refresh: float = 30.0):
+        self._jwks = jwks
+        self._configuration = configuration
+        self.issuer = issuer
+        self.audiences = frozenset(audiences)
+        self.leeway = leeway
+        self.max_entries = max_entries
+        self.min_refresh = min_refresh
+        # SHA-256 of the token -> its exp
+        self._verified: OrderedDict[bytes, float] = OrderedDict()
+        # SHA-256 of the token -> (rejection, time.monotonic() deadline)
+        self._rejected: OrderedDict[bytes, tuple[Rejection, float]] = OrderedDict()
+        self._key_set: JsonWebKeySet | None = None
+        self._key_set_body: bytes | None = None
+        self._configuration_body: bytes | None = None
+        self._configured_issuer: str | None = None
+        self._last_refresh = float("-inf")
+        self.checks = 0
+        self.hits = 0
+        self.rejection_hits = 0
+        self.verified = 0
+        self.passed_unchecked = 0
+        self.jwks_refreshes = 0
+        self.rejections: Counter[str] = Counter()
+
+    @classmethod
+    def from_env(cls, jwks: JwksLoader, configuration: ConfigurationLoader | None = None) -> "AccessTokenValidator | None":
+        if os.getenv("ACCESS_TOKEN_LOCAL_VALIDATION", "false").strip().lower() not in ("1", "true", "yes", "on"):
+            return None
+        audiences = tuple(filter(None, (a.strip() for a in os.getenv("ACCESS_TOKEN_AUDIENCES", "").split(","))))
+        return cls(
+            jwks,
+            configuration,
+            issuer=os.getenv("ACCESS_TOKEN_ISSUER") or None,
+            audiences=audiences,
+            leeway=float(os.getenv("ACCESS_TOKEN_LEEWAY", 30)),
+            max_entries=int(os.getenv("ACCESS_TOKEN_CACHE_SIZE", 10000)),
+            min_refresh=float(os.getenv("ACCESS_TOKEN_JWKS_MIN_REFRESH", 30)),
+        )
+
+    async def check(self, token: str) -> Rejection | None:
+        """A Rejection for a token that cannot be valid; None if Authlete should decide."""
+        self.checks += 1
+        now = time.time()
+        cache_key = hashlib.sha256(token.encode()).digest()
+        exp = self._verified.get(cache_key)
+        if exp is not None:
+            if now <= exp + self.leeway:
+                self._verified.move_to_end(cache_key)
+                self.hits += 1
+                return None
+            del self._verified[cache_key]
+            return self._reject(EXPIRED)
+        rejected = self._rejected.get(cache_key)
+        if rejected is not None:
+            if time.monotonic() < rejected[1]:
+                self.rejection_hits += 1
+                return self._reject(rejected[0])
+            del self._rejected[cache_key]
+
+        try:
+            jws = split_jws(token)
+        except MalformedToken:
+            return self._refuse(cache_key, MALFORMED)
+
+        alg = jws.header.get("alg")
+        if not isinstance(alg, str) or alg == "none":
+            return self._refuse(cache_key, UNSIGNED)
+
+        rejection = await self._check_claims(jws.claims, now)
+        if rejection is not None:
+            return self._refuse(cache_key, rejection)
+
+        if alg not in ALGORITHMS:
+            self.passed_unchecked += 1
+            return None
+
+        kid = jws.header.get("kid")
+        kid = kid if isinstance(kid, str) else None
+        key_set = await self._keys()
+        if key_set is None:
+            self.passed_unchecked += 1
+            return None
+        candidates = key_set.candidates(kid, alg)
+        if not candidates and kid is not None and kid not in key_set.by_kid:
+            key_set = await self._keys(refresh=True)
+            candidates = key_set.candidates(kid, alg) if key_set is not None else []
+        if not candidates:
+            return self._refuse(cache_key, UNKNOWN_KEY)
+
+        if not any(key.verify(alg, jws.signing_input, jws.signature) for key in candidates):
+            return self._refuse(cache_key, BAD_SIGNATURE)
+
+        self.verified += 1
+        self._verified[cache_key] = float(jws.claims["exp"])
+        if len(self._verified) > self.max_entries:
+            self._verified.popitem(last=False)
+        return None
+
+    async def _check_claims(self, claims: dict, now: float) -> Rejection | None:
+        exp = claims.get("exp")
+        if not _is_number(exp):
+            return MALFORMED
+        if now > exp + self.leeway:
+            return EXPIRED
+        nbf = claims.get("nbf")
+        if _is_number(nbf) and now + self.leeway < nbf:
+            return NOT_YET_VALID
+
+        issuer = await self._issuer()
+        if issuer is not None and claims.get("iss") != issuer:
+            return WRONG_ISSUER
+
+        if self.audiences:
+            aud = claims.get("aud")
+            audiences = [aud] if isinstance(aud, str) else aud if isinstance(aud, list) else []
+            if self.audiences.isdisjoint(a for a in audiences if isinstance(a, str)):
+                return WRONG_AUDIENCE
+        return None
+
+    def _reject(self, rejection: Rejection) -> Rejection:
+        self.rejections[rejection.reason] += 1
+        return rejection
+
+    def _refuse(self, cache_key: bytes, rejection: Rejection) -> Rejection:
+        self._rejected[cache_key] = (rejection, time.monotonic() + self.min_refresh)
+        if len(self._rejected) > self.max_entries:
+            self._rejected.popitem(last=False)
+        return self._reject(rejection)
+
+    async def _keys(self, refresh: bool = False) -> JsonWebKeySet | None:
+        if refresh:
+            if time.monotonic() - self._last_refresh < self.min_refresh:
+                return self._key_set
+            self._last_refresh = time.monotonic()
+            self.jwks_refreshes += 1
+        try:
+            document = await self._jwks(refresh)
+        except Exception:
+            logger.warning("Could not load the service JWKS; access tokens go to Authlete unchecked.", exc_info=True)
+            return self._key_set
+        if not document.cacheable:
+            return self._key_set
+        # Parsed again only when the document changes
+        if document.body != self._key_set_body:
+            self._key_set = JsonWebKeySet.parse(document.body)
+            self._key_set_body = document.body
+            # A new key may make a rejected token valid
+            self._rejected.clear()
+        return self._key_set
+
+    async def _issuer(self) -> str | None:
+        if self.issuer is not None or self._configuration is None:
+            return self.issuer
+        try:
+            document = await self._configuration()
+        except Exception:
+            logger.warning("Could not load the discovery document; the iss claim is not checked.", exc_info=True)
+            return self._configured_issuer
+        if document.cacheable and document.body != self._configuration_body:
+            try:
+                issuer = json.loads(document.body).get("issuer")
+            except (ValueError, AttributeError):
+                issuer = None
+            self._configured_issuer = issuer if isinstance(issuer, str) else None
+            self._configuration_body = document.body
+        return self._configured_issuer
+
+    def stats(self) -> dict:
+        return {
+            "checks": self.checks,
+            "cache_hits": self.hits,
+            "verified": self.verified,
+            "passed_unchecked": self.passed_unchecked,
+            "rejected": dict(self.rejections),
+            "cached_tokens": len(self._verified),
+            "rejection_hits": self.rejection_hits,
+            "cached_rejections": len(self._rejected),
+            "max_entries": self.max_entries,
+            "keys": len(self._key_set.keys) if self._key_set is not None else 0,
+            "jwks_refreshes": self.jwks_refreshes,
+            "issuer": self.issuer or self._configured_issuer,
+        }
+
+
+def get_access_token_validator(request: Request) -> AccessTokenValidator | None:
+    """FastAPI dependency returning the validator, or None when local validation is off."""
+    return request.app.state.access_token_validator
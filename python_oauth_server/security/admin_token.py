@@ -0,0 +1,47 @@
+"""
+Admin endpoint authentication
+-----------------------------
+The `/admin/...` routes expose pool, breaker, cache, password and token
+counters, and share the listener with the public OAuth endpoints. They are
+only served when `ADMIN_TOKEN` is set, and then only to requests that send it
+as a bearer token:
+
+    curl -H "Authorization: Bearer $ADMIN_TOKEN" localhost:8000/admin/passwords
+
+Without `ADMIN_TOKEN` every admin route answers 404. `/metrics` is not
+affected.
+
+    ADMIN_TOKEN   shared secret for the /admin routes (unset: routes disabled)
+"""
+
+import hmac
+import os
+
+from fastapi import HTTPException, Request
+
+
+class AdminToken:
+    def __init__(self, token: str):
+        self._token = token.encode("utf-8")
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls) -> "AdminToken | None":
+        token = os.getenv("ADMIN_TOKEN", "").strip()
+        return cls(token) if token else None
+
+    def check(self, authorization: str | None) -> bool:
+        scheme, _, value = (authorization or "").partition(" ")
+        ok = scheme.lower() == "bearer" and hmac.compare_digest(value.strip().encode("utf-8"), self._token)
+        if not ok:
+            self.failures += 1
+        return ok
+
+
+def require_admin(request: Request):
+    """FastAPI dependency guarding the /admin routes (see module docstring)."""
+    admin_token = request.app.state.admin_token
+    if admin_token is None:
+        raise HTTPException(status_code=404)
+    if not admin_token.check(request.headers.get("authorization")):
+        raise HTTPException(status_code=401, headers={"WWW-Authenticate": 'Bearer realm="admin"'})
@@ -0,0 +1,157 @@
+"""
+HTTP Basic credentials
+----------------------
+`parse_basic_authorization` is the one Basic-header parser shared by the
+token, PAR, revocation and introspection endpoints.
+
+`ResourceServerAuthenticator` authenticates resource servers at the
+introspection endpoint. Resource server secrets are long random strings, not
+passwords, so the store holds their SHA-256 (`$sha256$<digest>`, unpadded
+urlsafe base64) and they are checked inline with a constant-time comparison:
+no KDF, and nothing queued on the end-user login pool. A legacy plaintext
+secret still verifies. A successful header -> rs_id result is remembered in a
+small LRU keyed by the SHA-256 of the header, so repeat callers skip the
+decode and the lookup. Entries expire after `RS_AUTH_CACHE_TTL` seconds so a
+rotated or removed secret stops working without a restart.
+
+    RS_AUTH_CACHE_SIZE   cached resource server headers (256)
+    RS_AUTH_CACHE_TTL    seconds a successful verification is trusted (300)
+
+To hash a secret for resource_servers.json:
+
+    python -m security.basic_auth
+"""
+
+import base64
+import binascii
+import getpass
+import hashlib
+import hmac
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from fastapi import Request
+
+from db.resource_server_dao import ResourceServerDao
+
+logger = logging.getLogger(__name__)
+
+SHA256_PREFIX = "$sha256$"
+
+
+def hash_secret(secret: str) -> str:
+    digest = hashlib.sha256(secret.encode("utf-8")).digest()
+    return SHA256_PREFIX + base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+# Compared against when the id is unknown, so a miss does the same work
+_DUMMY_DIGEST = hashlib.sha256(os.urandom(32)).digest()
+
+
+def verify_secret(stored: str | None, secret: str) -> bool:
+    """Checks a resource server secret against its stored SHA-256 (or legacy plaintext) in constant time."""
+    actual = hashlib.sha256(secret.encode("utf-8")).digest()
+    if stored is None:
+        hmac.compare_digest(actual, _DUMMY_DIGEST)
+        return False
+    if stored.startswith(SHA256_PREFIX):
+        encoded = stored[len(SHA256_PREFIX):]
+        try:
+            expected = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+        except (binascii.Error, ValueError):
+            return False
+        return hmac.compare_digest(actual, expected)
+    if stored.startswith("$"):
+        # A KDF hash from security.passwords: too slow to run per request here
+        logger.warning("Resource server secret is not a $sha256$ digest; re-hash it with `python -m security.basic_auth`.")
+        return False
+    return hmac.compare_digest(stored.encode("utf-8"), secret.encode("utf-8"))
+
+
+def parse_basic_authorization(authorization: str | None) -> tuple[str, str] | None:
+    """Returns (id, secret) from a `Basic` Authorization header, or None if absent or malformed."""
+    if not authorization:
+        return None
+    scheme, _, b64_creds = authorization.partition(" ")
+    if scheme.lower() != "basic":
+        return None
+    try:
+        decoded_creds = base64.b64decode(b64_creds.strip(), validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    user_id, separator, secret = decoded_creds.partition(":")
+    if not separator:
+        return None
+    return user_id, secret
+
+
+class ResourceServerAuthenticator:
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._verified: OrderedDict[bytes, tuple[str, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls) -> "ResourceServerAuthenticator":
+        return cls(
+            max_entries=int(os.getenv("RS_AUTH_CACHE_SIZE", 256)),
+            ttl=float(os.getenv("RS_AUTH_CACHE_TTL", 300)),
+        )
+
+    async def authenticate(self, authorization: str | None) -> str | None:
+        """Returns the resource server id for a valid Basic header, otherwise None."""
+        if not authorization:
+            return None
+
+        key = hashlib.sha256(authorization.encode("utf-8")).digest()
+        entry = self._verified.get(key)
+        if entry is not None:
+            rs_id, expires_at = entry
+            if expires_at > time.monotonic():
+                self._verified.move_to_end(key)
+                self.hits += 1
+                return rs_id
+            del self._verified[key]
+        self.misses += 1
+
+        credentials = parse_basic_authorization(authorization)
+        if credentials is None:
+            self.failures += 1
+            return None
+
+        rs_id, rs_secret = credentials
+        rs_record = await ResourceServerDao.get(rs_id)
+        if not verify_secret(rs_record.secret if rs_record else None, rs_secret):
+            self.failures += 1
+            return None
+
+        self._verified[key] = (rs_id, time.monotonic() + self.ttl)
+        while len(self._verified) > self.max_entries:
+            self._verified.popitem(last=False)
+        return rs_id
+
+    def clear(self):
+        self._verified.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._verified),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+        }
+
+
+def get_resource_server_authenticator(request: Request) -> ResourceServerAuthenticator:
+    """FastAPI dependency returning the resource server authenticator."""
+    return request.app.state.rs_authenticator
+
+
+if __name__ == "__main__":
+    print(hash_secret(getpass.getpass("Secret: ")))
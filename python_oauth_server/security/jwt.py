@@ -0,0 +1,141 @@
+"""
+JWS verification
+----------------
+Signature checks for JWT access tokens. The cryptography is PyJWT's (on top
+of `cryptography`); this module only picks the key and the algorithm, and
+only ever verifies with public keys.
+
+    RS256 / RS384 / RS512   RSASSA-PKCS1-v1_5, keys of at least 2048 bits
+    PS256 / PS384 / PS512   RSASSA-PSS (MGF1, salt = hash length, RFC 7518 3.5)
+    ES256 / ES384 / ES512   ECDSA on P-256 / P-384 / P-521
+
+Anything else (`none`, HMAC, EdDSA) is reported as unsupported, never as valid.
+
+`split_jws()` only parses (PyJWT's `decode_complete()` without signature
+or claim checks): header, claims, signing input and signature.
+`JsonWebKeySet.parse()` builds verification keys from the JWK Set Authlete
+serves (`getServiceJwks`), ignoring keys it cannot use.
+"""
+
+import json
+from dataclasses import dataclass
+
+from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurvePublicKey
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+from jwt import PyJWTError, decode_complete
+from jwt.algorithms import ECAlgorithm, RSAAlgorithm, get_default_algorithms
+
+# Larger tokens are rejected before any decoding
+MAX_TOKEN_LENGTH = 16384
+
+MIN_RSA_BITS = 2048
+
+
+class MalformedToken(ValueError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class Jws:
+    header: dict
+    claims: dict
+    signing_input: bytes
+    signature: bytes
+
+
+def split_jws(token: str) -> Jws:
+    """Parses a compact JWS with a JSON payload; the signature is not checked."""
+    if len(token) > MAX_TOKEN_LENGTH:
+        raise MalformedToken("token too long")
+    try:
+        jws = decode_complete(token, options={"verify_signature": False})
+    # Deeply nested JSON in a header or payload overflows the decoder's stack
+    except (PyJWTError, RecursionError) as e:
+        raise MalformedToken(str(e)) from e
+    signing_input = token.rsplit(".", 1)[0].encode("utf-8")
+    return Jws(jws["header"], jws["payload"], signing_input, jws["signature"])
+
+
+# ----------------------------------------------------------------------
+# Algorithms and keys
+# ----------------------------------------------------------------------
+
+# alg -> (kty, crv)
+ALGORITHMS = {
+    "RS256": ("RSA", None),
+    "RS384": ("RSA", None),
+    "RS512": ("RSA", None),
+    "PS256": ("RSA", None),
+    "PS384": ("RSA", None),
+    "PS512": ("RSA", None),
+    "ES256": ("EC", "P-256"),
+    "ES384": ("EC", "P-384"),
+    "ES512": ("EC", "P-521"),
+}
+
+_VERIFIERS = {alg: algorithm for alg, algorithm in get_default_algorithms().items() if alg in ALGORITHMS}
+
+
+@dataclass(frozen=True, slots=True)
+class VerificationKey:
+    kid: str | None
+    alg: str | None
+    kty: str
+    crv: str | None
+    key: RSAPublicKey | EllipticCurvePublicKey
+
+    def accepts(self, alg: str) -> bool:
+        if self.alg is not None and self.alg != alg:
+            return False
+        return ALGORITHMS[alg] == (self.kty, self.crv)
+
+    def verify(self, alg: str, message: bytes, signature: bytes) -> bool:
+        return _VERIFIERS[alg].verify(message, self.key, signature)
+
+
+def key_from_jwk(jwk: dict) -> VerificationKey | None:
+    """A verification key, or None for private, encryption or unusable keys."""
+    if jwk.get("use", "sig") != "sig" or "d" in jwk:
+        return None
+    alg = jwk.get("alg")
+    if alg is not None and alg not in ALGORITHMS:
+        return None
+    kty = jwk.get("kty")
+    try:
+        if kty == "RSA":
+            key = RSAAlgorithm.from_jwk(jwk)
+            if not isinstance(key, RSAPublicKey) or key.key_size < MIN_RSA_BITS:
+                return None
+            crv = None
+        elif kty == "EC":
+            key = ECAlgorithm.from_jwk(jwk)
+            crv = jwk["crv"]
+            if not isinstance(key, EllipticCurvePublicKey) or ("EC", crv) not in ALGORITHMS.values():
+                return None
+        else:
+            return None
+    except (PyJWTError, KeyError, TypeError, ValueError):
+        return None
+    return VerificationKey(jwk.get("kid"), alg, kty, crv, key)
+
+
+@dataclass(frozen=True, slots=True)
+class JsonWebKeySet:
+    by_kid: dict[str, VerificationKey]
+    keys: tuple[VerificationKey, ...]
+
+    @classmethod
+    def parse(cls, body: bytes) -> "JsonWebKeySet":
+        try:
+            document = json.loads(body) if body else {}
+        except (UnicodeDecodeError, json.JSONDecodeError, RecursionError):
+            document = {}
+        jwks = document.get("keys") if isinstance(document, dict) else None
+        keys = tuple(filter(None, (key_from_jwk(jwk) for jwk in jwks or () if isinstance(jwk, dict))))
+        return cls({key.kid: key for key in keys if key.kid is not None}, keys)
+
+    def candidates(self, kid: str | None, alg: str) -> list[VerificationKey]:
+        if kid is not None:
+            key = self.by_kid.get(kid)
+            return [key] if key is not None and key.accepts(alg) else []
+        return [key for key in self.keys if key.accepts(alg)]
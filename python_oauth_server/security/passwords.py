@@ -0,0 +1,205 @@
+"""
+Password hashing and off-loop verification
+------------------------------------------
+Stored passwords use a self-describing, PHC-style string so the parameters
+travel with each hash and can be raised later without a migration:
+
+    $scrypt$ln=14,r=8,p=1$<salt>$<hash>
+    $pbkdf2-sha256$i=600000$<salt>$<hash>
+
+(salt and hash are unpadded urlsafe base64). A value without a leading `$` is
+a legacy plaintext password; it still verifies, and is replaced with a hash the
+next time the user signs in successfully, as is any hash whose scheme or cost
+differs from the current settings.
+
+KDFs are deliberately slow, so `PasswordVerifier` runs them on a small
+dedicated thread pool (hashlib releases the GIL inside scrypt and PBKDF2). At
+most `PASSWORD_HASH_MAX_PENDING` verifications may be queued or running; a
+login beyond that is not queued but refused at once with 503
+`temporarily_unavailable` (`PasswordVerifierBusy`). A burst of logins can then
+use at most `PASSWORD_HASH_WORKERS` cores, its backlog stays bounded, and
+token / introspection traffic keeps the event loop.
+
+    PASSWORD_HASH_SCHEME         "scrypt" (default) or "pbkdf2-sha256"
+    PASSWORD_SCRYPT_LOG_N        log2 of the scrypt cost parameter N (14)
+    PASSWORD_PBKDF2_ITERATIONS   PBKDF2 iterations (600000)
+    PASSWORD_HASH_WORKERS        verification threads (2)
+    PASSWORD_HASH_MAX_PENDING    verifications queued or running at once; more get 503 (64)
+
+To hash a password for users.json (resource server secrets are plain SHA-256
+digests, see `security.basic_auth`):
+
+    python -m security.passwords
+"""
+
+import asyncio
+import base64
+import getpass
+import hashlib
+import hmac
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from fastapi import Request
+
+SCRYPT = "scrypt"
+PBKDF2_SHA256 = "pbkdf2-sha256"
+
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _parse_params(params: str) -> dict:
+    return {key: int(value) for key, value in (item.split("=", 1) for item in params.split(","))}
+
+
+@dataclass(frozen=True)
+class PasswordHasher:
+    scheme: str = SCRYPT
+    scrypt_log_n: int = 14
+    scrypt_r: int = 8
+    scrypt_p: int = 1
+    pbkdf2_iterations: int = 600_000
+
+    def __post_init__(self):
+        if self.scheme not in (SCRYPT, PBKDF2_SHA256):
+            raise ValueError(f"Unsupported password hash scheme '{self.scheme}'.")
+
+    @classmethod
+    def from_env(cls) -> "PasswordHasher":
+        return cls(
+            scheme=os.getenv("PASSWORD_HASH_SCHEME", cls.scheme).strip().lower(),
+            scrypt_log_n=int(os.getenv("PASSWORD_SCRYPT_LOG_N", cls.scrypt_log_n)),
+            pbkdf2_iterations=int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", cls.pbkdf2_iterations)),
+        )
+
+    def _params(self) -> str:
+        if self.scheme == SCRYPT:
+            return f"ln={self.scrypt_log_n},r={self.scrypt_r},p={self.scrypt_p}"
+        return f"i={self.pbkdf2_iterations}"
+
+    @staticmethod
+    def _derive(scheme: str, params: dict, password: str, salt: bytes, length: int) -> bytes:
+        secret = password.encode("utf-8")
+        if scheme == SCRYPT:
+            n, r, p = 1 << params["ln"], params["r"], params["p"]
+            # OpenSSL's default 32 MiB limit is too small for ln >= 15
+            return hashlib.scrypt(secret, salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + (1 << 20), dklen=length)
+        if scheme == PBKDF2_SHA256:
+            return hashlib.pbkdf2_hmac("sha256", secret, salt, params["i"], dklen=length)
+        raise ValueError(f"Unsupported password hash scheme '{scheme}'.")
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(SALT_BYTES)
+        params = self._params()
+        digest = self._derive(self.scheme, _parse_params(params), password, salt, HASH_BYTES)
+        return f"${self.scheme}${params}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def verify(self, stored: str, password: str) -> bool:
+        """Checks `password` against a stored hash (or legacy plaintext) in constant time."""
+        if not stored.startswith("$"):
+            return hmac.compare_digest(stored.encode("utf-8"), password.encode("utf-8"))
+
+        try:
+            _, scheme, params, salt, expected = stored.split("$")
+            expected = _b64decode(expected)
+            actual = self._derive(scheme, _parse_params(params), password, _b64decode(salt), len(expected))
+        except (ValueError, KeyError):
+            return False
+        return hmac.compare_digest(actual, expected)
+
+    def needs_rehash(self, stored: str) -> bool:
+        """True for plaintext and for hashes made with a different scheme or cost."""
+        if not stored.startswith("$"):
+            return True
+        parts = stored.split("$")
+        return len(parts) != 5 or parts[1] != self.scheme or parts[2] != self._params()
+
+
+class PasswordVerifierBusy(Exception):
+    """PASSWORD_HASH_MAX_PENDING hash jobs are already queued or running."""
+
+    def __init__(self, retry_after: float = 1.0):
+        super().__init__("Too many password verifications in progress")
+        self.retry_after = retry_after
+
+
+class PasswordVerifier:
+    def __init__(self, hasher: PasswordHasher | None = None, workers: int = 2, max_pending: int = 64):
+        self.hasher = hasher or PasswordHasher()
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self._pending = asyncio.Semaphore(max_pending)
+        # Verified against when the login id is unknown, so a miss costs the
+        # same as a wrong password and does not reveal which users exist.
+        self._dummy_hash = self.hasher.hash(secrets.token_urlsafe(16))
+        self.verifications = 0
+        self.failures = 0
+        self.rehashes = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "PasswordVerifier":
+        return cls(
+            PasswordHasher.from_env(),
+            workers=int(os.getenv("PASSWORD_HASH_WORKERS", 2)),
+            max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64)),
+        )
+
+    async def _run(self, fn, *args):
+        # Refused rather than queued: waiting on the semaphore would be an unbounded backlog
+        if self._pending.locked():
+            self.rejected += 1
+            raise PasswordVerifierBusy()
+        async with self._pending:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def verify(self, stored: str | None, password: str | None) -> bool:
+        self.verifications += 1
+        ok = await self._run(self.hasher.verify, stored or self._dummy_hash, password or "")
+        ok = ok and stored is not None and password is not None
+        if not ok:
+            self.failures += 1
+        return ok
+
+    def needs_rehash(self, stored: str) -> bool:
+        return self.hasher.needs_rehash(stored)
+
+    async def hash(self, password: str) -> str:
+        self.rehashes += 1
+        return await self._run(self.hasher.hash, password)
+
+    def stats(self) -> dict:
+        return {
+            "scheme": self.hasher.scheme,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "verifications": self.verifications,
+            "failures": self.failures,
+            "rehashes": self.rehashes,
+            "rejected": self.rejected,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+def get_password_verifier(request: Request) -> PasswordVerifier:
+    """FastAPI dependency returning the application-wide password verifier."""
+    return request.app.state.password_verifier
+
+
+if __name__ == "__main__":
+    print(PasswordHasher.from_env().hash(getpass.getpass("Password: ")))
@@ -0,0 +1,401 @@
+"""
+Prefork server
+--------------
+An opt-in run mode for more than one core. `uvicorn main:app` (what the
+Docker image runs) is one process with one event loop, so it never uses more
+than one core. `python serve.py` starts a master
+process that
+
+    1. binds the listening socket,
+    2. imports the application and preloads users.json and the resource
+       servers (db/backend.py), then freezes the garbage collector so a
+       collection in a worker never writes to those objects' headers and
+       un-shares their pages,
+    3. forks the uvicorn workers, which inherit the socket, the code and the
+       data copy-on-write. The kernel spreads new connections over the
+       workers that are waiting in accept().
+
+Everything else is per worker: the Authlete connection pool, the password
+pool, /metrics and the /admin counters (each answer comes from whichever
+worker took the request, so a Prometheus counter scraped through the shared
+port jumps between workers' values; scrape each worker or stay on one
+process when those numbers matter). With `CACHE_BACKEND=shared` the master also starts
+the shared cache server (cache/shared.py) that the introspection and metadata
+caches of all workers use. With `AUTHLETE_MOCK=true` it starts a single mock
+Authlete process, because a token issued through one worker must be known
+when another introspects it.
+
+    WEB_CONCURRENCY     workers (default: the CPUs this process may run on,
+                        capped by the cgroup CPU quota)
+    HOST / PORT         listen address (0.0.0.0 / 8000)
+    GRACEFUL_TIMEOUT    seconds a stopping worker gets to finish its requests (30)
+    UVICORN_LOG_LEVEL   uvicorn's own log level (info)
+
+Signals to the master:
+
+    TERM, INT   graceful shutdown
+    HUP         graceful reload: users.json and the resource servers are read
+                again, a new generation of workers is forked, and the old one
+                is stopped once every new worker has finished its startup
+    TTIN, TTOU  one worker more / fewer
+
+Usage (from python_oauth_server/):
+
+    WEB_CONCURRENCY=4 uv run python serve.py --port 8000
+"""
+
+import argparse
+import gc
+import logging
+import math
+import os
+import select
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+
+import uvicorn
+
+from cache.shared import DEFAULT_SOCKET, shared_backend_enabled
+from db.backend import preload_stores
+from observability.log import StructuredFormatter
+
+logger = logging.getLogger("serve")
+
+HANDLED_SIGNALS = (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU)
+
+# A worker that dies this soon after its fork is crash-looping; respawns wait
+CRASH_WINDOW = 2.0
+
+
+def available_cpus() -> int:
+    count = os.process_cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            count = min(count, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(count, 1)
+
+
+@dataclass(frozen=True)
+class ServeSettings:
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1
+    graceful_timeout: float = 30.0
+    log_level: str = "info"
+
+    @classmethod
+    def from_env(cls) -> "ServeSettings":
+        return cls(
+            host=os.getenv("HOST", cls.host),
+            port=int(os.getenv("PORT", cls.port)),
+            workers=int(os.getenv("WEB_CONCURRENCY", 0)) or available_cpus(),
+            graceful_timeout=float(os.getenv("GRACEFUL_TIMEOUT", cls.graceful_timeout)),
+            log_level=os.getenv("UVICORN_LOG_LEVEL", cls.log_level),
+        )
+
+
+class _WorkerServer(uvicorn.Server):
+    """Tells the master through a pipe once the lifespan startup has completed."""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self._ready_fd = ready_fd
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets)
+        if self.started:
+            os.write(self._ready_fd, b"1")
+            os.close(self._ready_fd)
+
+
+@dataclass
+class _Worker:
+    generation: int
+    started_at: float
+    ready_fd: int
+    ready: bool = False
+
+
+class Master:
+    def __init__(self, settings: ServeSettings):
+        self.settings = settings
+        self.target = max(settings.workers, 1)
+        self.generation = 0
+        self.workers: dict[int, _Worker] = {}
+        self.app = None
+        self._socket: socket.socket | None = None
+        self._signals: list[int] = []
+        self._sidecars: dict[int, tuple[str, subprocess.Popen]] = {}
+        self._runtime_dir = None
+        self._respawn_at = 0.0
+        self._stopping_since: float | None = None
+
+    # ------------------------------------------------------------------
+    # Startup
+    # ------------------------------------------------------------------
+
+    def _bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.settings.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.settings.host, self.settings.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _start_sidecar(self, name: str, args: list[str]) -> subprocess.Popen:
+        # Own process group: a Ctrl-C on the terminal reaches the master only.
+        # uvicorn.run() reads WEB_CONCURRENCY too and would refuse the mock's app object.
+        env = {k: v for k, v in os.environ.items() if k != "WEB_CONCURRENCY"}
+        process = subprocess.Popen([sys.executable, *args], process_group=0, env=env)
+        self._sidecars[process.pid] = (name, process)
+        return process
+
+    def _start_sidecars(self):
+        if shared_backend_enabled():
+            path = os.getenv("SHARED_CACHE_SOCKET") or os.path.join(self._runtime_dir, os.path.basename(DEFAULT_SOCKET))
+            os.environ["SHARED_CACHE_SOCKET"] = path
+            self._start_sidecar("shared cache", ["-m", "cache", "--socket", path])
+            _wait_until(lambda: _can_connect(socket.AF_UNIX, path), f"shared cache at {path}")
+
+        if os.getenv("AUTHLETE_MOCK", "false").strip().lower() in ("1", "true", "yes", "on"):
+            port = int(os.getenv("AUTHLETE_MOCK_PORT", 0)) or _free_port()
+            properties = os.path.join(self._runtime_dir, "mock.properties")
+            self._start_sidecar("mock Authlete", ["-m", "mock_authlete", "--port", str(port), "--properties", properties])
+            _wait_until(lambda: _can_connect(socket.AF_INET, ("127.0.0.1", port)), f"mock Authlete on port {port}")
+            # The workers use the one mock through a generated properties file
+            os.environ["AUTHLETE_MOCK"] = "false"
+            os.environ["AUTHLETE_PROPERTIES"] = properties
+            logger.warning("AUTHLETE_MOCK is set: Authlete calls go to the mock at http://127.0.0.1:%d", port)
+
+    def _preload(self):
+        if preload_stores():
+            logger.info("Preloaded users and resource servers for copy-on-write sharing")
+        gc.collect()
+        gc.freeze()
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _spawn(self):
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            self._run_worker(ready_w)
+        os.close(ready_w)
+        self.workers[pid] = _Worker(self.generation, time.monotonic(), ready_r)
+        logger.info("Started worker %d (generation %d)", pid, self.generation)
+
+    def _run_worker(self, ready_fd: int):
+        code = 0
+        try:
+            os.setpgid(0, 0)
+            for sig in HANDLED_SIGNALS:
+                signal.signal(sig, signal.SIG_DFL)
+            for worker in self.workers.values():
+                os.close(worker.ready_fd)
+            config = uvicorn.Config(self.app, lifespan="on", log_level=self.settings.log_level,
+                                    timeout_graceful_shutdown=self.settings.graceful_timeout)
+            _WorkerServer(config, ready_fd).run(sockets=[self._socket])
+        except BaseException:
+            logging.getLogger("serve.worker").exception("Worker %d failed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _stop_worker(self, pid: int, sig: int = signal.SIGTERM):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            if pid in self._sidecars:
+                name, _ = self._sidecars.pop(pid)
+                if self._stopping_since is None:
+                    logger.error("The %s process exited with status %d", name, os.waitstatus_to_exitcode(status))
+                continue
+
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            os.close(worker.ready_fd)
+            code = os.waitstatus_to_exitcode(status)
+            if self._stopping_since is None and worker.generation == self.generation:
+                logger.warning("Worker %d exited unexpectedly with status %d", pid, code)
+                if time.monotonic() - worker.started_at < CRASH_WINDOW:
+                    self._respawn_at = time.monotonic() + CRASH_WINDOW
+            else:
+                logger.info("Worker %d stopped", pid)
+
+    def _read_ready(self, timeout: float):
+        fds = {worker.ready_fd: worker for worker in self.workers.values() if not worker.ready}
+        if not fds:
+            time.sleep(timeout)
+            return
+        readable, _, _ = select.select(list(fds), [], [], timeout)
+        for fd in readable:
+            if os.read(fd, 1):
+                fds[fd].ready = True
+
+    def _current(self) -> list[int]:
+        return [pid for pid, worker in self.workers.items() if worker.generation == self.generation]
+
+    def _maintain(self):
+        current = self._current()
+        if len(current) < self.target and time.monotonic() >= self._respawn_at:
+            for _ in range(self.target - len(current)):
+                self._spawn()
+        elif len(current) > self.target:
+            for pid in current[self.target:]:
+                self.workers[pid].generation = -1
+                self._stop_worker(pid)
+
+        # A reload retires the previous generation once the new one serves
+        previous = [pid for pid, worker in self.workers.items() if 0 <= worker.generation < self.generation]
+        if previous and all(self.workers[pid].ready for pid in current) and len(current) >= self.target:
+            for pid in previous:
+                self.workers[pid].generation = -1
+                self._stop_worker(pid)
+            logger.info("Reload complete; stopping %d workers of the previous generation", len(previous))
+
+    # ------------------------------------------------------------------
+    # Signals
+    # ------------------------------------------------------------------
+
+    def _on_signal(self, signum, frame):
+        self._signals.append(signum)
+
+    def _handle_signals(self):
+        while self._signals:
+            signum = self._signals.pop(0)
+            if signum in (signal.SIGTERM, signal.SIGINT):
+                if self._stopping_since is None:
+                    logger.info("Shutting down %d workers", len(self.workers))
+                    self._stopping_since = time.monotonic()
+                    for pid in self.workers:
+                        self._stop_worker(pid)
+            elif self._stopping_since is not None:
+                continue
+            elif signum == signal.SIGHUP:
+                logger.info("Reloading: data, then a new generation of workers")
+                try:
+                    self._preload()
+                except (OSError, ValueError, KeyError):
+                    logger.exception("Reload failed; keeping the current workers")
+                    continue
+                self.generation += 1
+                self._respawn_at = 0.0
+            elif signum == signal.SIGTTIN:
+                self.target += 1
+                logger.info("Workers: %d", self.target)
+            elif signum == signal.SIGTTOU and self.target > 1:
+                self.target -= 1
+                logger.info("Workers: %d", self.target)
+
+    # ------------------------------------------------------------------
+    # Main loop
+    # ------------------------------------------------------------------
+
+    def run(self) -> int:
+        self._runtime_dir = tempfile.mkdtemp(prefix="oauth-serve-")
+        try:
+            self._socket = self._bind()
+            self._start_sidecars()
+            from main import app
+            self.app = app
+            self._preload()
+            for sig in HANDLED_SIGNALS:
+                signal.signal(sig, self._on_signal)
+            logger.info("Listening on %s:%d with %d workers", self.settings.host, self.settings.port, self.target)
+
+            while True:
+                self._reap()
+                self._handle_signals()
+                if self._stopping_since is not None:
+                    if not self.workers:
+                        return 0
+                    if time.monotonic() - self._stopping_since > self.settings.graceful_timeout + 5:
+                        for pid in self.workers:
+                            self._stop_worker(pid, signal.SIGKILL)
+                else:
+                    self._maintain()
+                self._read_ready(0.1)
+        finally:
+            for _, process in self._sidecars.values():
+                process.terminate()
+            for _, process in self._sidecars.values():
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            if self._socket is not None:
+                self._socket.close()
+            shutil.rmtree(self._runtime_dir, ignore_errors=True)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _can_connect(family: int, address) -> bool:
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(address)
+            return True
+        except OSError:
+            return False
+
+
+def _wait_until(ready, what: str, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while not ready():
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Timed out waiting for the {what}")
+        time.sleep(0.05)
+
+
+def main(argv: list[str] | None = None) -> int:
+    defaults = ServeSettings.from_env()
+    parser = argparse.ArgumentParser(prog="python serve.py", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=defaults.host)
+    parser.add_argument("--port", type=int, default=defaults.port)
+    parser.add_argument("--workers", type=int, default=defaults.workers)
+    parser.add_argument("--graceful-timeout", type=float, default=defaults.graceful_timeout)
+    args = parser.parse_args(argv)
+
+    # No QueueListener thread here (see observability/log.py): threads do not
+    # survive a fork. The workers install the full logging setup themselves.
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(StructuredFormatter(os.getenv("LOG_FORMAT", "json").strip().lower()))
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").strip().upper(), handlers=[handler])
+
+    settings = ServeSettings(args.host, args.port, args.workers, args.graceful_timeout, defaults.log_level)
+    return Master(settings).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())